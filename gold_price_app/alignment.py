@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+def _as_datetime64(dates):
+    return pd.to_datetime(pd.Series(dates)).values.astype('datetime64[ns]')
+
+def align_asof(base_dates, series, max_staleness=None):
+    """
+    Aligns one or more date-sorted series onto base_dates with as-of (forward-fill) semantics:
+    each base date takes the latest value dated on or before it.
+    Every series is aligned in one vectorized pass over the sorted dates, with no hash join.
+    Args:
+        base_dates (array-like): Sorted dates to align onto.
+        series (dict): Name -> (dates, values), each sorted by date.
+        max_staleness (pd.Timedelta | int): Oldest a carried-forward value may be (int = days).
+                                            None = no limit. Older values become NaN.
+    Returns:
+        dict: Name -> aligned float array (NaN where no usable value).
+        dict: Name -> coverage {'rows', 'exact', 'filled', 'missing'}.
+    """
+    base = _as_datetime64(base_dates)
+    if max_staleness is not None and not isinstance(max_staleness, pd.Timedelta):
+        max_staleness = pd.Timedelta(days=max_staleness)
+
+    aligned = {}
+    coverage = {}
+    for name, (dates, values) in series.items():
+        src_dates = _as_datetime64(dates)
+        src_values = np.asarray(values, dtype=np.float64)
+        # Missing quotes should not shadow the last good one
+        valid = ~np.isnan(src_values)
+        src_dates, src_values = src_dates[valid], src_values[valid]
+
+        # Index of the last source row dated on or before each base date (-1 = none yet)
+        pos = np.searchsorted(src_dates, base, side='right') - 1
+        found = pos >= 0
+        pos_safe = np.where(found, pos, 0)
+        out = np.where(found, src_values[pos_safe] if len(src_values) else np.nan, np.nan)
+
+        exact = found & (src_dates[pos_safe] == base) if len(src_dates) else np.zeros(len(base), dtype=bool)
+        if max_staleness is not None and len(src_dates):
+            stale = found & ((base - src_dates[pos_safe]) > max_staleness.to_timedelta64())
+            out[stale] = np.nan
+
+        usable = ~np.isnan(out)
+        aligned[name] = out
+        coverage[name] = {
+            'rows': len(base),
+            'exact': int(np.count_nonzero(exact & usable)),
+            'filled': int(np.count_nonzero(usable & ~exact)),
+            'missing': int(np.count_nonzero(~usable)),
+        }
+    return aligned, coverage
+
+def align_frames(base_df, others, column='Close', max_staleness=None):
+    """
+    Convenience wrapper: aligns `column` of each frame in others onto base_df['Date'].
+    Args:
+        base_df (pd.DataFrame): Frame with a sorted 'Date' column.
+        others (dict): Name -> DataFrame with sorted 'Date' and `column`.
+    Returns:
+        Same as align_asof.
+    """
+    return align_asof(base_df['Date'].values,
+                      {name: (df['Date'].values, df[column].to_numpy()) for name, df in others.items()},
+                      max_staleness)
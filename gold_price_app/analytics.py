@@ -1,97 +1,170 @@
+import weakref
 import pandas as pd
+import numpy as np
 import calendar
 
+from bars import Bars
+from instrumentation import instrumented
+
+# Functions below take a DataFrame (Date, Open, High, Low, Close, ...) or intraday Bars; bars are
+# read straight from their float32 arrays, never expanded into a frame. Inputs are usually shared,
+# read-only views of the price store, so nothing here copies or modifies them.
+
+# Monthly tables already built, keyed by id() of the source frame (entries drop when the frame is freed)
+_table_cache = {}
+
+@instrumented("analytics.build_monthly_table")
+def build_monthly_table(df):
+    """
+    Aggregates daily (or intraday) rows into one row per (year, month) in a single pass.
+    Args:
+        df (pd.DataFrame | Bars): Historical data with 'Date', 'High', 'Low', 'Close'.
+    Returns:
+        pd.DataFrame: Columns 'Year', 'Month' (1-12), 'Start', 'End', 'Change', 'Highest', 'Lowest', 'Rows',
+                      sorted by year and month. Start/End are the first/last Close of the month
+                      in row order, Highest/Lowest ignore missing values like pandas max/min.
+    """
+    if df.empty:
+        return pd.DataFrame(columns=['Year', 'Month', 'Start', 'End', 'Change', 'Highest', 'Lowest', 'Rows'])
+
+    dates = _dates(df)
+    key = dates.astype('datetime64[M]').astype(np.int64)
+
+    # Group rows by month while keeping their original order within each month
+    if (np.diff(key) < 0).any():
+        order = np.argsort(key, kind='stable')
+    else:
+        order = slice(None)
+    key = key[order]
+    # Reductions run in the source precision (float32 for bars); only the per-month results are widened
+    close = np.asarray(df['Close'])[order]
+    high = np.asarray(df['High'])[order]
+    low = np.asarray(df['Low'])[order]
+
+    starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+    ends = np.r_[starts[1:], len(key)]
+
+    start_price = close[starts].astype(np.float64)
+    end_price = close[ends - 1].astype(np.float64)
+    month_key = key[starts]
+
+    return pd.DataFrame({
+        'Year': month_key // 12 + 1970,
+        'Month': month_key % 12 + 1,
+        'Start': start_price,
+        'End': end_price,
+        'Change': end_price - start_price,
+        'Highest': np.fmax.reduceat(high, starts).astype(np.float64),
+        'Lowest': np.fmin.reduceat(low, starts).astype(np.float64),
+        'Rows': ends - starts,
+    })
+
+def get_monthly_table(df):
+    """
+    Returns build_monthly_table(df), reusing the table built earlier for the same frame.
+    """
+    entry = _table_cache.get(id(df))
+    if entry is not None:
+        ref, n_rows, table = entry
+        if ref() is df and n_rows == len(df):
+            return table
+
+    table = build_monthly_table(df)
+    key = id(df)
+    _table_cache[key] = (weakref.ref(df, lambda _, key=key: _table_cache.pop(key, None)), len(df), table)
+    return table
+
+def _dates(df):
+    """
+    The 'Date' column as a datetime64 array (a view for Bars).
+    """
+    if isinstance(df, Bars):
+        return df.dates
+    return pd.to_datetime(df['Date']).values
+
+def get_month_rows(df, month_num, year):
+    """
+    Returns the rows of df falling in the given month (a view of the arrays for Bars).
+    """
+    first = pd.Timestamp(year=year, month=month_num, day=1)
+    if isinstance(df, Bars):
+        return df.between(first, first + pd.offsets.MonthBegin(1))
+    dates = pd.to_datetime(df['Date'])
+    if dates.is_monotonic_increasing:
+        lo = dates.searchsorted(first)
+        hi = dates.searchsorted(first + pd.offsets.MonthBegin(1))
+        return df.iloc[lo:hi]
+    mask = (dates.dt.month == month_num) & (dates.dt.year == year)
+    return df.loc[mask]
+
+@instrumented("analytics.monthly_stats")
 def get_monthly_stats(df, month, year):
     """
     Filters data for a specific month and year, and calculates stats.
     Args:
-        df (pd.DataFrame): Historical data.
+        df (pd.DataFrame | Bars): Historical data.
         month (str): Month name (e.g., 'January').
         year (int): Year (e.g., 2023).
     Returns:
         dict: Stats including total increase/decrease, high, low, trend.
-        pd.DataFrame: Filtered data for that month.
+        pd.DataFrame | Bars: That month's rows (a view of df; df is never copied or modified).
     """
     # Map month name to number
     month_num = list(calendar.month_name).index(month)
-    
-    # Filter data
-    # Ensure Date column is datetime
-    df['Date'] = pd.to_datetime(df['Date'])
-    mask = (df['Date'].dt.month == month_num) & (df['Date'].dt.year == year)
-    df_filtered = df.loc[mask].copy()
-    
-    if df_filtered.empty:
-        return None, pd.DataFrame()
-        
-    # Calculate stats
-    first_price = df_filtered['Close'].iloc[0]
-    last_price = df_filtered['Close'].iloc[-1]
-    highest = df_filtered['High'].max()
-    lowest = df_filtered['Low'].min()
-    
-    price_change = last_price - first_price
+
+    table = get_monthly_table(df)
+    row = table[(table['Year'] == year) & (table['Month'] == month_num)]
+
+    if row.empty:
+        return None, (Bars.empty_bars(df.interval) if isinstance(df, Bars) else pd.DataFrame())
+    row = row.iloc[0]
+
+    price_change = row['Change']
     trend = "Uptrend" if price_change > 0 else "Downtrend"
-    
+
     stats = {
-        'start_price': first_price,
-        'end_price': last_price,
+        'start_price': row['Start'],
+        'end_price': row['End'],
         'change': price_change,
-        'highest': highest,
-        'lowest': lowest,
+        'highest': row['Highest'],
+        'lowest': row['Lowest'],
         'trend': trend
     }
-    
-    return stats, df_filtered
 
+    return stats, get_month_rows(df, month_num, year)
+
+@instrumented("analytics.yearly_analysis")
 def get_yearly_analysis(df, year):
     """
     Calculates month-wise price changes for a specific year.
     Args:
-        df (pd.DataFrame): Historical data.
+        df (pd.DataFrame | Bars): Historical data.
         year (int): Year.
     Returns:
         pd.DataFrame: Monthly aggregation with 'Month', 'Change', 'Highest', 'Lowest'.
         dict: Best and Worst performing months.
     """
-    df['Date'] = pd.to_datetime(df['Date'])
-    mask = (df['Date'].dt.year == year)
-    df_year = df.loc[mask].copy()
-    
-    if df_year.empty:
+    table = get_monthly_table(df)
+    year_rows = table[table['Year'] == year]
+
+    if year_rows.empty:
         return pd.DataFrame(), {}
-    
-    results = []
-    
-    for m in range(1, 13):
-        month_name = calendar.month_name[m]
-        mask_month = (df_year['Date'].dt.month == m)
-        df_month = df_year.loc[mask_month]
-        
-        if not df_month.empty:
-            start = df_month['Close'].iloc[0]
-            end = df_month['Close'].iloc[-1]
-            change = end - start
-            results.append({
-                'Month': month_name,
-                'Change': change,
-                'Highest': df_month['High'].max(),
-                'Lowest': df_month['Low'].min()
-            })
-            
-    results_df = pd.DataFrame(results)
-    
-    if results_df.empty:
-        return results_df, {}
+
+    results_df = pd.DataFrame({
+        'Month': [calendar.month_name[m] for m in year_rows['Month']],
+        'Change': year_rows['Change'].to_numpy(),
+        'Highest': year_rows['Highest'].to_numpy(),
+        'Lowest': year_rows['Lowest'].to_numpy(),
+    })
 
     best_month = results_df.loc[results_df['Change'].idxmax()]
     worst_month = results_df.loc[results_df['Change'].idxmin()]
-    
+
     summary = {
         'best_month': best_month['Month'],
         'best_change': best_month['Change'],
         'worst_month': worst_month['Month'],
         'worst_change': worst_month['Change']
     }
-    
+
     return results_df, summary
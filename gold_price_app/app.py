@@ -1,13 +1,24 @@
 import streamlit as st
 import pandas as pd
-import plotly.graph_objs as go
 from datetime import date
 import calendar
+import threading
 
 # Custom modules
-from data_loader import load_data, get_latest_price, convert_to_inr
-from model import train_model, predict_specific_date
-from analytics import get_monthly_stats, get_yearly_analysis
+# Heavy or section-specific modules (prophet via model training, plotly) are imported where first used
+from data_loader import fetch_histories
+from analytics import get_month_rows
+from cube import get_cube, data_version, cube_monthly_stats, cube_yearly_analysis, compare_years
+from conversion import ConversionEngine, add_fx_columns, convert_closes
+from config import UNITS
+from quotes import start_poller, get_quote
+import instrumentation
+from instrumentation import span
+
+# Display names for the weight units
+UNIT_LABELS = {"g": "1g", "10g": "10g", "oz": "oz", "kg": "kg"}
+# Monthly chart resolution -> bar size (None = daily closes); intraday bars are resampled from INTRADAY_INTERVAL
+RESOLUTIONS = {"Daily": None, "1 hour": "1h", "15 minutes": "15m", "5 minutes": "5m"}
 
 # --- 1. CONFIGURATION & STYLING ---
 st.set_page_config(page_title="Future Gold & Silver Price Prediction", layout="wide", page_icon="📈")
@@ -78,294 +89,464 @@ st.markdown("""
 
 # --- 2. SIDEBAR NAVIGATION ---
 st.sidebar.title("Navigation")
-section = st.sidebar.radio("Go to:", ["Date-wise Prediction", "Monthly Dashboard", "Yearly Analysis", "Forecast Trends"])
+section = st.sidebar.radio("Go to:", ["Date-wise Prediction", "Monthly Dashboard", "Yearly Analysis", "Forecast Trends"], key="section")
 
 st.sidebar.markdown("---")
 st.sidebar.info("System uses historical data + present market trends for accurate forecasting.")
 
+# Interval computation: fast closed-form by default, Monte Carlo sampling on request
+INTERVAL_OPTIONS = {"Fast (analytical)": "analytical", "Reduced sampling": "reduced", "Full sampling": "full"}
+interval_label = st.sidebar.selectbox("Prediction intervals", list(INTERVAL_OPTIONS))
+uncertainty_mode = INTERVAL_OPTIONS[interval_label]
+
+# Forecasting backend: Prophet (Stan) or the lightweight NumPy trend + seasonality model
+ENGINE_OPTIONS = {"Prophet": "prophet", "NumPy (fast)": "numpy"}
+engine_label = st.sidebar.selectbox("Forecast engine", list(ENGINE_OPTIONS))
+
+# Optional stage timings (wall / CPU / allocations) for this rerun, shown at the bottom of the sidebar
+# Recording is per session: only this script run's thread records spans, and unchecking stops it
+debug_timings = st.sidebar.checkbox("Debug: stage timings", value=False, key="debug_timings")
+instrumentation.enable_thread(debug_timings)
+run_mark = instrumentation.mark()
+
+def show_chart(fig, version=None):
+    # Long traces are downsampled to the chart point budget (selections cached per version);
+    # figure -> JSON serialization happens inside st.plotly_chart
+    from downsample import downsample_figure
+    downsample_figure(fig, version=version)
+    with span("app.plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True)
+
 # --- 3. HELPER: LOAD DATA ---
+# Market data is loaded on every page; models are trained only when a page first needs a prediction
 @st.cache_resource
-def get_params_and_models():
-    # Load data for both
-    with st.spinner("Loading Market Data & Training Models..."):
-        df_gold = load_data("GC=F", start_date="2020-01-01")
-        df_silver = load_data("SI=F", start_date="2020-01-01")
-        df_usdinr = load_data("USDINR=X", start_date="2020-01-01")
+def get_market_data():
+    with st.spinner("Loading Market Data..."), span("app.load_data"):
+        histories = fetch_histories(["GC=F", "SI=F", "USDINR=X"], start_date="2020-01-01")
+        for ticker, res in histories.items():
+            if isinstance(res, Exception):
+                raise RuntimeError(f"Failed to load {ticker}: {res}")
+            if res.empty:
+                raise RuntimeError(f"Failed to load {ticker}: No data returned")
+    return histories["GC=F"], histories["SI=F"], histories["USDINR=X"]
+
+@st.cache_resource
+def get_models(engine, version):
+    # Train the metal models in parallel; the workers read the price store refreshed by get_market_data
+    with st.spinner("Training Models..."), span("app.train", engine=engine):
+        from training import train_assets, format_report
+        results = train_assets(["GC=F", "SI=F"], start_date="2020-01-01", engine=engine, fetch=False)
         
-        # Train models once and cache (Model still runs on USD data for optimal stability)
-        model_gold = train_model(df_gold)
-        model_silver = train_model(df_silver)
+        for ticker, res in results.items():
+            if res['error'] is not None:
+                raise RuntimeError(f"Failed to load {ticker}: {res['error']}")
         
-    return df_gold, df_silver, df_usdinr, model_gold, model_silver
+    # Models run on USD data for optimal stability
+    return results["GC=F"]['model'], results["SI=F"]['model'], format_report(results)
+
+@st.cache_resource
+def get_dashboard_data(version, _df_gold, _df_silver, _df_usdinr):
+    # One conversion engine per data version: every currency/unit frame is computed once and reused
+    frames = {"GC=F": _df_gold, "SI=F": _df_silver}
+    engine = ConversionEngine({"INR": _df_usdinr})
+    for ticker, df in frames.items():
+        engine.convert(ticker, df, ["INR"], list(UNITS), version)
+    
+    # Monthly/yearly stats for every asset x currency x unit
+    market_cube = get_cube(frames, {"INR": _df_usdinr}, engine=engine)
+    return market_cube, engine, frames
 
 try:
-    df_gold, df_silver, df_usdinr, model_gold, model_silver = get_params_and_models()
+    df_gold, df_silver, df_usdinr = get_market_data()
+    dashboard_version = data_version({"GC=F": df_gold, "SI=F": df_silver, "USDINR=X": df_usdinr})
 except Exception as e:
     st.error(f"Critical Error: {e}")
     st.stop()
 
+def load_models():
+    """
+    Returns (model_gold, model_silver) for the selected engine, training them on first use.
+    The per-asset training report is shown as a caption.
+    """
+    try:
+        model_gold, model_silver, report = get_models(ENGINE_OPTIONS[engine_label], dashboard_version)
+    except Exception as e:
+        st.error(f"Critical Error: {e}")
+        st.stop()
+    st.caption(report.replace("\n", "  \n"))
+    return model_gold, model_silver
+
+def load_dashboard():
+    """
+    Returns (market_cube, conversion_engine, usd_frames) for the current data.
+    """
+    return get_dashboard_data(dashboard_version, df_gold, df_silver, df_usdinr)
+
+# Latest quotes are refreshed in the background; pages only read the in-memory cache
+start_poller(["GC=F", "SI=F", "USDINR=X"])
+
+def current_usdinr():
+    """
+    USDINR for converting forecasts: the polled quote while it is fresh, else the last daily close.
+    Returns:
+        float: Rate.
+        str: Where the rate comes from, for display.
+    """
+    quote = get_quote("USDINR=X")
+    if quote is not None and not quote['stale']:
+        return quote['price'], f"live quote, {quote['age']:.0f}s old"
+    return df_usdinr['Close'].iloc[-1], f"close of {df_usdinr['Date'].iloc[-1]:%d-%b-%Y}"
+
 # --- 4. MAIN SECTIONS ---
 
-# ==========================================
-# SECTION 1: DATE-WISE PREDICTION
-# ==========================================
-if section == "Date-wise Prediction":
-    st.title("🔮 Date-wise Price Prediction")
-    st.markdown("Predict the future price of Gold and Silver for any specific date.")
-    
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        d_day = st.number_input("Day", min_value=1, max_value=31, value=date.today().day)
-    with col2:
-        d_month = st.selectbox("Month", list(calendar.month_name)[1:], index=date.today().month-1)
-    with col3:
-        d_year = st.number_input("Year", min_value=date.today().year, max_value=date.today().year+5, value=date.today().year)
+with span("app.section", section=section):
+    # ==========================================
+    # SECTION 1: DATE-WISE PREDICTION
+    # ==========================================
+    if section == "Date-wise Prediction":
+        st.title("🔮 Date-wise Price Prediction")
+        st.markdown("Predict the future price of Gold and Silver for any specific date.")
         
-    if st.button("Predict Price", type="primary"):
-        # Construct date
-        try:
-            month_num = list(calendar.month_name).index(d_month)
-            target_date = date(d_year, month_num, d_day)
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            d_day = st.number_input("Day", min_value=1, max_value=31, value=date.today().day)
+        with col2:
+            d_month = st.selectbox("Month", list(calendar.month_name)[1:], index=date.today().month-1)
+        with col3:
+            d_year = st.number_input("Year", min_value=date.today().year, max_value=date.today().year+5, value=date.today().year)
             
-            if target_date < date.today():
-                st.warning("⚠️ You selected a past date. Showing historical estimate if available, or theoretical prediction.")
-            
-            # Predict (USD)
-            pred_gold_usd, _, _ = predict_specific_date(model_gold, str(target_date))
-            pred_silver_usd, _, _ = predict_specific_date(model_silver, str(target_date))
-            
-            # Convert to INR/1g using LATEST available exchange rate
-            # Note: We use the latest known rate because predicting future exchange rate is a separate complex task.
-            latest_usdinr = df_usdinr['Close'].iloc[-1]
-            factor_1g = 1 / 31.1035
-            
-            pred_gold_inr = pred_gold_usd * latest_usdinr * factor_1g
-            pred_silver_inr = pred_silver_usd * latest_usdinr * factor_1g
-            
-            st.markdown("---")
-            st.subheader(f"Prediction for: {target_date.strftime('%d-%B-%Y')}")
-            
-            r_col1, r_col2 = st.columns(2)
-            
-            with r_col1:
-                st.markdown(f"""
-                <div class="result-box">
-                    <div class="result-title">Gold Price (INR/1g)</div>
-                    <div class="result-value">₹ {pred_gold_inr:,.2f}</div>
-                    <small>Based on current USDINR rate (~₹{latest_usdinr:.2f})</small>
-                </div>
-                """, unsafe_allow_html=True)
+        if st.button("Predict Price", type="primary"):
+            # Construct date
+            try:
+                month_num = list(calendar.month_name).index(d_month)
+                target_date = date(d_year, month_num, d_day)
                 
-            with r_col2:
-                st.markdown(f"""
-                <div class="result-box silver-box">
-                    <div class="result-title">Silver Price (INR/1g)</div>
-                    <div class="result-value">₹ {pred_silver_inr:,.2f}</div>
-                    <small>Based on current USDINR rate</small>
-                </div>
-                """, unsafe_allow_html=True)
+                if target_date < date.today():
+                    st.warning("⚠️ You selected a past date. Showing historical estimate if available, or theoretical prediction.")
                 
-        except ValueError:
-            st.error("Invalid Date selected.")
-
-# ==========================================
-# SECTION 2: MONTHLY DASHBOARD
-# ==========================================
-elif section == "Monthly Dashboard":
-    st.title("📊 Monthly Market Dashboard")
-    
-    c1, c2 = st.columns(2)
-    with c1:
-        m_month = st.selectbox("Select Month", list(calendar.month_name)[1:], index=date.today().month-1)
-    with c2:
-        m_year = st.number_input("Select Year", min_value=2020, max_value=date.today().year, value=date.today().year)
-        
-    if st.button("Show Dashboard"):
-        # Convert to INR: Gold (oz -> 1g), Silver (oz -> 1g)
-        # 1 oz = 31.1035 g. Factor for 1g = 1 / 31.1035
-        
-        factor_1g = 1 / 31.1035
-        
-        df_gold_inr = convert_to_inr(df_gold, df_usdinr, factor_1g)
-        df_silver_inr = convert_to_inr(df_silver, df_usdinr, factor_1g)
+                # Predict (USD)
+                from model import predict_specific_date
+                model_gold, model_silver = load_models()
+                pred_gold_usd, _, _ = predict_specific_date(model_gold, str(target_date), uncertainty=uncertainty_mode)
+                pred_silver_usd, _, _ = predict_specific_date(model_silver, str(target_date), uncertainty=uncertainty_mode)
+                
+                # Convert to INR/1g using LATEST available exchange rate
+                # Note: We use the latest known rate because predicting future exchange rate is a separate complex task.
+                latest_usdinr, rate_source = current_usdinr()
+                factor_1g = UNITS["g"]
+                
+                pred_gold_inr = pred_gold_usd * latest_usdinr * factor_1g
+                pred_silver_inr = pred_silver_usd * latest_usdinr * factor_1g
+                
+                st.markdown("---")
+                st.subheader(f"Prediction for: {target_date.strftime('%d-%B-%Y')}")
+                
+                r_col1, r_col2 = st.columns(2)
+                
+                with r_col1:
+                    st.markdown(f"""
+                    <div class="result-box">
+                        <div class="result-title">Gold Price (INR/1g)</div>
+                        <div class="result-value">₹ {pred_gold_inr:,.2f}</div>
+                        <small>Based on current USDINR rate (~₹{latest_usdinr:.2f}, {rate_source})</small>
+                    </div>
+                    """, unsafe_allow_html=True)
+                    
+                with r_col2:
+                    st.markdown(f"""
+                    <div class="result-box silver-box">
+                        <div class="result-title">Silver Price (INR/1g)</div>
+                        <div class="result-value">₹ {pred_silver_inr:,.2f}</div>
+                        <small>Based on current USDINR rate</small>
+                    </div>
+                    """, unsafe_allow_html=True)
+                    
+            except ValueError:
+                st.error("Invalid Date selected.")
 
-        st.markdown("### Gold Market Analysis (INR/1g)")
-        g_stats, g_data = get_monthly_stats(df_gold_inr, m_month, m_year)
+    # ==========================================
+    # SECTION 2: MONTHLY DASHBOARD
+    # ==========================================
+    elif section == "Monthly Dashboard":
+        st.title("📊 Monthly Market Dashboard")
         
-        if g_stats:
-            # Stats Row
-            m1, m2, m3, m4 = st.columns(4)
-            m1.metric("Highest Price", f"₹{g_stats['highest']:,.2f}")
-            m2.metric("Lowest Price", f"₹{g_stats['lowest']:,.2f}")
-            m3.metric("Total Change", f"₹{g_stats['change']:,.2f}", delta=g_stats['trend'])
-            m4.metric("Trend", g_stats['trend'])
+        c1, c2, c3, c4 = st.columns(4)
+        with c1:
+            m_month = st.selectbox("Select Month", list(calendar.month_name)[1:], index=date.today().month-1)
+        with c2:
+            m_year = st.number_input("Select Year", min_value=2020, max_value=date.today().year, value=date.today().year)
+        with c3:
+            m_unit = st.selectbox("Unit", list(UNIT_LABELS), format_func=UNIT_LABELS.get)
+        with c4:
+            m_resolution = st.selectbox("Chart resolution", list(RESOLUTIONS))
             
-            # Chart
+        def month_chart(ticker, name, color, daily_rows):
+            """
+            Price chart of the selected month: daily closes, or intraday bars read straight from their arrays.
+            """
+            import plotly.graph_objs as go
+            bar_size = RESOLUTIONS[m_resolution]
             fig = go.Figure()
-            fig.add_trace(go.Scatter(x=g_data['Date'], y=g_data['Close'], mode='lines+markers', name='Gold Price', line=dict(color='#FFD700')))
-            fig.update_layout(title=f"Gold Price (INR/1g) - {m_month} {m_year}", xaxis_title="Date", yaxis_title="Price (₹)")
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.info("No Gold data available for this month.")
+            if bar_size is None:
+                fig.add_trace(go.Scatter(x=daily_rows['Date'], y=daily_rows['Close'], mode='lines+markers', name=f'{name} Price', line=dict(color=color)))
+                version = (dashboard_version, ticker, m_unit, month_num, m_year)
+            else:
+                from data_loader import fetch_intraday
+                bars = get_month_rows(fetch_intraday(ticker), month_num, m_year)
+                if bars.empty:
+                    st.info(f"No intraday {name} bars stored for this month.")
+                    return
+                bars = bars.resample(bar_size)
+                prices = convert_closes(bars.dates, bars.close, df_usdinr, UNITS[m_unit])
+                fig.add_trace(go.Scatter(x=bars.dates, y=prices, mode='lines', name=f'{name} Price', line=dict(color=color)))
+                version = (dashboard_version, ticker, m_unit, month_num, m_year, bar_size, len(bars), int(bars.ts[-1]))
+            fig.update_layout(title=f"{name} Price (INR/{unit_label}) - {m_month} {m_year}", xaxis_title="Date", yaxis_title="Price (₹)")
+            show_chart(fig, version=version)
             
-        st.markdown("---")
-        st.markdown("### Silver Market Analysis (INR/1g)")
-        s_stats, s_data = get_monthly_stats(df_silver_inr, m_month, m_year)
-        
-        if s_stats:
-            # Stats Row
-            m1, m2, m3, m4 = st.columns(4)
-            m1.metric("Highest Price", f"₹{s_stats['highest']:,.2f}")
-            m2.metric("Lowest Price", f"₹{s_stats['lowest']:,.2f}")
-            m3.metric("Total Change", f"₹{s_stats['change']:,.2f}", delta=s_stats['trend'])
-            m4.metric("Trend", s_stats['trend'])
-            
-            # Chart
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(x=s_data['Date'], y=s_data['Close'], mode='lines+markers', name='Silver Price', line=dict(color='#C0C0C0')))
-            fig.update_layout(title=f"Silver Price (INR/1g) - {m_month} {m_year}", xaxis_title="Date", yaxis_title="Price (₹)")
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.info("No Silver data available for this month.")
+        if st.button("Show Dashboard"):
+            # Stats come from the precomputed cube; chart rows are a slice of the cached converted data
+            market_cube, conversion_engine, usd_frames = load_dashboard()
+            month_num = list(calendar.month_name).index(m_month)
+            unit_label = UNIT_LABELS[m_unit]
 
-# ==========================================
-# SECTION 3: YEARLY ANALYSIS
-# ==========================================
-elif section == "Yearly Analysis":
-    st.title("📅 Yearly Performance Analysis")
-    
-    y_year = st.number_input("Select Year", min_value=2020, max_value=date.today().year, value=date.today().year-1)
-    
-    if st.button("Show Yearly Analysis"):
-        st.subheader(f"Gold Performance in {y_year}")
-        g_res, g_sum = get_yearly_analysis(df_gold, y_year)
-        
-        if not g_res.empty:
-            # Summary
-            st.markdown(f"""
-            **Best Month:** {g_sum['best_month']} (Change: +${g_sum['best_change']:.2f})  
-            **Worst Month:** {g_sum['worst_month']} (Change: ${g_sum['worst_change']:.2f})
-            """)
+            st.markdown(f"### Gold Market Analysis (INR/{unit_label})")
+            g_stats = cube_monthly_stats(market_cube, "GC=F", "INR", m_unit, m_month, m_year)
+            g_data = get_month_rows(conversion_engine.get("GC=F", usd_frames["GC=F"], "INR", m_unit, dashboard_version), month_num, m_year)
             
-            # Bar Chart
-            fig = go.Figure(data=[
-                go.Bar(name='Price Change', x=g_res['Month'], y=g_res['Change'], marker_color=['#2ecc71' if x > 0 else '#e74c3c' for x in g_res['Change']])
-            ])
-            fig.update_layout(title=f"Monthly Gold Price Change ({y_year})", yaxis_title="Price Change ($)")
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.warning("No data found for this year.")
+            if g_stats:
+                # Stats Row
+                m1, m2, m3, m4 = st.columns(4)
+                m1.metric("Highest Price", f"₹{g_stats['highest']:,.2f}")
+                m2.metric("Lowest Price", f"₹{g_stats['lowest']:,.2f}")
+                m3.metric("Total Change", f"₹{g_stats['change']:,.2f}", delta=g_stats['trend'])
+                m4.metric("Trend", g_stats['trend'])
+                
+                # Chart
+                month_chart("GC=F", "Gold", '#FFD700', g_data)
+            else:
+                st.info("No Gold data available for this month.")
             
-        st.markdown("---")
-        st.subheader(f"Silver Performance in {y_year}")
-        s_res, s_sum = get_yearly_analysis(df_silver, y_year)
-        
-        if not s_res.empty:
-            # Summary
-            st.markdown(f"""
-            **Best Month:** {s_sum['best_month']} (Change: +${s_sum['best_change']:.2f})  
-            **Worst Month:** {s_sum['worst_month']} (Change: ${s_sum['worst_change']:.2f})
-            """)
+            g_cov = conversion_engine.coverage.get(("GC=F", "INR"))
+            if g_cov:
+                st.caption(f"USDINR alignment: {g_cov['exact']} exact, {g_cov['filled']} carried forward, {g_cov['missing']} without a rate (of {g_cov['rows']} days)")
+                
+            st.markdown("---")
+            st.markdown(f"### Silver Market Analysis (INR/{unit_label})")
+            s_stats = cube_monthly_stats(market_cube, "SI=F", "INR", m_unit, m_month, m_year)
+            s_data = get_month_rows(conversion_engine.get("SI=F", usd_frames["SI=F"], "INR", m_unit, dashboard_version), month_num, m_year)
             
-            # Bar Chart
-            fig = go.Figure(data=[
-                go.Bar(name='Price Change', x=s_res['Month'], y=s_res['Change'], marker_color=['#2ecc71' if x > 0 else '#e74c3c' for x in s_res['Change']])
-            ])
-            fig.update_layout(title=f"Monthly Silver Price Change ({y_year})", yaxis_title="Price Change ($)")
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.warning("No data found for this year.")
+            if s_stats:
+                # Stats Row
+                m1, m2, m3, m4 = st.columns(4)
+                m1.metric("Highest Price", f"₹{s_stats['highest']:,.2f}")
+                m2.metric("Lowest Price", f"₹{s_stats['lowest']:,.2f}")
+                m3.metric("Total Change", f"₹{s_stats['change']:,.2f}", delta=s_stats['trend'])
+                m4.metric("Trend", s_stats['trend'])
+                
+                # Chart
+                month_chart("SI=F", "Silver", '#C0C0C0', s_data)
+            else:
+                st.info("No Silver data available for this month.")
 
-# ==========================================
-# SECTION 4: FORECAST TRENDS
-# ==========================================
-elif section == "Forecast Trends":
-    st.title("📈 Forecast Trends")
-    st.markdown("Projected price trends for Gold & Silver based on historical data.")
-    
-    # Selection for Timeframe
-    period_option = st.radio("Select Forecast Period:", ["Next 1 Month (30 Days)", "Next 1 Year (365 Days)"], horizontal=True)
-    
-    periods = 30 if "1 Month" in period_option else 365
-    
-    if st.button(f"Generate Forecast ({periods} Days)"):
-        with st.spinner("Generating Forecast..."):
-            # Import helper just to be safe if not global, though likely is
-            from model import predict_future
-            
-            # 1. Fetch Forecast (USD)
-            # Returns dataframe with 'ds', 'yhat', 'yhat_lower', 'yhat_upper'
-            fc_gold_usd = predict_future(model_gold, periods)
-            fc_silver_usd = predict_future(model_silver, periods)
+    # ==========================================
+    # SECTION 3: YEARLY ANALYSIS
+    # ==========================================
+    elif section == "Yearly Analysis":
+        st.title("📅 Yearly Performance Analysis")
+        
+        y_year = st.number_input("Select Year", min_value=2020, max_value=date.today().year, value=date.today().year-1)
+        compare_with = st.multiselect("Compare with years", [y for y in range(2020, date.today().year + 1) if y != y_year])
+        
+        if st.button("Show Yearly Analysis"):
+            import plotly.graph_objs as go
             
-            # 2. Convert to INR/1g using LATEST Rate
-            latest_usdinr = df_usdinr['Close'].iloc[-1]
-            factor_1g = 1 / 31.1035
+            market_cube, _, _ = load_dashboard()
+            st.subheader(f"Gold Performance in {y_year}")
+            g_res, g_sum = cube_yearly_analysis(market_cube, "GC=F", "USD", "oz", y_year)
             
-            # Apply conversion to relevant columns
-            for df in [fc_gold_usd, fc_silver_usd]:
-                df['yhat_inr'] = df['yhat'] * latest_usdinr * factor_1g
-                df['yhat_lower_inr'] = df['yhat_lower'] * latest_usdinr * factor_1g
-                df['yhat_upper_inr'] = df['yhat_upper'] * latest_usdinr * factor_1g
+            if not g_res.empty:
+                # Summary
+                st.markdown(f"""
+                **Best Month:** {g_sum['best_month']} (Change: +${g_sum['best_change']:.2f})  
+                **Worst Month:** {g_sum['worst_month']} (Change: ${g_sum['worst_change']:.2f})
+                """)
+                
+                # Bar Chart
+                fig = go.Figure(data=[
+                    go.Bar(name='Price Change', x=g_res['Month'], y=g_res['Change'], marker_color=['#2ecc71' if x > 0 else '#e74c3c' for x in g_res['Change']])
+                ])
+                fig.update_layout(title=f"Monthly Gold Price Change ({y_year})", yaxis_title="Price Change ($)")
+                show_chart(fig)
+            else:
+                st.warning("No data found for this year.")
+                
+            st.markdown("---")
+            st.subheader(f"Silver Performance in {y_year}")
+            s_res, s_sum = cube_yearly_analysis(market_cube, "SI=F", "USD", "oz", y_year)
             
-            # Filter for plotting: Last 180 days history + Future
-            # Find the cutoff date for history
-            # Use pd.Timestamp for robustness
-            today_ts = pd.Timestamp.now().normalize()
-            history_cutoff = today_ts - pd.Timedelta(days=180)
+            if not s_res.empty:
+                # Summary
+                st.markdown(f"""
+                **Best Month:** {s_sum['best_month']} (Change: +${s_sum['best_change']:.2f})  
+                **Worst Month:** {s_sum['worst_month']} (Change: ${s_sum['worst_change']:.2f})
+                """)
+                
+                # Bar Chart
+                fig = go.Figure(data=[
+                    go.Bar(name='Price Change', x=s_res['Month'], y=s_res['Change'], marker_color=['#2ecc71' if x > 0 else '#e74c3c' for x in s_res['Change']])
+                ])
+                fig.update_layout(title=f"Monthly Silver Price Change ({y_year})", yaxis_title="Price Change ($)")
+                show_chart(fig)
+            else:
+                st.warning("No data found for this year.")
             
-            # 3. Plotting Logic
-            def plot_forecast(fc_df, title, color_line, color_fill):
-                # Filter data for cleaner view
-                plot_df = fc_df[fc_df['ds'] > history_cutoff]
+            if compare_with:
+                st.markdown("---")
+                st.subheader("Year-over-Year Comparison (Monthly Change, $/oz)")
+                years = [y_year] + sorted(compare_with)
+                st.markdown("**Gold**")
+                st.dataframe(compare_years(market_cube, "GC=F", "USD", "oz", years), use_container_width=True)
+                st.markdown("**Silver**")
+                st.dataframe(compare_years(market_cube, "SI=F", "USD", "oz", years), use_container_width=True)
+
+    # ==========================================
+    # SECTION 4: FORECAST TRENDS
+    # ==========================================
+    elif section == "Forecast Trends":
+        st.title("📈 Forecast Trends")
+        st.markdown("Projected price trends for Gold & Silver based on historical data.")
+        
+        # Selection for Timeframe
+        period_option = st.radio("Select Forecast Period:", ["Next 1 Month (30 Days)", "Next 1 Year (365 Days)"], horizontal=True)
+        
+        periods = 30 if "1 Month" in period_option else 365
+        compare_modes = st.checkbox("Compare interval modes (latency & width vs. full sampling)")
+        
+        if st.button(f"Generate Forecast ({periods} Days)"):
+            with st.spinner("Generating Forecast..."):
+                import plotly.graph_objs as go
+                from model import predict_future, compare_uncertainty_modes
+                from backtest import load_report, accuracy_summary
+                model_gold, model_silver = load_models()
+                # Accuracy badges come from the stored walk-forward backtest (python backtest.py), never recomputed here
+                backtest_report = load_report(ENGINE_OPTIONS[engine_label])
                 
-                fig = go.Figure()
+                # 1. Fetch Forecast (USD)
+                # Returns dataframe with 'ds', 'yhat', 'yhat_lower', 'yhat_upper'
+                # Only the last 180 days of history are plotted, so only those are requested
+                fc_gold_usd = predict_future(model_gold, periods, history_days=180, uncertainty=uncertainty_mode)
+                fc_silver_usd = predict_future(model_silver, periods, history_days=180, uncertainty=uncertainty_mode)
                 
-                # Confidence Interval (Upper/Lower)
-                fig.add_trace(go.Scatter(
-                    x=pd.concat([plot_df['ds'], plot_df['ds'][::-1]]),
-                    y=pd.concat([plot_df['yhat_upper_inr'], plot_df['yhat_lower_inr'][::-1]]),
-                    fill='toself',
-                    fillcolor=color_fill,
-                    line=dict(color='rgba(255,255,255,0)'),
-                    hoverinfo="skip",
-                    showlegend=True,
-                    name='Confidence Interval'
-                ))
+                # 2. Convert to INR/1g using LATEST Rate
+                latest_usdinr, rate_source = current_usdinr()
+                factor_1g = UNITS["g"]
                 
-                # Main Trend Line
-                fig.add_trace(go.Scatter(
-                    x=plot_df['ds'],
-                    y=plot_df['yhat_inr'],
-                    mode='lines',
-                    line=dict(color=color_line, width=2),
-                    name='Projected Price'
-                ))
+                # Apply conversion to relevant columns (history at the rate of the day, future at the latest rate)
+                for df in [fc_gold_usd, fc_silver_usd]:
+                    add_fx_columns(df, df_usdinr, factor_1g, latest_rate=latest_usdinr)
                 
-                # Add a vertical line for "Today"
-                # Convert timestamp to milliseconds to avoid direct Timestamp arithmetic in Plotly
-                today_ms = today_ts.timestamp() * 1000
-                fig.add_vline(x=today_ms, line_width=1, line_dash="dash", line_color="black", annotation_text="Today")
+                # Filter for plotting: Last 180 days history + Future
+                # Find the cutoff date for history
+                # Use pd.Timestamp for robustness
+                today_ts = pd.Timestamp.now().normalize()
+                history_cutoff = today_ts - pd.Timedelta(days=180)
                 
-                fig.update_layout(
-                    title=title,
-                    xaxis_title="Date",
-                    yaxis_title="Price (INR/1g)",
-                    hovermode="x unified",
-                    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-                )
-                return fig
-            
-            # Plot Gold
-            st.subheader("Gold Price Forecast (INR/1g)")
-            fig_gold = plot_forecast(fc_gold_usd, f"Gold Price Forecast - Next {periods} Days", '#FFD700', 'rgba(255, 215, 0, 0.2)')
-            st.plotly_chart(fig_gold, use_container_width=True)
-            
-            st.markdown("---")
-            
-            # Plot Silver
-            st.subheader("Silver Price Forecast (INR/1g)")
-            fig_silver = plot_forecast(fc_silver_usd, f"Silver Price Forecast - Next {periods} Days", '#C0C0C0', 'rgba(192, 192, 192, 0.2)')
-            st.plotly_chart(fig_silver, use_container_width=True)
-            
-            st.success(f"Forecast generated based on trends from Jan 2020 to Present. (USDINR Rate: ~₹{latest_usdinr:.2f})")
+                # 3. Plotting Logic
+                def plot_forecast(fc_df, title, color_line, color_fill):
+                    # Filter data for cleaner view
+                    plot_df = fc_df[fc_df['ds'] > history_cutoff]
+                    
+                    fig = go.Figure()
+                    # Band edges and trend line share one downsampling selection (picked from the
+                    # trend line, added last) so the filled band keeps matching x points
+                    band_group = dict(downsample_group=title)
+                    
+                    # Confidence Interval: the upper bound fills down to the lower one, so each bound
+                    # is sent once instead of as a series + reversed copy
+                    fig.add_trace(go.Scatter(
+                        x=plot_df['ds'],
+                        y=plot_df['yhat_lower_inr'],
+                        mode='lines',
+                        line=dict(color='rgba(255,255,255,0)'),
+                        hoverinfo="skip",
+                        showlegend=False,
+                        meta=band_group,
+                        name='Lower Bound'
+                    ))
+                    fig.add_trace(go.Scatter(
+                        x=plot_df['ds'],
+                        y=plot_df['yhat_upper_inr'],
+                        mode='lines',
+                        fill='tonexty',
+                        fillcolor=color_fill,
+                        line=dict(color='rgba(255,255,255,0)'),
+                        hoverinfo="skip",
+                        showlegend=True,
+                        meta=band_group,
+                        name='Confidence Interval'
+                    ))
+                    
+                    # Main Trend Line
+                    fig.add_trace(go.Scatter(
+                        x=plot_df['ds'],
+                        y=plot_df['yhat_inr'],
+                        mode='lines',
+                        line=dict(color=color_line, width=2),
+                        meta=band_group,
+                        name='Projected Price'
+                    ))
+                    
+                    # Add a vertical line for "Today"
+                    # Convert timestamp to milliseconds to avoid direct Timestamp arithmetic in Plotly
+                    today_ms = today_ts.timestamp() * 1000
+                    fig.add_vline(x=today_ms, line_width=1, line_dash="dash", line_color="black", annotation_text="Today")
+                    
+                    fig.update_layout(
+                        title=title,
+                        xaxis_title="Date",
+                        yaxis_title="Price (INR/1g)",
+                        hovermode="x unified",
+                        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+                    )
+                    return fig
+                
+                # Plot Gold
+                st.subheader("Gold Price Forecast (INR/1g)")
+                gold_accuracy = accuracy_summary(backtest_report, "GC=F", horizon=30 if periods <= 30 else 90)
+                if gold_accuracy:
+                    st.caption(f"🎯 Backtest accuracy (INR): {gold_accuracy}")
+                fig_gold = plot_forecast(fc_gold_usd, f"Gold Price Forecast - Next {periods} Days", '#FFD700', 'rgba(255, 215, 0, 0.2)')
+                show_chart(fig_gold, version=(dashboard_version, engine_label, uncertainty_mode, periods, latest_usdinr, "GC=F"))
+                
+                st.markdown("---")
+                
+                # Plot Silver
+                st.subheader("Silver Price Forecast (INR/1g)")
+                silver_accuracy = accuracy_summary(backtest_report, "SI=F", horizon=30 if periods <= 30 else 90)
+                if silver_accuracy:
+                    st.caption(f"🎯 Backtest accuracy (INR): {silver_accuracy}")
+                fig_silver = plot_forecast(fc_silver_usd, f"Silver Price Forecast - Next {periods} Days", '#C0C0C0', 'rgba(192, 192, 192, 0.2)')
+                show_chart(fig_silver, version=(dashboard_version, engine_label, uncertainty_mode, periods, latest_usdinr, "SI=F"))
+                
+                st.success(f"Forecast generated based on trends from Jan 2020 to Present. (USDINR Rate: ~₹{latest_usdinr:.2f}, {rate_source})")
+                
+                if compare_modes:
+                    st.markdown("### Interval Mode Comparison (Gold)")
+                    st.dataframe(compare_uncertainty_modes(model_gold, periods), use_container_width=True)
+
+# --- 5. DEBUG PANEL ---
+if debug_timings:
+    with st.sidebar.expander("Stage timings (this run)", expanded=True):
+        run_spans = instrumentation.spans_since(run_mark, thread=threading.get_ident())
+        if run_spans:
+            st.dataframe(pd.DataFrame({
+                'stage': [s['name'] for s in run_spans],
+                'labels': [", ".join(f"{k}={v}" for k, v in s['labels'].items()) for s in run_spans],
+                'wall ms': [s['wall_s'] * 1000 for s in run_spans],
+                'cpu ms': [s['cpu_s'] * 1000 for s in run_spans],
+                'alloc KiB': [None if s['alloc_bytes'] is None else s['alloc_bytes'] / 1024 for s in run_spans],
+            }).round(2), use_container_width=True, hide_index=True)
+        else:
+            st.caption("No instrumented stages ran (cached results).")
+        st.download_button("Prometheus metrics", instrumentation.to_prometheus(), file_name="gold_app_metrics.prom")
+        st.download_button("Spans (JSON lines)", instrumentation.to_jsonl(), file_name="gold_app_spans.jsonl")
@@ -0,0 +1,293 @@
+import os
+import json
+import time
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+
+from config import BACKTEST_DIR, FOLD_MODEL_DIR, TRAINING_WORKERS, UNITS
+from instrumentation import span
+
+# Walk-forward (rolling-origin) backtest of train_model/predict:
+#   python backtest.py                      gold + silver with the default engine
+#   python backtest.py --engine numpy --folds 12 --step 14
+# Each fold trains on the history up to a cutoff and forecasts the following days; folds are fitted
+# in a process pool, and fold fits go through their own artifact cache (FOLD_MODEL_DIR), so a rerun on unchanged data
+# only refits folds whose training window changed. The report is stored per engine for the UI.
+
+TICKERS = {"GC=F": "Gold", "SI=F": "Silver"}
+
+# Forecast horizons (calendar days after the cutoff) metrics are reported for
+HORIZONS = (7, 30, 90)
+DEFAULT_FOLDS = 8
+DEFAULT_STEP_DAYS = 30
+
+# Folds need at least this much training history
+MIN_TRAIN_DAYS = 365
+
+def make_folds(dates, horizon_days=max(HORIZONS), folds=DEFAULT_FOLDS, step_days=DEFAULT_STEP_DAYS,
+               min_train_days=MIN_TRAIN_DAYS):
+    """
+    Rolling-origin cutoffs: the latest leaves horizon_days of history to score against, earlier
+    ones step back step_days at a time while at least min_train_days of training history remain.
+    Returns:
+        list: Cutoff timestamps, oldest first.
+    """
+    dates = pd.to_datetime(pd.Series(dates))
+    first, last = dates.iloc[0], dates.iloc[-1]
+    cutoffs = []
+    for i in range(folds):
+        cutoff = last - pd.Timedelta(days=horizon_days + i * step_days)
+        if cutoff - first < pd.Timedelta(days=min_train_days):
+            break
+        cutoffs.append(cutoff)
+    return cutoffs[::-1]
+
+def _fit_fold(ticker, engine, df_train, test_dates, params=None):
+    """
+    Worker: fits one fold (or loads its cached fit) and predicts the test dates.
+    params overrides the engine parameters (default: what train_model would use for the ticker).
+    Runs in a separate process, so it returns plain arrays and reports failures as a value.
+    """
+    from model import train_model, predict_with_uncertainty, engine_params
+
+    result = {'ticker': ticker, 'cutoff': df_train['Date'].iloc[-1], 'error': None}
+    start = time.perf_counter()
+    try:
+        # Folds never refresh or move the ticker's lineage; identical folds hit their own artifact cache,
+        # kept apart from the production models so a tuning run cannot evict them
+        model = train_model(df_train, ticker=f"{ticker}@backtest", engine=engine, refresh=False, grid=False,
+                            params=params if params is not None else engine_params(ticker, engine),
+                            cache_dir=FOLD_MODEL_DIR)
+        forecast = predict_with_uncertainty(model, pd.DataFrame({'ds': test_dates}))
+        result['values'] = forecast[['yhat', 'yhat_lower', 'yhat_upper']].to_numpy(dtype=np.float64)
+        result['fit'] = model.refresh_info['mode']
+        result['interval_width'] = float(getattr(model, 'interval_width', 0.8))
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+def _metrics(actual, yhat, lower, upper, days_ahead, horizons):
+    """
+    MAE, MAPE (%) and interval coverage (%) over the test points at most h days ahead, per horizon h.
+    """
+    out = {}
+    for h in horizons:
+        sel = days_ahead <= h
+        if not sel.any():
+            continue
+        err = actual[sel] - yhat[sel]
+        out[str(h)] = {
+            'mae': float(np.mean(np.abs(err))),
+            'mape': float(np.mean(np.abs(err) / np.abs(actual[sel])) * 100),
+            'coverage': float(np.mean((actual[sel] >= lower[sel]) & (actual[sel] <= upper[sel])) * 100),
+            'n': int(sel.sum()),
+        }
+    return out
+
+def score(folds, df, fx_frame, horizons=HORIZONS, unit_factor=1.0):
+    """
+    Scores fold forecasts against the realized closes.
+    USD compares forecasts with closes directly. INR converts each forecast at the USDINR rate known at
+    its cutoff (what the app shows at forecast time) and compares it with the close at that day's rate,
+    so INR errors include currency moves over the horizon.
+    Args:
+        folds (list): _fit_fold results of one ticker (with 'values' and 'test_dates').
+        df (pd.DataFrame): The ticker's history (Date, Close).
+        fx_frame (pd.DataFrame): USDINR history (Date, Close), or None to skip INR.
+    Returns:
+        dict: currency -> horizon (str) -> {'mae', 'mape', 'coverage', 'n'}.
+    """
+    from alignment import align_asof
+    closes = df.set_index('Date')['Close']
+    parts = {'USD': [], 'INR': []}
+    for fold in folds:
+        dates = pd.DatetimeIndex(fold['test_dates'])
+        actual = closes.reindex(dates).to_numpy(dtype=np.float64)
+        values = fold['values']
+        days_ahead = (dates - pd.Timestamp(fold['cutoff'])).days.to_numpy()
+        parts['USD'].append((actual, values, days_ahead))
+        if fx_frame is not None:
+            fx = (fx_frame['Date'].values, fx_frame['Close'].to_numpy())
+            realized = align_asof(dates.values, {'fx': fx})[0]['fx']
+            at_cutoff = align_asof(np.array([np.datetime64(fold['cutoff'])]), {'fx': fx})[0]['fx'][0]
+            parts['INR'].append((actual * realized * unit_factor, values * at_cutoff * unit_factor, days_ahead))
+
+    report = {}
+    for currency, rows in parts.items():
+        if not rows:
+            continue
+        actual = np.concatenate([r[0] for r in rows])
+        values = np.concatenate([r[1] for r in rows])
+        days_ahead = np.concatenate([r[2] for r in rows])
+        ok = ~np.isnan(actual) & ~np.isnan(values[:, 0])
+        report[currency] = _metrics(actual[ok], values[ok, 0], values[ok, 1], values[ok, 2], days_ahead[ok], horizons)
+    return report
+
+def run_backtest(frames, fx_frame=None, engine=None, horizons=HORIZONS, folds=DEFAULT_FOLDS,
+                 step_days=DEFAULT_STEP_DAYS, max_workers=None, unit_factor=UNITS["g"], log=print):
+    """
+    Walk-forward backtest of several assets, all folds fitted concurrently.
+    Args:
+        frames (dict): Ticker -> history (Date, Close, ...).
+        fx_frame (pd.DataFrame): USDINR history for the INR metrics (optional).
+        engine (str): Forecast engine (default model.DEFAULT_ENGINE).
+        max_workers (int): Process count (default TRAINING_WORKERS, else the CPU count); 1 runs inline.
+        unit_factor (float): Unit of the INR metrics (default per gram, like the Forecast page).
+    Returns:
+        dict: Report with 'meta' and 'assets' (ticker -> {'folds', 'fits', 'metrics'}); see score().
+    """
+    from model import DEFAULT_ENGINE, engine_params
+    from cube import data_version
+    engine = engine or DEFAULT_ENGINE
+    horizon_days = max(horizons)
+
+    jobs = []
+    for ticker, df in frames.items():
+        dates = df['Date']
+        for cutoff in make_folds(dates, horizon_days, folds, step_days):
+            train = df[dates <= cutoff].reset_index(drop=True)
+            test = dates[(dates > cutoff) & (dates <= cutoff + pd.Timedelta(days=horizon_days))]
+            jobs.append((ticker, engine, train, test.to_numpy()))
+    if max_workers is None:
+        max_workers = TRAINING_WORKERS or os.cpu_count() or 1
+
+    started = time.perf_counter()
+    results = []
+    with span("backtest.run", engine=engine):
+        if max_workers <= 1 or len(jobs) <= 1:
+            for job in jobs:
+                results.append({**_fit_fold(*job), 'test_dates': job[3]})
+        else:
+            # spawn, not fork: the Streamlit server process is multi-threaded
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=min(max_workers, len(jobs)), mp_context=ctx) as pool:
+                futures = {pool.submit(_fit_fold, *job): job for job in jobs}
+                for future in as_completed(futures):
+                    job = futures[future]
+                    try:
+                        res = future.result()
+                    except Exception as e:
+                        # The worker process itself died (e.g. out of memory)
+                        res = {'ticker': job[0], 'cutoff': job[2]['Date'].iloc[-1],
+                               'error': f"{type(e).__name__}: {e}", 'seconds': 0.0}
+                    results.append({**res, 'test_dates': job[3]})
+    elapsed = time.perf_counter() - started
+
+    assets = {}
+    for ticker, df in frames.items():
+        mine = sorted((r for r in results if r['ticker'] == ticker), key=lambda r: r['cutoff'])
+        good = [r for r in mine if r['error'] is None]
+        for r in mine:
+            if r['error'] is not None:
+                log(f"{ticker} fold {r['cutoff']:%Y-%m-%d} failed: {r['error']}")
+        fits = {}
+        for r in good:
+            fits[r['fit']] = fits.get(r['fit'], 0) + 1
+        assets[ticker] = {
+            'name': TICKERS.get(ticker, ticker),
+            'folds': len(good),
+            'failed': len(mine) - len(good),
+            'cutoffs': [f"{r['cutoff']:%Y-%m-%d}" for r in good],
+            'fits': fits,
+            'fit_seconds': float(sum(r['seconds'] for r in mine)),
+            'interval_width': good[0]['interval_width'] if good else None,
+            'params': engine_params(ticker, engine),
+            'metrics': score(good, df, fx_frame, horizons, unit_factor),
+        }
+
+    meta = {
+        'created': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'engine': engine,
+        'horizons': list(horizons),
+        'step_days': step_days,
+        'workers': max_workers,
+        'seconds': elapsed,
+        'data_version': data_version(frames),
+        'history_end': max(f"{df['Date'].iloc[-1]:%Y-%m-%d}" for df in frames.values()),
+    }
+    return {'meta': meta, 'assets': assets}
+
+def _report_path(engine):
+    return os.path.join(BACKTEST_DIR, f"{engine}.json")
+
+def save_report(report):
+    """
+    Stores a report as the latest backtest of its engine (atomically, like the model artifacts).
+    """
+    os.makedirs(BACKTEST_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=BACKTEST_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(report, f, indent=2)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, _report_path(report['meta']['engine']))
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+def load_report(engine):
+    """
+    Returns the latest stored backtest report for an engine, or None.
+    """
+    try:
+        with open(_report_path(engine), "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def accuracy_summary(report, ticker, currency="INR", horizon=30):
+    """
+    One-line accuracy badge text for a ticker, e.g. "30-day MAPE 3.1% · 80% band hit 76% (8 folds)".
+    Returns None when the report has no metrics for it.
+    """
+    asset = (report or {}).get('assets', {}).get(ticker)
+    if not asset:
+        return None
+    metrics = asset['metrics'].get(currency, {}).get(str(horizon))
+    if metrics is None:
+        return None
+    width = asset.get('interval_width') or 0.8
+    return (f"{horizon}-day MAPE {metrics['mape']:.1f}% · {width:.0%} band hit {metrics['coverage']:.0f}% "
+            f"({asset['folds']} folds to {asset['cutoffs'][-1]})")
+
+def format_report(report):
+    """
+    Formats a report as a text table (asset, currency, horizon, MAE, MAPE, coverage).
+    """
+    meta = report['meta']
+    lines = [f"Backtest ({meta['engine']}, {meta['workers']} workers, {meta['seconds']:.1f}s)"]
+    for ticker, asset in report['assets'].items():
+        lines.append(f"{asset['name']} ({ticker}): {asset['folds']} folds, fits {asset['fits']}"
+                     + (f", {asset['failed']} failed" if asset['failed'] else ""))
+        for currency, by_horizon in asset['metrics'].items():
+            for h, m in by_horizon.items():
+                lines.append(f"  {currency} <= {h:>3}d  MAE {m['mae']:12.2f}  MAPE {m['mape']:6.2f}%  "
+                             f"coverage {m['coverage']:5.1f}%  (n={m['n']})")
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    import argparse
+    from market_data import fetch_histories
+
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the forecast models.")
+    parser.add_argument("--engine", default=None, help="Forecast engine (default: GOLD_APP_ENGINE)")
+    parser.add_argument("--start", default="2020-01-01", help="History start date")
+    parser.add_argument("--folds", type=int, default=DEFAULT_FOLDS)
+    parser.add_argument("--step", type=int, default=DEFAULT_STEP_DAYS, help="Days between fold cutoffs")
+    parser.add_argument("--horizons", type=int, nargs="+", default=list(HORIZONS))
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    histories = fetch_histories(list(TICKERS) + ["USDINR=X"], start_date=args.start)
+    for ticker, res in histories.items():
+        if isinstance(res, Exception):
+            raise SystemExit(f"Failed to load {ticker}: {res}")
+    fx = histories.pop("USDINR=X")
+    result = run_backtest(histories, fx, args.engine, tuple(sorted(args.horizons)), args.folds, args.step, args.workers)
+    save_report(result)
+    print(format_report(result))
+    print(f"Saved to {_report_path(result['meta']['engine'])}")
@@ -0,0 +1,159 @@
+import numpy as np
+import pandas as pd
+
+# Compact columnar OHLCV for intraday data: int64 epoch-second timestamps, float32 prices and
+# int32 volumes in contiguous arrays (28 bytes per bar, vs ~48 plus index overhead as a float64 frame).
+# float32 keeps ~7 significant digits, well below a tick for metal prices.
+
+PRICE_COLUMNS = ('Open', 'High', 'Low', 'Close')
+
+# Bar sizes understood by resample() (and the intraday store): suffix -> seconds
+_UNIT_SECONDS = {'m': 60, 'min': 60, 'h': 3600, 'd': 86400}
+
+def interval_seconds(interval):
+    """
+    Length of a bar size such as '1m', '5m', '15min', '1h' or '1d' in seconds.
+    """
+    for suffix in sorted(_UNIT_SECONDS, key=len, reverse=True):
+        if interval.endswith(suffix) and interval[:-len(suffix)].isdigit():
+            return int(interval[:-len(suffix)]) * _UNIT_SECONDS[suffix]
+    raise ValueError(f"Unsupported bar size '{interval}'")
+
+def _volume_dtype(volume):
+    return np.int32 if volume.size == 0 or volume.max() <= np.iinfo(np.int32).max else np.int64
+
+class Bars:
+    """
+    OHLCV bars as contiguous arrays, sorted by time.
+    Columns are read like a frame (bars['Close'], bars['Date']) but come back as numpy arrays;
+    slicing (bars[lo:hi], between()) returns views, never copies.
+    """
+    __slots__ = ('ts', 'open', 'high', 'low', 'close', 'volume', 'interval', '__weakref__')
+
+    def __init__(self, ts, open_, high, low, close, volume, interval):
+        self.ts = ts
+        self.open = open_
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.interval = interval
+
+    @classmethod
+    def from_arrays(cls, ts, open_, high, low, close, volume, interval):
+        """
+        Builds bars from any array-likes, downcasting to the compact dtypes.
+        Volume stays int32 unless a value does not fit (e.g. after resampling to coarse bars).
+        """
+        volume = np.nan_to_num(np.asarray(volume, dtype=np.float64)).round()
+        return cls(np.ascontiguousarray(ts, dtype=np.int64),
+                   *(np.ascontiguousarray(c, dtype=np.float32) for c in (open_, high, low, close)),
+                   np.ascontiguousarray(volume, dtype=_volume_dtype(volume)), interval)
+
+    @classmethod
+    def from_frame(cls, df, interval):
+        """
+        Converts a provider/store frame (Date, Open, High, Low, Close, Volume) into bars.
+        """
+        ts = pd.to_datetime(df['Date']).values.astype('datetime64[s]').astype(np.int64)
+        return cls.from_arrays(ts, df['Open'].to_numpy(), df['High'].to_numpy(), df['Low'].to_numpy(),
+                               df['Close'].to_numpy(), df['Volume'].to_numpy(), interval)
+
+    @classmethod
+    def empty_bars(cls, interval):
+        return cls.from_arrays([], [], [], [], [], [], interval)
+
+    def __len__(self):
+        return len(self.ts)
+
+    @property
+    def empty(self):
+        return len(self.ts) == 0
+
+    @property
+    def dates(self):
+        """
+        Bar times as datetime64[s] (a view of the timestamps, no copy).
+        """
+        return self.ts.view('datetime64[s]')
+
+    @property
+    def nbytes(self):
+        return sum(c.nbytes for c in (self.ts, self.open, self.high, self.low, self.close, self.volume))
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return Bars(self.ts[key], self.open[key], self.high[key], self.low[key],
+                        self.close[key], self.volume[key], self.interval)
+        if key == 'Date':
+            return self.dates
+        columns = {'Open': self.open, 'High': self.high, 'Low': self.low, 'Close': self.close, 'Volume': self.volume}
+        if key not in columns:
+            raise KeyError(key)
+        return columns[key]
+
+    def copy(self):
+        return Bars(self.ts.copy(), self.open.copy(), self.high.copy(), self.low.copy(),
+                    self.close.copy(), self.volume.copy(), self.interval)
+
+    def between(self, start=None, end=None):
+        """
+        Bars with start <= time < end (either bound optional), as a view.
+        """
+        lo = 0 if start is None else np.searchsorted(self.ts, _epoch(start))
+        hi = len(self.ts) if end is None else np.searchsorted(self.ts, _epoch(end))
+        return self[lo:hi]
+
+    def resample(self, interval):
+        """
+        Aggregates into coarser bars: first open, max high, min low, last close, summed volume.
+        Bars are aligned to multiples of the bar size since the epoch (days start at midnight).
+        Args:
+            interval (str): Target bar size, e.g. '15m', '1h', '1d'.
+        Returns:
+            Bars: New bars; self when the size is unchanged.
+        """
+        step = interval_seconds(interval)
+        if interval == self.interval or step == interval_seconds(self.interval):
+            return self
+        if step < interval_seconds(self.interval):
+            raise ValueError(f"Cannot resample {self.interval} bars to finer {interval} bars")
+        if self.empty:
+            return Bars.empty_bars(interval)
+
+        bucket = self.ts // step
+        starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+        ends = np.r_[starts[1:], len(bucket)]
+        return Bars.from_arrays(
+            bucket[starts] * step,
+            self.open[starts],
+            np.fmax.reduceat(self.high, starts),
+            np.fmin.reduceat(self.low, starts),
+            self.close[ends - 1],
+            np.add.reduceat(self.volume.astype(np.int64), starts),
+            interval,
+        )
+
+    def append(self, newer):
+        """
+        Returns bars extended with `newer`; stored bars at or after newer's first bar are replaced
+        (the latest bar keeps changing until it closes).
+        """
+        if newer.empty:
+            return self
+        keep = self[:np.searchsorted(self.ts, newer.ts[0])]
+        volume = np.concatenate([keep.volume.astype(np.int64), newer.volume.astype(np.int64)])
+        return Bars.from_arrays(*(np.concatenate([a, b]) for a, b in zip(
+            (keep.ts, keep.open, keep.high, keep.low, keep.close),
+            (newer.ts, newer.open, newer.high, newer.low, newer.close))), volume, self.interval)
+
+    def to_frame(self):
+        """
+        Full-precision DataFrame (Date, Open, High, Low, Close, Volume), for callers that need one.
+        """
+        return pd.DataFrame({'Date': self.dates.astype('datetime64[ns]'),
+                             **{c: self[c].astype(np.float64) for c in PRICE_COLUMNS},
+                             'Volume': self.volume.astype(np.int64)})
+
+def _epoch(when):
+    return pd.Timestamp(when).value // 10**9
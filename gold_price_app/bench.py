@@ -0,0 +1,283 @@
+import os
+import sys
+import gc
+import json
+import time
+import argparse
+import platform
+import tempfile
+import tracemalloc
+
+# Benchmarks run on generated data in a scratch cache, so they need no network and never
+# touch the real price store or model artifacts. Must be set before the app modules read config.
+os.environ.setdefault("GOLD_APP_CACHE_DIR", os.path.join(tempfile.gettempdir(), "gold_app_bench"))
+
+import numpy as np
+import pandas as pd
+
+# Performance benchmarks for the data / analytics / model pipeline:
+#   python bench.py --save baseline.json                 run everything, store the results
+#   python bench.py --compare baseline.json              run again and flag regressions
+#   python bench.py --compare old.json --against new.json   compare two stored runs
+#   python bench.py --sizes 1y 5y --stages convert_to_inr monthly_stats
+# Each stage is timed `--repeats` times (median reported) and run once more under tracemalloc for peak memory.
+
+# Daily series lengths (years) and intraday series (bar size, days)
+DAILY_SIZES = {'1y': 1, '5y': 5, '10y': 10, '30y': 30}
+INTRADAY_SIZES = {'5m-30d': ('5m', 30), '1m-30d': ('1m', 30)}
+
+# Training is skipped above this many rows (intraday sizes) unless --train-all is given
+MAX_TRAIN_ROWS = 20_000
+
+def make_series(size):
+    """
+    Returns (gold, usdinr) frames for a size label, generated by the synthetic provider.
+    """
+    from providers import SyntheticProvider
+    provider = SyntheticProvider()
+    origin = provider.ORIGIN
+    if size in DAILY_SIZES:
+        end = origin + pd.DateOffset(years=DAILY_SIZES[size]) - pd.Timedelta(days=1)
+        return (provider.history("GC=F", start=origin, end=end),
+                provider.history("USDINR=X", start=origin, end=end))
+    interval, days = INTRADAY_SIZES[size]
+    end = origin + pd.Timedelta(days=days)
+    # FX stays daily, like the app: intraday commodity bars are converted as-of the day's rate
+    return (provider.history("GC=F", start=origin, end=end, interval=interval),
+            provider.history("USDINR=X", start=origin - pd.Timedelta(days=7), end=end))
+
+def _chart_payload(df):
+    ts = (df['Date'].values.astype('datetime64[s]').astype(np.int64)).tolist()
+    return {'chart': {'error': None, 'result': [{
+        'meta': {'exchangeTimezoneName': 'UTC', 'dataGranularity': '1d'},
+        'timestamp': ts,
+        'indicators': {'quote': [{c.lower(): df[c].tolist() for c in ['Open', 'High', 'Low', 'Close', 'Volume']}]},
+    }]}}
+
+# --- Stages ---
+# Each stage is setup(ctx) -> callable; only the callable is timed. setup runs before every repeat,
+# so caches keyed on the frame (monthly tables, fitted models) start cold each time.
+
+def stage_parse_chart(ctx):
+    from fetcher import parse_chart
+    payload = json.loads(json.dumps(_chart_payload(ctx['gold'])))
+    return lambda: parse_chart(payload)
+
+def stage_load_store(ctx):
+    import price_store
+    from market_data import fetch_history
+    ticker = f"BENCH-{ctx['size']}"
+    if ctx.get('stored') != ticker:
+        price_store.write_prices(ticker, ctx['gold'], str(ctx['gold']['Date'].iloc[0].date()))
+        ctx['stored'] = ticker
+    start = str(ctx['gold']['Date'].iloc[0].date())
+    return lambda: fetch_history(ticker, start)
+
+def stage_convert_to_inr(ctx):
+    from data_loader import convert_to_inr
+    from config import UNITS
+    gold, fx = ctx['gold'], ctx['fx']
+    return lambda: convert_to_inr(gold, fx, UNITS['10g'])
+
+def stage_monthly_stats(ctx):
+    from analytics import get_monthly_stats
+    df = ctx['gold'].copy()
+    last = df['Date'].iloc[-1]
+    return lambda: get_monthly_stats(df, last.strftime('%B'), last.year)
+
+def stage_yearly_analysis(ctx):
+    from analytics import get_yearly_analysis
+    df = ctx['gold'].copy()
+    year = df['Date'].iloc[-1].year
+    return lambda: get_yearly_analysis(df, year)
+
+def _bars(ctx):
+    from bars import Bars
+    if 'bars' not in ctx:
+        interval = INTRADAY_SIZES[ctx['size']][0] if ctx['size'] in INTRADAY_SIZES else '1d'
+        ctx['bars'] = Bars.from_frame(ctx['gold'], interval)
+    return ctx['bars']
+
+def stage_resample_bars(ctx):
+    bars = _bars(ctx)
+    # Intraday bars to hourly, daily bars to weeks
+    target = '1h' if bars.interval != '1d' else '7d'
+    return lambda: bars.resample(target)
+
+def stage_monthly_stats_bars(ctx):
+    from analytics import get_monthly_stats
+    bars = _bars(ctx).copy()
+    last = ctx['gold']['Date'].iloc[-1]
+    return lambda: get_monthly_stats(bars, last.strftime('%B'), last.year)
+
+def stage_downsample(ctx):
+    from downsample import downsample_indices
+    x, y = ctx['gold']['Date'].values, ctx['gold']['Close'].to_numpy()
+    return lambda: downsample_indices(x, y)
+
+def stage_train_model(ctx):
+    import model_cache
+    from model import train_model
+    df, engine, model_dir = ctx['gold'], ctx['engine'], ctx['model_dir']
+    ticker = f"bench-{ctx['size']}"
+    
+    def fit():
+        # Emptying the run's scratch artifact folder first makes every repeat a cold fit
+        model_cache.evict(max_bytes=0, directory=model_dir)
+        return train_model(df, ticker=ticker, engine=engine, refresh=False, cache_dir=model_dir)
+    return fit
+
+def _trained(ctx):
+    from model import train_model
+    if 'model' not in ctx:
+        ctx['model'] = train_model(ctx['gold'], ticker=f"bench-{ctx['size']}", engine=ctx['engine'],
+                                   refresh=False, cache_dir=ctx['model_dir'])
+    return ctx['model']
+
+def stage_predict_future(ctx):
+    from model import predict_future
+    model = _trained(ctx)
+    model.__dict__.pop('in_sample_fit', None)
+    return lambda: predict_future(model, 365)
+
+def stage_predict_specific_date(ctx):
+    from model import predict_specific_date
+    model = _trained(ctx)
+    last = model.history['ds'].max()
+    # One date inside the forecast grid (array lookup) and one beyond it (model predict)
+    in_grid = str((last + pd.Timedelta(days=30)).date())
+    beyond = str((pd.Timestamp(model.forecast_grid['start']) + pd.DateOffset(years=7)).date())
+    return lambda: (predict_specific_date(model, in_grid), predict_specific_date(model, beyond))
+
+STAGES = {
+    'parse_chart': stage_parse_chart,
+    'load_store': stage_load_store,
+    'convert_to_inr': stage_convert_to_inr,
+    'monthly_stats': stage_monthly_stats,
+    'yearly_analysis': stage_yearly_analysis,
+    'resample_bars': stage_resample_bars,
+    'monthly_stats_bars': stage_monthly_stats_bars,
+    'downsample': stage_downsample,
+    'train_model': stage_train_model,
+    'predict_future': stage_predict_future,
+    'predict_specific_date': stage_predict_specific_date,
+}
+MODEL_STAGES = {'train_model', 'predict_future', 'predict_specific_date'}
+
+def measure(setup, ctx, repeats):
+    """
+    Returns:
+        dict: 'median_s', 'min_s' over the repeats and 'peak_bytes' allocated during one extra run.
+    """
+    times = []
+    for _ in range(repeats):
+        fn = setup(ctx)
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    fn = setup(ctx)
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'median_s': float(np.median(times)), 'min_s': float(np.min(times)), 'peak_bytes': int(peak)}
+
+def run(sizes, stages, repeats, engine=None, train_all=False, log=print):
+    """
+    Runs the selected stages on each size.
+    Returns:
+        dict: 'meta' (environment) and 'results' keyed "stage/size".
+    """
+    from model import DEFAULT_ENGINE
+    engine = engine or DEFAULT_ENGINE
+    results = {}
+    # Benchmark fits go to a folder of their own, removed after the run, and never record a
+    # ticker lineage, so they leave no artifacts or .latest pointers in the model cache
+    with tempfile.TemporaryDirectory(prefix="gold_app_bench_models-") as model_dir:
+        for size in sizes:
+            gold, fx = make_series(size)
+            ctx = {'size': size, 'gold': gold, 'fx': fx, 'engine': engine, 'model_dir': model_dir}
+            for name in stages:
+                if name in MODEL_STAGES and len(gold) > MAX_TRAIN_ROWS and not train_all:
+                    continue
+                # Fits are slow; the largest sizes get a single timed run
+                n = 1 if name == 'train_model' and len(gold) > 2000 else repeats
+                res = measure(STAGES[name], ctx, n)
+                res['rows'] = len(gold)
+                results[f"{name}/{size}"] = res
+                log(f"{name:<22} {size:>7} {len(gold):>7} rows  {res['median_s'] * 1000:10.2f} ms  "
+                    f"peak {res['peak_bytes'] / 2**20:8.2f} MiB")
+    meta = {
+        'created': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'engine': engine,
+        'repeats': repeats,
+    }
+    return {'meta': meta, 'results': results}
+
+def compare(baseline, current, threshold=0.25, min_seconds=0.001):
+    """
+    Compares two runs stage by stage.
+    A stage regresses when its median time (ignoring differences under min_seconds) or its
+    peak memory grows by more than `threshold` (0.25 = 25%).
+    Returns:
+        list: Report lines.
+        list: Keys of the regressed stages.
+    """
+    lines, regressed = [], []
+    for key in sorted(set(baseline['results']) & set(current['results'])):
+        old, new = baseline['results'][key], current['results'][key]
+        dt = new['median_s'] / old['median_s'] - 1 if old['median_s'] else 0.0
+        dm = new['peak_bytes'] / old['peak_bytes'] - 1 if old['peak_bytes'] else 0.0
+        slow = dt > threshold and new['median_s'] - old['median_s'] > min_seconds
+        heavy = dm > threshold
+        flag = "REGRESSION" if slow or heavy else ("faster" if dt < -threshold else "")
+        if slow or heavy:
+            regressed.append(key)
+        lines.append(f"{key:<32} {old['median_s'] * 1000:10.2f} -> {new['median_s'] * 1000:10.2f} ms ({dt:+7.1%})  "
+                     f"mem {dm:+7.1%}  {flag}")
+    skipped = set(baseline['results']) - set(current['results'])
+    if skipped:
+        lines.append(f"({len(skipped)} baseline stages not in the current run)")
+    return lines, regressed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark data loading, conversion, analytics, training and prediction.")
+    parser.add_argument("--sizes", nargs="+", default=list(DAILY_SIZES) + list(INTRADAY_SIZES),
+                        choices=list(DAILY_SIZES) + list(INTRADAY_SIZES))
+    parser.add_argument("--stages", nargs="+", default=list(STAGES), choices=list(STAGES))
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--engine", default=None, help="Forecast engine (default: GOLD_APP_ENGINE)")
+    parser.add_argument("--train-all", action="store_true", help="Also train on intraday sizes")
+    parser.add_argument("--save", default=None, help="Write the results to this JSON file")
+    parser.add_argument("--compare", default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--against", default=None, help="Stored run to compare instead of running now")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Relative slowdown counted as a regression")
+    args = parser.parse_args()
+
+    if args.against:
+        with open(args.against) as f:
+            current = json.load(f)
+    else:
+        current = run(args.sizes, args.stages, args.repeats, args.engine, args.train_all)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"Saved {len(current['results'])} results to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        lines, regressed = compare(baseline, current, args.threshold)
+        print("\n".join(lines))
+        if regressed:
+            print(f"{len(regressed)} regression(s) above {args.threshold:.0%}: {', '.join(regressed)}")
+            sys.exit(1)
+        print("No regressions.")
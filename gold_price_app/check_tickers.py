@@ -1,17 +1,20 @@
-import yfinance as yf
+from providers import get_provider
 
 def check_tickers():
+    # Goes through the configured provider, so GOLD_APP_PROVIDER=replay/synthetic works offline
+    provider = get_provider()
+
     print("Checking GC=F (Gold Futures)...")
-    gc = yf.download("GC=F", period="5d")
-    print(gc['Close'].tail())
+    gc = provider.history("GC=F", period="5d")
+    print(gc[['Date', 'Close']].tail())
 
     print("\nChecking SI=F (Silver Futures)...")
-    si = yf.download("SI=F", period="5d")
-    print(si['Close'].tail())
+    si = provider.history("SI=F", period="5d")
+    print(si[['Date', 'Close']].tail())
     
     print("\nChecking GLD (SPDR Gold Shares)...")
-    gld = yf.download("GLD", period="5d")
-    print(gld['Close'].tail())
+    gld = provider.history("GLD", period="5d")
+    print(gld[['Date', 'Close']].tail())
 
 if __name__ == "__main__":
     check_tickers()
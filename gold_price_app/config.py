@@ -0,0 +1,88 @@
+import os
+
+# Root folder for everything the app persists between runs (price store, model artifacts, ...).
+# Override with GOLD_APP_CACHE_DIR, e.g. to point several workers at a shared volume.
+CACHE_DIR = os.environ.get(
+    "GOLD_APP_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"),
+)
+
+# Where market data comes from: 'live' (Yahoo), 'replay' (recorded Parquet snapshots) or 'synthetic'
+DATA_PROVIDER = os.environ.get("GOLD_APP_PROVIDER", "live")
+
+# Recorded snapshots served by the replay provider (one <ticker>.parquet per ticker)
+REPLAY_DIR = os.environ.get("GOLD_APP_REPLAY_DIR", os.path.join(CACHE_DIR, "snapshots"))
+
+# Seed of the synthetic provider (same seed = same series)
+SYNTHETIC_SEED = int(os.environ.get("GOLD_APP_SYNTHETIC_SEED", "42"))
+
+# Per-ticker OHLCV history (Arrow IPC files); offline providers get their own folder so
+# replayed or generated data never mixes with live history
+PRICE_DIR = os.path.join(CACHE_DIR, "prices" if DATA_PROVIDER == "live" else f"prices-{DATA_PROVIDER}")
+
+# Serialized fitted models keyed by training-data fingerprint
+MODEL_DIR = os.path.join(CACHE_DIR, "models")
+
+# Artifacts of backtest and tuning fold fits: a separate folder with its own size budget,
+# so a search never evicts the production models from MODEL_DIR
+FOLD_MODEL_DIR = os.path.join(CACHE_DIR, "models-folds")
+
+# Walk-forward backtest reports (one JSON artifact per engine, read by the UI's accuracy badges)
+BACKTEST_DIR = os.path.join(CACHE_DIR, "backtests")
+
+# Hyperparameter search results: per-asset winning engine parameters (picked up by train_model) and cached scores
+TUNING_DIR = os.path.join(CACHE_DIR, "tuning")
+
+# Tradable assets the app knows about (display name -> Yahoo ticker)
+METALS = {
+    "Gold": "GC=F",
+    "Silver": "SI=F",
+    "Platinum": "PL=F",
+    "Palladium": "PA=F",
+}
+FX_PAIRS = {
+    "USDINR": "USDINR=X",
+}
+
+# Yahoo FX tickers quoting units of each currency per 1 USD (USD itself needs no conversion)
+CURRENCY_TICKERS = {
+    "USD": None,
+    "INR": "USDINR=X",
+    "EUR": "EUR=X",
+    "AED": "AED=X",
+}
+
+# Worker processes used to fetch and train assets concurrently (0 = one per asset, capped at CPU count)
+TRAINING_WORKERS = int(os.environ.get("GOLD_APP_TRAINING_WORKERS", "0"))
+
+# Weight units relative to the troy ounce futures are quoted in (1 oz = 31.1035 g)
+TROY_OUNCE_GRAMS = 31.1035
+UNITS = {
+    "oz": 1.0,
+    "g": 1 / TROY_OUNCE_GRAMS,
+    "10g": 10 / TROY_OUNCE_GRAMS,
+    "kg": 1000 / TROY_OUNCE_GRAMS,
+}
+
+# Precomputed asset x currency x unit x year x month statistics, stored next to the price files
+CUBE_PATH = os.path.join(PRICE_DIR, "aggregate_cube.npz")
+
+# An FX quote may be carried forward to later commodity dates for at most this many days
+# (covers weekends/holidays when the two markets trade on different calendars)
+FX_MAX_STALENESS_DAYS = 5
+
+# Latest quotes are refreshed in the background this often, and a cached quote older than
+# QUOTE_TTL_SECONDS is reported as stale (pages then fall back to the last daily close)
+QUOTE_POLL_SECONDS = float(os.environ.get("GOLD_APP_QUOTE_POLL_SECONDS", "60"))
+QUOTE_TTL_SECONDS = float(os.environ.get("GOLD_APP_QUOTE_TTL_SECONDS", "300"))
+
+# Charts are downsampled server-side to at most this many points per trace before they are sent to
+# the browser; 'lttb' keeps the shape of a line, 'minmax' keeps every bucket's extremes
+CHART_POINT_BUDGET = int(os.environ.get("GOLD_APP_CHART_POINTS", "1500"))
+CHART_DOWNSAMPLE = os.environ.get("GOLD_APP_CHART_DOWNSAMPLE", "lttb")
+
+# Intraday bars are kept as compact columnar arrays (see bars.py) at this bar size and resampled
+# to coarser sizes on the fly; a first load fetches this many days back (Yahoo serves about
+# 7 days of 1m and 60 days of 5m bars; stored bars accumulate beyond that)
+INTRADAY_INTERVAL = os.environ.get("GOLD_APP_INTRADAY_INTERVAL", "5m")
+INTRADAY_LOOKBACK_DAYS = {"1m": 7, "2m": 59, "5m": 59, "15m": 59, "30m": 59, "60m": 729, "1h": 729}
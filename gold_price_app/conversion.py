@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+
+from config import UNITS, FX_MAX_STALENESS_DAYS
+from alignment import align_asof
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+
+class ConversionEngine:
+    """
+    Converts USD/oz commodity prices into other currencies and weight units.
+    Each commodity is aligned (as-of) with all FX series once; every requested currency x unit
+    combination then comes out of one broadcast multiply, and the resulting frames are
+    cached by (asset, currency, unit, data version).
+    """
+    
+    def __init__(self, fx_frames, max_staleness_days=FX_MAX_STALENESS_DAYS):
+        """
+        Args:
+            fx_frames (dict): Currency code -> DataFrame with 'Date' and 'Close' (currency per USD).
+                              'USD' needs no entry.
+            max_staleness_days (int): Oldest FX quote carried forward to a commodity date.
+        """
+        self.fx_frames = fx_frames
+        self.max_staleness_days = max_staleness_days
+        self.coverage = {}
+        self._cache = {}
+    
+    def _rates(self, asset, dates, currencies):
+        """
+        Returns an (n, currency) array of FX rates aligned onto dates (NaN where no usable quote),
+        and records the alignment coverage per (asset, currency).
+        """
+        fx = {c: (self.fx_frames[c]['Date'].values, self.fx_frames[c]['Close'].to_numpy())
+              for c in currencies if c != 'USD'}
+        aligned, coverage = align_asof(dates, fx, self.max_staleness_days)
+        for currency, cov in coverage.items():
+            self.coverage[(asset, currency)] = cov
+        return np.column_stack([aligned[c] if c != 'USD' else np.ones(len(dates)) for c in currencies])
+    
+    def convert(self, asset, df, currencies, units, version):
+        """
+        Converts one commodity into every requested currency and unit.
+        Args:
+            asset (str): Asset key (e.g. ticker) used in the cache key.
+            df (pd.DataFrame): USD/oz OHLCV data sorted by Date.
+            currencies (list): Currency codes (keys of fx_frames, or 'USD').
+            units (list): Unit names (keys of config.UNITS).
+            version (str): Data version; results cached under an older version are dropped.
+        Returns:
+            dict: (currency, unit) -> DataFrame with Date, Open, High, Low, Close, Volume,
+                  dropping only the days with no FX quote within the staleness limit.
+        """
+        wanted = [(c, u) for c in currencies for u in units]
+        missing = [(c, u) for c, u in wanted if (asset, c, u, version) not in self._cache]
+        
+        if missing:
+            # Forget results computed from older data for this asset
+            for key in [k for k in self._cache if k[0] == asset and k[3] != version]:
+                del self._cache[key]
+            
+            miss_currencies = list(dict.fromkeys(c for c, _ in missing))
+            miss_units = list(dict.fromkeys(u for _, u in missing))
+            
+            dates = df['Date'].values
+            prices = df[PRICE_COLUMNS].to_numpy(dtype=np.float64)
+            rates = self._rates(asset, dates, miss_currencies)
+            factors = np.array([UNITS[u] for u in miss_units])
+            
+            # (rows, currency, unit, OHLC) in one broadcast
+            converted = prices[:, None, None, :] * rates[:, :, None, None] * factors[None, None, :, None]
+            volume = df['Volume'].to_numpy() if 'Volume' in df else np.full(len(df), np.nan)
+            
+            for ci, currency in enumerate(miss_currencies):
+                keep = ~np.isnan(rates[:, ci])
+                for ui, unit in enumerate(miss_units):
+                    if (currency, unit) not in missing:
+                        continue
+                    block = converted[keep, ci, ui, :]
+                    frame = pd.DataFrame({'Date': dates[keep]})
+                    for j, col in enumerate(PRICE_COLUMNS):
+                        frame[col] = block[:, j]
+                    frame['Volume'] = volume[keep]
+                    self._cache[(asset, currency, unit, version)] = frame
+        
+        return {(c, u): self._cache[(asset, c, u, version)] for c, u in wanted}
+    
+    def get(self, asset, df, currency, unit, version):
+        """
+        Returns a single converted frame (see convert).
+        """
+        return self.convert(asset, df, [currency], [unit], version)[(currency, unit)]
+
+def add_fx_columns(forecast, fx_frame, unit_factor=1.0, suffix='_inr', latest_rate=None):
+    """
+    Adds converted yhat/yhat_lower/yhat_upper columns to a forecast.
+    Each forecast date uses the latest FX quote on or before it, so in-sample rows get the
+    historical rate and future rows the most recent one.
+    Args:
+        forecast (pd.DataFrame): Forecast with 'ds', 'yhat', 'yhat_lower', 'yhat_upper'.
+        fx_frame (pd.DataFrame): Rates with 'Date' and 'Close'.
+        unit_factor (float): Multiplier for unit conversion (e.g., oz -> 1g).
+        suffix (str): Suffix of the new columns.
+        latest_rate (float): Live quote used for dates after the last row of fx_frame (optional).
+    Returns:
+        pd.DataFrame: The forecast with the new columns (modified in place and returned).
+    """
+    # as-of needs sorted dates; batch frames hold several tickers, so align on the sorted unique dates
+    ds = forecast['ds'].values
+    unique_ds = np.unique(ds)
+    aligned, _ = align_asof(unique_ds, {'fx': (fx_frame['Date'].values, fx_frame['Close'].to_numpy())})
+    rate = aligned['fx'][np.searchsorted(unique_ds, ds)]
+    if latest_rate is not None:
+        rate = np.where(ds > fx_frame['Date'].values[-1], latest_rate, rate)
+    rate = rate * unit_factor
+    
+    for col in ('yhat', 'yhat_lower', 'yhat_upper'):
+        forecast[col + suffix] = forecast[col].to_numpy() * rate
+    return forecast
+
+def convert_closes(dates, close, fx_frame, unit_factor=1.0, max_staleness_days=FX_MAX_STALENESS_DAYS):
+    """
+    Converts a bare price array (e.g. intraday Bars closes) with the as-of FX rate of each date.
+    Args:
+        dates (array): Sorted datetime64 dates.
+        close (array): USD/oz prices.
+        fx_frame (pd.DataFrame): Rates with 'Date' and 'Close'.
+        unit_factor (float): Multiplier for unit conversion.
+    Returns:
+        np.ndarray: Converted prices (NaN where no FX quote within the staleness limit).
+    """
+    aligned, _ = align_asof(dates, {'fx': (fx_frame['Date'].values, fx_frame['Close'].to_numpy())}, max_staleness_days)
+    return close * (aligned['fx'] * unit_factor)
@@ -0,0 +1,216 @@
+import os
+import json
+import hashlib
+import tempfile
+import calendar
+import numpy as np
+import pandas as pd
+
+from config import UNITS, CUBE_PATH
+from analytics import build_monthly_table
+from conversion import ConversionEngine
+from instrumentation import instrumented
+
+# Stored per (asset, currency, unit, year, month); 'Rows' is the number of bars behind the month (0 = no data)
+FIELDS = ('Start', 'End', 'Change', 'Highest', 'Lowest', 'Rows')
+
+def data_version(frames):
+    """
+    Cheap fingerprint of a set of price frames (row count, date range and last close per ticker).
+    Args:
+        frames (dict): ticker -> DataFrame with 'Date' and 'Close'.
+    Returns:
+        str: Hex digest that changes whenever any frame gains, loses or revises rows at its end.
+    """
+    h = hashlib.sha256()
+    for ticker in sorted(frames):
+        df = frames[ticker]
+        if df.empty:
+            h.update(f"{ticker}:empty".encode())
+            continue
+        h.update(f"{ticker}:{len(df)}:{df['Date'].iloc[0]}:{df['Date'].iloc[-1]}:{df['Close'].iloc[-1]!r}".encode())
+    return h.hexdigest()
+
+@instrumented("cube.build")
+def build_cube(frames, fx_frames, currencies=('USD', 'INR'), units=None, engine=None):
+    """
+    Materializes monthly statistics for every asset / currency / unit combination.
+    Args:
+        frames (dict): Asset ticker -> USD OHLCV DataFrame.
+        fx_frames (dict): Currency code -> rates frame ('Date', 'Close'), e.g. {'INR': df_usdinr}.
+        currencies (tuple): Currencies to include ('USD' plus keys of fx_frames).
+        units (dict): Unit name -> factor relative to a troy ounce (default config.UNITS).
+        engine (ConversionEngine): Engine to convert with (shares its cache with the caller).
+    Returns:
+        dict: 'values' array shaped (asset, currency, unit, year, month, field) plus the labels of each axis.
+    """
+    units = UNITS if units is None else units
+    assets = list(frames)
+    unit_names = list(units)
+    unit_factors = np.array([units[u] for u in unit_names])
+    
+    engine = engine or ConversionEngine(fx_frames)
+    version = data_version({**frames, **{f"fx:{c}": df for c, df in fx_frames.items()}})
+    
+    # Tables are built per ounce; other units are scaled below
+    tables = {}
+    for asset in assets:
+        converted = engine.convert(asset, frames[asset], list(currencies), ['oz'], version)
+        for currency in currencies:
+            tables[(asset, currency)] = build_monthly_table(converted[(currency, 'oz')])
+    
+    all_years = sorted({int(y) for t in tables.values() for y in t['Year']})
+    years = np.array(all_years, dtype=np.int64)
+    values = np.full((len(assets), len(currencies), len(unit_names), len(years), 12, len(FIELDS)), np.nan)
+    values[..., FIELDS.index('Rows')] = 0
+    
+    for (asset, currency), table in tables.items():
+        if table.empty:
+            continue
+        a, c = assets.index(asset), currencies.index(currency)
+        y_idx = np.searchsorted(years, table['Year'].to_numpy())
+        m_idx = table['Month'].to_numpy() - 1
+        fields = table[list(FIELDS)].to_numpy(dtype=np.float64)
+        
+        # Units are a pure scale factor, so every unit comes out of one broadcast multiply
+        scale = np.ones((len(unit_names), 1, len(FIELDS)))
+        scale[:, :, :-1] = unit_factors[:, None, None]
+        values[a, c, :, y_idx, m_idx, :] = (fields[None, :, :] * scale).transpose(1, 0, 2)
+    
+    return {
+        'values': values,
+        'assets': assets,
+        'currencies': list(currencies),
+        'units': unit_names,
+        'years': years,
+        'version': version,
+    }
+
+def save_cube(cube, path=CUBE_PATH):
+    """
+    Persists the cube as a single .npz file (written to a temp file and swapped in).
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    labels = {k: cube[k] for k in ('assets', 'currencies', 'units', 'version')}
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".npz")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, values=cube['values'], years=cube['years'], labels=np.array(json.dumps(labels)))
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+def load_cube(path=CUBE_PATH):
+    """
+    Loads a persisted cube, or returns None if there is none (or it is unreadable).
+    """
+    try:
+        with np.load(path) as data:
+            labels = json.loads(str(data['labels']))
+            return {'values': data['values'], 'years': data['years'], **labels}
+    except (FileNotFoundError, OSError, ValueError, KeyError):
+        return None
+
+def get_cube(frames, fx_frames, currencies=('USD', 'INR'), units=None, path=CUBE_PATH, engine=None):
+    """
+    Returns the cube for the given data, loading the persisted one if it was built from the
+    same data version and the same axes, and rebuilding (and persisting) it otherwise.
+    """
+    units = UNITS if units is None else units
+    version = data_version({**frames, **{f"fx:{c}": df for c, df in fx_frames.items()}})
+    cube = load_cube(path)
+    if (cube is not None and cube['version'] == version and cube['assets'] == list(frames)
+            and cube['currencies'] == list(currencies) and cube['units'] == list(units)):
+        return cube
+    
+    cube = build_cube(frames, fx_frames, currencies, units, engine)
+    save_cube(cube, path)
+    return cube
+
+def _cell(cube, asset, currency, unit, year):
+    """
+    Returns the (12, field) block for one asset / currency / unit / year, or None if the year is not covered.
+    """
+    years = cube['years']
+    y = int(np.searchsorted(years, year))
+    if y >= len(years) or years[y] != year:
+        return None
+    return cube['values'][cube['assets'].index(asset), cube['currencies'].index(currency), cube['units'].index(unit), y]
+
+def cube_monthly_stats(cube, asset, currency, unit, month, year):
+    """
+    Same stats dict as analytics.get_monthly_stats, read straight from the cube.
+    Args:
+        month (str): Month name (e.g., 'January').
+    Returns:
+        dict: Stats, or None if there is no data for that month.
+    """
+    block = _cell(cube, asset, currency, unit, year)
+    month_num = list(calendar.month_name).index(month)
+    if block is None or block[month_num - 1, FIELDS.index('Rows')] == 0:
+        return None
+    
+    row = dict(zip(FIELDS, block[month_num - 1]))
+    return {
+        'start_price': row['Start'],
+        'end_price': row['End'],
+        'change': row['Change'],
+        'highest': row['Highest'],
+        'lowest': row['Lowest'],
+        'trend': "Uptrend" if row['Change'] > 0 else "Downtrend"
+    }
+
+def cube_yearly_analysis(cube, asset, currency, unit, year):
+    """
+    Same output as analytics.get_yearly_analysis, read straight from the cube.
+    Returns:
+        pd.DataFrame: 'Month', 'Change', 'Highest', 'Lowest' for the months with data.
+        dict: Best and Worst performing months.
+    """
+    block = _cell(cube, asset, currency, unit, year)
+    if block is None:
+        return pd.DataFrame(), {}
+    
+    present = np.flatnonzero(block[:, FIELDS.index('Rows')] > 0)
+    if len(present) == 0:
+        return pd.DataFrame(), {}
+    
+    results_df = pd.DataFrame({
+        'Month': [calendar.month_name[m + 1] for m in present],
+        'Change': block[present, FIELDS.index('Change')],
+        'Highest': block[present, FIELDS.index('Highest')],
+        'Lowest': block[present, FIELDS.index('Lowest')],
+    })
+    
+    change = results_df['Change'].to_numpy()
+    if np.isnan(change).all():
+        # Months with rows but no usable closes: nothing to rank
+        return pd.DataFrame(), {}
+    best = int(np.nanargmax(change))
+    worst = int(np.nanargmin(change))
+    summary = {
+        'best_month': results_df['Month'].iloc[best],
+        'best_change': results_df['Change'].iloc[best],
+        'worst_month': results_df['Month'].iloc[worst],
+        'worst_change': results_df['Change'].iloc[worst]
+    }
+    return results_df, summary
+
+def compare_years(cube, asset, currency, unit, years, field='Change'):
+    """
+    Side-by-side monthly values of one field for several years.
+    Returns:
+        pd.DataFrame: Index = month names, one column per year (NaN where a month has no data).
+    """
+    columns = {}
+    for year in years:
+        block = _cell(cube, asset, currency, unit, year)
+        if block is None:
+            columns[year] = np.full(12, np.nan)
+            continue
+        col = block[:, FIELDS.index(field)].copy()
+        col[block[:, FIELDS.index('Rows')] == 0] = np.nan
+        columns[year] = col
+    return pd.DataFrame(columns, index=list(calendar.month_name)[1:])
@@ -1,8 +1,17 @@
-import yfinance as yf
 import streamlit as st
 import pandas as pd
+import numpy as np
 
-@st.cache_data
+from providers import get_provider
+from quotes import get_quote
+from alignment import align_frames
+from config import FX_MAX_STALENESS_DAYS
+from instrumentation import instrumented
+# Store-backed loaders live in market_data (no Streamlit); re-exported for the app and older callers
+from market_data import fetch_history, fetch_histories, fetch_intraday, read_history
+
+# cache_resource, not cache_data: every session gets the same read-only frame instead of an unpickled copy
+@st.cache_resource
 def load_data(ticker, start_date="2020-01-01"):
     """
     Fetches historical data for the given ticker from a specific start date.
@@ -10,40 +19,47 @@ def load_data(ticker, start_date="2020-01-01"):
         ticker (str): Ticker symbol.
         start_date (str): Start date in 'YYYY-MM-DD' format.
     Returns:
-        pd.DataFrame: DataFrame with Date, Open, High, Low, Close, Volume.
+        pd.DataFrame: DataFrame with Date, Open, High, Low, Close, Volume. Read-only: the frame is
+                      shared by every session and its columns are views of the price store, so
+                      in-place writes (df.loc[i, 'Close'] = x) raise ValueError rather than copy.
+                      Call .copy() before modifying it.
     """
     try:
-        data = yf.download(ticker, start=start_date)
-        
-        # Flatten MultiIndex columns if present (common with recent yfinance versions)
-        if isinstance(data.columns, pd.MultiIndex):
-            data.columns = data.columns.get_level_values(0)
-            
-        data.reset_index(inplace=True)
-        
-        # Ensure Date is datetime
-        data['Date'] = pd.to_datetime(data['Date']).dt.tz_localize(None)
-        
-        return data
+        return fetch_history(ticker, start_date)
     except Exception as e:
         st.error(f"Error loading data for {ticker}: {e}")
         return pd.DataFrame()
 
 def get_latest_price(ticker):
     """
-    Fetches the single latest price for a ticker.
+    Returns the single latest price for a ticker.
+    A fresh quote from the background poller is served from memory; otherwise it is downloaded.
     """
-    data = yf.download(ticker, period="1d")
-    if isinstance(data.columns, pd.MultiIndex):
-        data.columns = data.columns.get_level_values(0)
+    quote = get_quote(ticker)
+    if quote is not None and not quote['stale']:
+        return quote['price']
+    return get_provider().latest(ticker)
+
+def get_latest_prices(tickers):
+    """
+    Returns the latest price for several tickers; those without a fresh polled quote are fetched concurrently.
+    Returns:
+        dict: Ticker -> latest close (None if unavailable).
+    """
+    quotes = {ticker: get_quote(ticker) for ticker in tickers}
+    prices = {ticker: q['price'] for ticker, q in quotes.items() if q is not None and not q['stale']}
     
-    if not data.empty:
-        return data['Close'].iloc[-1]
-    return None
+    fetched = get_provider().history_many({ticker: {'period': "1d"} for ticker in tickers if ticker not in prices})
+    prices.update({ticker: (None if isinstance(data, Exception) or data.empty else data['Close'].iloc[-1])
+                   for ticker, data in fetched.items()})
+    return {ticker: prices[ticker] for ticker in tickers}
 
+@instrumented("data.convert_to_inr")
 def convert_to_inr(df_commodity, df_currency, unit_factor=1.0):
     """
     Converts commodity price (USD) to INR based on daily exchange rate.
+    Commodity and FX markets trade on different calendars, so each commodity date uses the
+    latest USDINR quote on or before it (at most FX_MAX_STALENESS_DAYS old).
     Args:
         df_commodity (pd.DataFrame): Data with 'Close' in USD.
         df_currency (pd.DataFrame): Data with 'Close' as USDINR rate.
@@ -51,16 +67,14 @@ def convert_to_inr(df_commodity, df_currency, unit_factor=1.0):
     Returns:
         pd.DataFrame: DataFrame with 'Close' converted to INR.
     """
-    # Merge on Date
-    df_merged = pd.merge(df_commodity, df_currency[['Date', 'Close']], on='Date', how='inner', suffixes=('', '_INR'))
+    aligned, _ = align_frames(df_commodity, {'INR': df_currency}, max_staleness=FX_MAX_STALENESS_DAYS)
+    rate = aligned['INR']
+    keep = ~np.isnan(rate)
     
     # Calculate INR Price: Price(USD) * Exchange Rate * Unit Factor
-    df_merged['Close'] = df_merged['Close'] * df_merged['Close_INR'] * unit_factor
-    
-    # Update High/Low if available (Assuming proportional change for simplicity in this scope)
-    if 'High' in df_merged.columns:
-        df_merged['High'] = df_merged['High'] * df_merged['Close_INR'] * unit_factor
-    if 'Low' in df_merged.columns:
-        df_merged['Low'] = df_merged['Low'] * df_merged['Close_INR'] * unit_factor
+    df_converted = df_commodity.loc[keep, ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']].reset_index(drop=True)
+    factor = rate[keep] * unit_factor
+    for col in ['Open', 'High', 'Low', 'Close']:
+        df_converted[col] = df_converted[col].to_numpy() * factor
         
-    return df_merged[['Date', 'Open', 'High', 'Low', 'Close', 'Volume']]
+    return df_converted
@@ -1,13 +1,15 @@
 
-import yfinance as yf
+from providers import get_provider
 import pandas as pd
 import streamlit as st
 import plotly.graph_objs as go
 from prophet import Prophet
 
 def test_load():
-    print("Downloading data...")
-    data = yf.download("GC=F", period="5y")
+    # Goes through the configured provider (yfinance when live), so GOLD_APP_PROVIDER=replay/synthetic works offline
+    provider = get_provider()
+    print(f"Downloading data ({provider.name} provider)...")
+    data = provider.history("GC=F", period="5y")
     print("\n--- Raw Data Info ---")
     print(data.head())
     print("\nColumns:", data.columns)
@@ -18,7 +20,8 @@ def test_load():
         data.columns = data.columns.get_level_values(0)
         print("New Columns:", data.columns)
     
-    data.reset_index(inplace=True)
+    if 'Date' not in data.columns:
+        data.reset_index(inplace=True)
     print("\n--- Processed Data Info ---")
     print(data.head())
     print(data.iloc[-1])
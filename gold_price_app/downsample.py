@@ -0,0 +1,157 @@
+import threading
+import numpy as np
+
+from config import CHART_POINT_BUDGET, CHART_DOWNSAMPLE
+from instrumentation import span
+
+# Server-side downsampling of chart series, so Plotly payloads stay bounded however long the series is.
+#   lttb   Largest-Triangle-Three-Buckets: keeps the points that preserve the visual shape of a line
+#   minmax the lowest and highest point of every bucket: keeps every spike, for bars/ranges
+# Selected indices are cached by (series key, data version, budget, method).
+
+METHODS = ("lttb", "minmax")
+
+_cache = {}
+_lock = threading.Lock()
+
+def _as_float(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+    return x.astype(np.float64)
+
+def lttb_indices(x, y, budget):
+    """
+    Largest-Triangle-Three-Buckets selection.
+    Args:
+        x (array): Sorted numeric or datetime64 positions.
+        y (array): Values.
+        budget (int): Number of points to keep (at least 3).
+    Returns:
+        np.ndarray: Sorted indices of the kept points (first and last always included).
+    """
+    n = len(y)
+    if budget >= n or budget < 3:
+        return np.arange(n)
+    x = _as_float(x)
+    y = np.asarray(y, dtype=np.float64)
+    # Interior points split into budget - 2 buckets; the first and last points are always kept
+    edges = np.linspace(1, n - 1, budget - 1).astype(np.int64)
+    # Average of each bucket, used as the third triangle corner for the bucket before it
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(np.nan_to_num(y[1:n - 1]), edges[:-1] - 1)
+    counts = np.diff(edges)
+    avg_x = np.append(sums_x / counts, x[-1])
+    avg_y = np.append(sums_y / counts, y[-1] if np.isfinite(y[-1]) else 0.0)
+
+    keep = np.empty(budget, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for b in range(budget - 2):
+        lo, hi = edges[b], edges[b + 1]
+        # Twice the triangle area (previous kept point, candidate, next bucket's average)
+        area = np.abs((x[a] - avg_x[b + 1]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y[b + 1] - y[a]))
+        a = lo + int(np.nanargmax(area)) if np.isfinite(area).any() else lo
+        keep[b + 1] = a
+    return keep
+
+def minmax_indices(x, y, budget):
+    """
+    Lowest and highest point of each of budget // 2 equal-count buckets.
+    Returns:
+        np.ndarray: Sorted, unique indices (first and last always included).
+    """
+    n = len(y)
+    if budget >= n or budget < 4:
+        return np.arange(n)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(0, n, budget // 2 + 1).astype(np.int64)
+    starts = edges[:-1]
+    # Bucket-wise argmin/argmax via a sort on (bucket, value)
+    bucket = np.repeat(np.arange(len(starts)), np.diff(edges))
+    filled = np.where(np.isnan(y), np.nanmean(y) if np.isfinite(y).any() else 0.0, y)
+    order = np.lexsort((filled, bucket))
+    lows = order[starts]
+    highs = order[edges[1:] - 1]
+    return np.unique(np.concatenate([[0, n - 1], lows, highs]))
+
+_METHODS = {"lttb": lttb_indices, "minmax": minmax_indices}
+
+def downsample_indices(x, y, budget=None, method=None, key=None, version=None):
+    """
+    Indices of the points to draw for one series.
+    Args:
+        x, y (array): Series to reduce.
+        budget (int): Maximum points (default config.CHART_POINT_BUDGET).
+        method (str): 'lttb' or 'minmax' (default config.CHART_DOWNSAMPLE).
+        key (hashable): Identifies the series in the cache; with version set, the selection is reused
+                        until the version changes. Without a key nothing is cached.
+        version (hashable): Data version of the series.
+    Returns:
+        np.ndarray: Sorted indices (all of them when the series fits the budget).
+    """
+    budget = budget or CHART_POINT_BUDGET
+    method = method or CHART_DOWNSAMPLE
+    if method not in _METHODS:
+        raise ValueError(f"Unknown downsampling method {method!r} (expected one of {METHODS})")
+    n = len(y)
+    if n <= budget:
+        return np.arange(n)
+
+    cache_key = (key, version, n, budget, method)
+    if key is not None:
+        with _lock:
+            hit = _cache.get(cache_key)
+        if hit is not None:
+            return hit
+
+    with span("chart.downsample", method=method):
+        idx = _METHODS[method](x, y, budget)
+
+    if key is not None:
+        with _lock:
+            # Forget selections computed from older data for this series
+            for old in [k for k in _cache if k[0] == key and k[1:] != cache_key[1:]]:
+                del _cache[old]
+            _cache[cache_key] = idx
+    return idx
+
+def downsample_figure(fig, budget=None, method=None, version=None):
+    """
+    Reduces every x/y trace of a Plotly figure to at most `budget` points, in place.
+    Traces are cached by (trace name, version); bars and traces already within budget are left alone.
+    Traces tagged with the same meta={'downsample_group': ...} (a forecast line and its band edges,
+    drawn with fill='tonexty') share one selection, chosen from the group's last trace, so the band
+    edges keep the same x points.
+    Returns:
+        The figure.
+    """
+    limit = budget or CHART_POINT_BUDGET
+    groups = {}
+    for i, trace in enumerate(fig.data):
+        if trace.type not in ("scatter", "scattergl") or trace.x is None or trace.y is None:
+            continue
+        if len(trace.y) <= limit:
+            continue
+        meta = trace.meta if isinstance(trace.meta, dict) else {}
+        group = meta.get('downsample_group')
+        groups.setdefault(('group', group) if group is not None else ('trace', i), []).append(trace)
+
+    for (kind, name), traces in groups.items():
+        # The group's last trace picks the points; every trace in the group keeps the same indices
+        lead = traces[-1]
+        x, y = np.asarray(lead.x), np.asarray(lead.y, dtype=np.float64)
+        if version is None:
+            key = None
+        else:
+            key = name if kind == 'group' else (lead.name or name)
+        idx = downsample_indices(x, y, budget, method, key=key, version=version)
+        for trace in traces:
+            if len(trace.y) != len(y):
+                # Not aligned with the group's lead: reduce it on its own
+                tx, ty = np.asarray(trace.x), np.asarray(trace.y, dtype=np.float64)
+                own = downsample_indices(tx, ty, budget, method)
+                trace.x, trace.y = tx[own], ty[own]
+                continue
+            trace.x, trace.y = np.asarray(trace.x)[idx], np.asarray(trace.y, dtype=np.float64)[idx]
+    return fig
@@ -0,0 +1,220 @@
+import os
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+# Chart endpoint of the raw HTTP transport: the local stand-in server (see mock_market_server.py)
+# used for offline runs and benchmarks
+CHART_URL = os.environ.get("GOLD_APP_CHART_URL", "http://127.0.0.1:8765")
+
+# 'yfinance' = yf.download per ticker (live data), 'http' = pooled requests session against CHART_URL.
+# Live data goes through yfinance unless a stand-in server is configured.
+TRANSPORT = os.environ.get("GOLD_APP_FETCH_TRANSPORT",
+                           "http" if "GOLD_APP_CHART_URL" in os.environ else "yfinance")
+
+# Status codes worth retrying (rate limited / server side); anything else in 4xx fails fast
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+class FetchError(Exception):
+    pass
+
+class RateLimiter:
+    """
+    Token bucket shared by all fetch threads: at most `rate` requests per second, bursts up to `burst`.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or max(1, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+def parse_chart(payload):
+    """
+    Converts a Yahoo chart API response into a DataFrame with Date, Open, High, Low, Close, Volume.
+    """
+    chart = payload.get('chart') or {}
+    if chart.get('error'):
+        raise FetchError(f"{chart['error'].get('code')}: {chart['error'].get('description')}")
+    result = (chart.get('result') or [None])[0]
+    if not result or not result.get('timestamp'):
+        return pd.DataFrame(columns=['Date', 'Open', 'High', 'Low', 'Close', 'Volume'])
+
+    meta = result.get('meta', {})
+    quote = result['indicators']['quote'][0]
+    dates = pd.to_datetime(result['timestamp'], unit='s', utc=True)
+    tz = meta.get('exchangeTimezoneName')
+    if tz:
+        dates = dates.tz_convert(tz)
+    dates = dates.tz_localize(None)
+    if meta.get('dataGranularity', '1d') in ('1d', '5d', '1wk', '1mo', '3mo'):
+        dates = dates.normalize()
+
+    df = pd.DataFrame({
+        'Date': dates,
+        'Open': np.asarray(quote.get('open'), dtype=np.float64),
+        'High': np.asarray(quote.get('high'), dtype=np.float64),
+        'Low': np.asarray(quote.get('low'), dtype=np.float64),
+        'Close': np.asarray(quote.get('close'), dtype=np.float64),
+        'Volume': np.asarray(quote.get('volume'), dtype=np.float64),
+    })
+    # Yahoo pads in-progress bars with nulls; keep one row per bar
+    df = df.dropna(subset=['Close']).drop_duplicates(subset='Date', keep='last')
+    return df.reset_index(drop=True)
+
+class MarketDataFetcher:
+    """
+    Concurrent market-data downloader.
+    All requests share one rate limiter (and, with the HTTP transport, one pooled session), transient
+    failures are retried with jittered exponential backoff, and concurrent requests for the same
+    ticker/range share a single in-flight download.
+    """
+
+    def __init__(self, base_url=None, transport=None, max_workers=8, rate_per_second=5.0,
+                 max_retries=4, backoff_base=0.5, backoff_cap=8.0, timeout=15):
+        self.base_url = (base_url or CHART_URL).rstrip('/')
+        self.transport = transport or TRANSPORT
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.timeout = timeout
+        self.limiter = RateLimiter(rate_per_second)
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch")
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'retries': 0, 'failures': 0, 'deduplicated': 0}
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _backoff(self, attempt):
+        # Full jitter: spreads retries from many threads instead of retrying in lockstep
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    def _request_http(self, ticker, start, end, period, interval):
+        params = {'interval': interval, 'includePrePost': 'false', 'events': 'div,splits'}
+        if period:
+            params['range'] = period
+        else:
+            params['period1'] = int(pd.Timestamp(start or '1970-01-01').timestamp())
+            params['period2'] = int((pd.Timestamp(end) if end else pd.Timestamp.now()).timestamp()) + 86400
+
+        response = self.session.get(f"{self.base_url}/{ticker}", params=params, timeout=self.timeout)
+        if response.status_code in RETRY_STATUS:
+            raise requests.HTTPError(f"HTTP {response.status_code}", response=response)
+        if response.status_code == 404:
+            return parse_chart({'chart': {'result': None}})
+        response.raise_for_status()
+        return parse_chart(response.json())
+
+    def _request_yfinance(self, ticker, start, end, period, interval):
+        import yfinance as yf
+        data = yf.download(ticker, start=start, end=end, period=period, interval=interval, progress=False, threads=False)
+        if data is None or data.empty:
+            # yfinance logs failures and returns an empty frame instead of raising
+            return pd.DataFrame(columns=['Date', 'Open', 'High', 'Low', 'Close', 'Volume'])
+        if isinstance(data.columns, pd.MultiIndex):
+            data.columns = data.columns.get_level_values(0)
+        data.columns.name = None
+        data = data.reset_index().rename(columns={'Datetime': 'Date'})
+        data['Date'] = pd.to_datetime(data['Date']).dt.tz_localize(None)
+        return data
+
+    def _download(self, ticker, start, end, period, interval):
+        request = self._request_http if self.transport == 'http' else self._request_yfinance
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            self._count('requests')
+            try:
+                return request(ticker, start, end, period, interval)
+            except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+                status = getattr(getattr(e, 'response', None), 'status_code', None)
+                retryable = status is None or status in RETRY_STATUS
+                if not retryable or attempt == self.max_retries:
+                    self._count('failures')
+                    raise FetchError(f"{ticker}: {e}") from e
+                self._count('retries')
+                time.sleep(self._backoff(attempt))
+
+    def submit(self, ticker, start=None, end=None, period=None, interval='1d'):
+        """
+        Schedules a download and returns its Future.
+        A request identical to one already in flight returns that request's Future instead.
+        """
+        key = (ticker, str(start) if start else None, str(end) if end else None, period, interval)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.stats['deduplicated'] += 1
+                return future
+            future = self.pool.submit(self._download, ticker, start, end, period, interval)
+            self._inflight[key] = future
+
+        def _done(_, key=key):
+            with self._lock:
+                self._inflight.pop(key, None)
+        future.add_done_callback(_done)
+        return future
+
+    def fetch(self, ticker, start=None, end=None, period=None, interval='1d'):
+        """
+        Downloads one ticker (blocking).
+        Returns:
+            pd.DataFrame: Date, Open, High, Low, Close, Volume.
+        """
+        return self.submit(ticker, start, end, period, interval).result()
+
+    def fetch_many(self, requests_by_ticker):
+        """
+        Downloads several tickers concurrently.
+        Args:
+            requests_by_ticker (dict): Ticker -> dict of fetch() keyword arguments (start/end/period/interval).
+        Returns:
+            dict: Ticker -> DataFrame, or the Exception raised for that ticker.
+        """
+        futures = {ticker: self.submit(ticker, **kwargs) for ticker, kwargs in requests_by_ticker.items()}
+        results = {}
+        for ticker, future in futures.items():
+            try:
+                results[ticker] = future.result()
+            except Exception as e:
+                results[ticker] = e
+        return results
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def get_fetcher():
+    """
+    Returns the process-wide fetcher (one session / connection pool per process).
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = MarketDataFetcher()
+        return _shared
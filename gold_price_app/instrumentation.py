@@ -0,0 +1,225 @@
+import os
+import json
+import time
+import threading
+import functools
+import tracemalloc
+from collections import deque
+
+# Stage timing spans. Off by default; GOLD_APP_INSTRUMENT=1 records wall and CPU time,
+# GOLD_APP_INSTRUMENT=memory also records allocated bytes (via tracemalloc, which slows allocation down).
+# Disabled spans are a shared no-op object, so instrumented code only pays the flag checks per stage.
+# enable_thread() turns recording on for a single thread, so one user's debug panel leaves others alone.
+MODE = os.environ.get("GOLD_APP_INSTRUMENT", "0").lower()
+
+# Finished spans kept in memory for the debug panel / JSON lines export
+MAX_SPANS = 5000
+
+_enabled = MODE not in ("", "0", "false", "off")
+_memory = MODE == "memory"
+_spans = deque(maxlen=MAX_SPANS)
+_totals = {}
+_seq = 0
+_lock = threading.Lock()
+_local = threading.local()
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def finish(self):
+        pass
+
+_NO_SPAN = _NoSpan()
+
+class Span:
+    """
+    One timed stage. Use as a context manager, or call finish() explicitly.
+    """
+    __slots__ = ('name', 'labels', 'parent', 'started', '_wall', '_cpu', '_mem', '_done')
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+        self._done = False
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        self.parent = stack[-1].name if stack else None
+        stack.append(self)
+        if _memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            self._mem = tracemalloc.get_traced_memory()[0]
+        else:
+            self._mem = None
+        self.started = time.time()
+        self._cpu = time.thread_time()
+        self._wall = time.perf_counter()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.finish(error=exc[0] is not None)
+        return False
+
+    def finish(self, error=False):
+        if self._done:
+            return
+        wall = time.perf_counter() - self._wall
+        cpu = time.thread_time() - self._cpu
+        alloc = None
+        if self._mem is not None and tracemalloc.is_tracing():
+            alloc = max(0, tracemalloc.get_traced_memory()[0] - self._mem)
+        self._done = True
+
+        stack = getattr(_local, 'stack', [])
+        if self in stack:
+            stack.remove(self)
+        _record({'name': self.name, 'labels': self.labels, 'parent': self.parent, 'start': self.started,
+                 'wall_s': wall, 'cpu_s': cpu, 'alloc_bytes': alloc, 'error': error,
+                 'thread': threading.get_ident(), 'thread_name': threading.current_thread().name})
+
+def _record(entry):
+    global _seq
+    with _lock:
+        _seq += 1
+        entry['seq'] = _seq
+        _spans.append(entry)
+        key = (entry['name'], tuple(sorted(entry['labels'].items())))
+        total = _totals.get(key)
+        if total is None:
+            total = _totals[key] = {'count': 0, 'errors': 0, 'wall_s': 0.0, 'cpu_s': 0.0, 'alloc_bytes': 0, 'max_wall_s': 0.0}
+        total['count'] += 1
+        total['errors'] += entry['error']
+        total['wall_s'] += entry['wall_s']
+        total['cpu_s'] += entry['cpu_s']
+        total['alloc_bytes'] += entry['alloc_bytes'] or 0
+        total['max_wall_s'] = max(total['max_wall_s'], entry['wall_s'])
+
+def span(name, **labels):
+    """
+    Returns a span for one stage (a free no-op when instrumentation is off):
+        with span("model.fit", engine="prophet"):
+            ...
+    """
+    if not _enabled and not getattr(_local, 'enabled', False):
+        return _NO_SPAN
+    return Span(name, labels)
+
+def instrumented(name=None):
+    """
+    Decorator wrapping every call of a function in a span (named after the function by default).
+    """
+    def decorate(fn):
+        span_name = name or f"{fn.__module__}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled and not getattr(_local, 'enabled', False):
+                return fn(*args, **kwargs)
+            with Span(span_name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def enabled():
+    return _enabled or getattr(_local, 'enabled', False)
+
+def enable(memory=False):
+    """
+    Turns instrumentation on at runtime (e.g. from the debug panel).
+    """
+    global _enabled, _memory
+    _enabled = True
+    _memory = memory or _memory
+
+def enable_thread(on=True):
+    """
+    Records spans on the calling thread only (e.g. one Streamlit session's script run),
+    whatever the process-wide setting is. Pass False to stop.
+    """
+    _local.enabled = on
+
+def disable():
+    global _enabled, _memory
+    _enabled = False
+    _memory = False
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+def reset():
+    with _lock:
+        _spans.clear()
+        _totals.clear()
+
+def mark():
+    """
+    Returns a marker; spans_since(marker) then lists only the spans finished after it.
+    """
+    return _seq
+
+def spans_since(marker=0, thread=None):
+    """
+    Finished spans after a mark() marker, optionally only those of one thread (threading.get_ident()).
+    """
+    with _lock:
+        return [s for s in _spans if s['seq'] > marker and (thread is None or s['thread'] == thread)]
+
+def totals():
+    """
+    Returns:
+        dict: (name, labels tuple) -> aggregated count / errors / wall_s / cpu_s / alloc_bytes / max_wall_s.
+    """
+    with _lock:
+        return {k: dict(v) for k, v in _totals.items()}
+
+def _label_value(value):
+    # Prometheus text format: backslash, double quote and newline are escaped inside label values
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _label_text(name, labels):
+    parts = [f'stage="{_label_value(name)}"'] + [f'{k}="{_label_value(v)}"' for k, v in labels]
+    return "{" + ",".join(parts) + "}"
+
+def to_prometheus(prefix="gold_app_stage"):
+    """
+    Aggregated span metrics in the Prometheus text exposition format.
+    """
+    metrics = [
+        ('spans_total', 'counter', 'Number of completed spans', 'count'),
+        ('errors_total', 'counter', 'Spans that ended with an exception', 'errors'),
+        ('seconds_total', 'counter', 'Wall-clock seconds spent in the stage', 'wall_s'),
+        ('cpu_seconds_total', 'counter', 'CPU seconds spent in the stage (calling thread)', 'cpu_s'),
+        ('allocated_bytes_total', 'counter', 'Bytes allocated in the stage (memory mode only)', 'alloc_bytes'),
+        ('max_seconds', 'gauge', 'Slowest single span', 'max_wall_s'),
+    ]
+    data = totals()
+    lines = []
+    for suffix, kind, help_text, field in metrics:
+        metric = f"{prefix}_{suffix}"
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for (name, labels), total in sorted(data.items(), key=lambda item: str(item[0])):
+            lines.append(f"{metric}{_label_text(name, labels)} {total[field]}")
+    return "\n".join(lines) + "\n"
+
+def to_jsonl(spans=None):
+    """
+    Spans (default: all kept in memory) as JSON lines, one span per line.
+    """
+    spans = spans_since(0) if spans is None else spans
+    return "".join(json.dumps(s, default=str) + "\n" for s in spans)
+
+def write_jsonl(path, spans=None):
+    """
+    Appends spans to a JSON lines file.
+    """
+    with open(path, "a") as f:
+        f.write(to_jsonl(spans))
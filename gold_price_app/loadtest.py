@@ -0,0 +1,130 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+# Replay data by default, in a scratch cache so the run never touches live history.
+# Must be set before the app modules read config.
+os.environ.setdefault("GOLD_APP_PROVIDER", "replay")
+os.environ.setdefault("GOLD_APP_CACHE_DIR", os.path.join(tempfile.gettempdir(), "gold_app_loadtest"))
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Load test for service.py:
+#   python loadtest.py                         starts the service in-process on replay data
+#   python loadtest.py --url http://host:8080  targets a running service
+# Missing replay snapshots are recorded from the synthetic provider first.
+
+TICKERS = ["GC=F", "SI=F", "USDINR=X"]
+
+def request_mix(rng):
+    """
+    Returns a random (method, path, json body) drawn from a mix resembling dashboard traffic.
+    """
+    year = int(rng.integers(2020, 2026))
+    asset = rng.choice(["Gold", "Silver"])
+    day = np.datetime64('2026-01-01') + int(rng.integers(0, 5 * 365))
+    kind = rng.random()
+    if kind < 0.45:
+        return 'GET', f"/predict?asset={asset}&date={day}&currency=INR&unit=g", None
+    if kind < 0.60:
+        end = day + int(rng.integers(1, 60))
+        return 'POST', "/predict/batch", {'assets': ["Gold", "Silver"], 'dates': [[str(day), str(end)]], 'currency': 'INR', 'unit': 'g'}
+    if kind < 0.70:
+        return 'GET', f"/forecast?asset={asset}&periods={rng.choice([30, 365])}&currency=INR&unit=g", None
+    if kind < 0.85:
+        return 'GET', f"/monthly?asset={asset}&month={int(rng.integers(1, 13))}&year={year}&currency=INR&unit=10g", None
+    return 'GET', f"/yearly?asset={asset}&year={year}", None
+
+def run(base_url, requests_total, concurrency, seed=0):
+    """
+    Fires requests_total requests from `concurrency` client threads.
+    Returns:
+        dict: 'requests', 'errors', 'seconds', 'rps' and latency percentiles in milliseconds.
+    """
+    counter = iter(range(requests_total))
+    counter_lock = threading.Lock()
+    latencies = []
+    errors = []
+
+    def client(worker):
+        rng = np.random.default_rng(seed + worker)
+        session = requests.Session()
+        session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        mine = []
+        while True:
+            with counter_lock:
+                if next(counter, None) is None:
+                    break
+            method, path, body = request_mix(rng)
+            start = time.perf_counter()
+            try:
+                response = session.request(method, base_url + path, json=body, timeout=60)
+                ok = response.status_code == 200
+            except requests.RequestException:
+                ok = False
+            mine.append(time.perf_counter() - start)
+            if not ok:
+                errors.append(path)
+        latencies.extend(mine)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(client, range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    ms = np.array(latencies) * 1000
+    return {
+        'requests': len(ms),
+        'errors': len(errors),
+        'seconds': elapsed,
+        'rps': len(ms) / elapsed,
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p95_ms': float(np.percentile(ms, 95)),
+        'p99_ms': float(np.percentile(ms, 99)),
+        'max_ms': float(ms.max()),
+    }
+
+def ensure_snapshots(start):
+    from config import REPLAY_DIR
+    from providers import SyntheticProvider, record_snapshots, _snapshot_path
+    missing = [t for t in TICKERS if not os.path.exists(_snapshot_path(REPLAY_DIR, t))]
+    if missing:
+        print(f"Recording synthetic snapshots for {missing} in {REPLAY_DIR}")
+        record_snapshots(missing, REPLAY_DIR, SyntheticProvider(), start)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure throughput and latency of the prediction service.")
+    parser.add_argument("--url", default=None, help="Running service (default: start one in-process)")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=100, help="Requests sent before measuring")
+    parser.add_argument("--start", default="2020-01-01", help="History start date of the in-process service")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        ensure_snapshots(args.start)
+        from service import ModelPool, start_service
+        pool = ModelPool(start_date=args.start)
+        pool.reload()
+        server = start_service(pool, port=0)
+        base_url = f"http://127.0.0.1:{server.server_port}"
+    base_url = base_url.rstrip('/')
+
+    if args.warmup:
+        run(base_url, args.warmup, args.concurrency, seed=10_000)
+    result = run(base_url, args.requests, args.concurrency)
+    print(f"{result['requests']} requests, {args.concurrency} clients, {result['seconds']:.2f}s")
+    print(f"throughput: {result['rps']:.1f} req/s   errors: {result['errors']}")
+    print(f"latency ms: p50 {result['p50_ms']:.1f}  p95 {result['p95_ms']:.1f}  p99 {result['p99_ms']:.1f}  max {result['max_ms']:.1f}")
+
+    if server is not None:
+        server.shutdown()
+    sys.exit(1 if result['errors'] else 0)
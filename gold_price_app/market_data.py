@@ -0,0 +1,170 @@
+import logging
+import pandas as pd
+
+import price_store
+from providers import get_provider
+from bars import Bars
+from config import INTRADAY_INTERVAL, INTRADAY_LOOKBACK_DAYS
+from instrumentation import span, instrumented
+
+# Store-backed market data loading, independent of Streamlit: the app (through data_loader),
+# the training workers, the service and the CLI tools all read and refresh the price store here.
+
+logger = logging.getLogger(__name__)
+
+# Stored history younger than this is served as-is, without asking Yahoo for new rows
+REFRESH_INTERVAL_SECONDS = 60 * 60
+INTRADAY_REFRESH_SECONDS = 5 * 60
+
+def _download(ticker, **kwargs):
+    """
+    Downloads OHLCV data from the configured provider (live, replay or synthetic)
+    as a flat frame with a 'Date' column.
+    """
+    with span("data.download", ticker=ticker):
+        return get_provider().history(ticker, **kwargs)
+
+def _plan_fetch(ticker, start_date):
+    """
+    Works out what a history load needs from the network.
+    Returns:
+        pd.DataFrame: Stored rows (possibly empty).
+        str: Start date the stored rows cover (None if nothing stored).
+        dict: fetch() keyword arguments, or None when the stored history is fresh enough.
+        bool: True for a full download (replaces the store), False for a delta (appended).
+    """
+    start = pd.Timestamp(start_date)
+    with span("data.store_read", ticker=ticker):
+        stored, stored_start = price_store.read_prices(ticker)
+    
+    if stored.empty or stored_start is None or start < pd.Timestamp(stored_start):
+        return stored, stored_start, {'start': start_date}, True
+    
+    age = price_store.store_age(ticker)
+    if age is not None and age > REFRESH_INTERVAL_SECONDS:
+        # Re-fetch from the last stored date: its bar may have been partial when stored
+        last_date = stored['Date'].iloc[-1]
+        return stored, stored_start, {'start': last_date.strftime('%Y-%m-%d')}, False
+    return stored, stored_start, None, False
+
+def _apply_fetch(ticker, start_date, plan, fetched):
+    """
+    Merges a download (a DataFrame, or the Exception it raised) into the store and returns the history.
+    """
+    stored, stored_start, request, full = plan
+    
+    if full:
+        if isinstance(fetched, Exception):
+            raise fetched
+        if fetched.empty:
+            return fetched
+        # Serve the stored file rather than the download, so callers share its memory-mapped pages
+        price_store.write_prices(ticker, fetched, start_date)
+        return price_store.read_prices(ticker)[0]
+    
+    if request is not None:
+        if isinstance(fetched, Exception):
+            # Serve the stored history rather than failing; the next load retries the delta
+            logger.warning("Delta fetch failed for %s, serving stored data: %s", ticker, fetched)
+        else:
+            stored = price_store.append_prices(ticker, fetched, stored_start)
+    
+    return _since(stored, start_date)
+
+def _since(stored, start_date):
+    """
+    Rows from start_date on, without copying: the stored frame itself when it starts there, else a slice.
+    """
+    lo = stored['Date'].searchsorted(pd.Timestamp(start_date))
+    if lo == 0:
+        return stored
+    return stored.iloc[lo:].reset_index(drop=True)
+
+@instrumented("data.fetch_history")
+def fetch_history(ticker, start_date="2020-01-01"):
+    """
+    Returns historical data for the ticker, backed by the on-disk price store.
+    Only the rows after the last stored date are downloaded; a full download happens
+    only when nothing is stored yet or the requested start date is earlier than the stored one.
+    Args:
+        ticker (str): Ticker symbol.
+        start_date (str): Start date in 'YYYY-MM-DD' format.
+    Returns:
+        pd.DataFrame: DataFrame with Date, Open, High, Low, Close, Volume, backed by read-only
+                      memory-mapped columns of the store: shared, never modify it in place.
+    """
+    plan = _plan_fetch(ticker, start_date)
+    fetched = None
+    if plan[2] is not None:
+        try:
+            fetched = _download(ticker, **plan[2])
+        except Exception as e:
+            fetched = e
+    return _apply_fetch(ticker, start_date, plan, fetched)
+
+@instrumented("data.fetch_histories")
+def fetch_histories(tickers, start_date="2020-01-01"):
+    """
+    Store-backed history for several tickers; whatever needs downloading is fetched concurrently.
+    Returns:
+        dict: Ticker -> DataFrame, or the Exception that prevented loading it.
+    """
+    plans = {ticker: _plan_fetch(ticker, start_date) for ticker in tickers}
+    with span("data.download_many"):
+        fetched = get_provider().history_many({t: plan[2] for t, plan in plans.items() if plan[2] is not None})
+    
+    results = {}
+    for ticker, plan in plans.items():
+        try:
+            results[ticker] = _apply_fetch(ticker, start_date, plan, fetched.get(ticker))
+        except Exception as e:
+            results[ticker] = e
+    return results
+
+@instrumented("data.fetch_intraday")
+def fetch_intraday(ticker, interval=INTRADAY_INTERVAL, start_date=None):
+    """
+    Intraday bars for the ticker as compact columnar arrays, backed by the on-disk bar store.
+    Like fetch_history, only bars after the last stored one are downloaded once the store is older
+    than INTRADAY_REFRESH_SECONDS; bars are never converted to a DataFrame on the way.
+    Args:
+        ticker (str): Ticker symbol.
+        interval (str): Stored bar size ('1m', '5m', ...); resample() the result for coarser bars.
+        start_date (str): First day wanted (default: the provider's lookback for the bar size).
+    Returns:
+        Bars: Bars from start_date on (memory-mapped views of the store where nothing was downloaded).
+    """
+    if start_date is None:
+        days = INTRADAY_LOOKBACK_DAYS.get(interval, 59)
+        start_date = (pd.Timestamp.now().normalize() - pd.Timedelta(days=days)).strftime('%Y-%m-%d')
+    
+    with span("data.store_read", ticker=ticker, interval=interval):
+        stored, stored_start = price_store.read_bars(ticker, interval)
+    
+    if stored is None or stored_start is None or pd.Timestamp(start_date) < pd.Timestamp(stored_start):
+        fetched = Bars.from_frame(_download(ticker, start=start_date, interval=interval), interval)
+        if not fetched.empty:
+            price_store.write_bars(ticker, fetched, start_date)
+        return fetched
+    
+    age = price_store.store_age(ticker, interval)
+    if age is not None and age > INTRADAY_REFRESH_SECONDS and not stored.empty:
+        try:
+            # Re-fetch from the last stored bar: it may have been partial when stored
+            last = pd.Timestamp(stored.dates[-1])
+            fetched = Bars.from_frame(_download(ticker, start=last, interval=interval), interval)
+            stored = stored.append(fetched)
+            price_store.write_bars(ticker, stored, stored_start)
+        except Exception as e:
+            logger.warning("Intraday delta fetch failed for %s, serving stored bars: %s", ticker, e)
+    return stored.between(start_date)
+
+def read_history(ticker, start_date="2020-01-01"):
+    """
+    Stored history from start_date on, without touching the network (zero-copy, see fetch_history).
+    Used to hand data to other processes: each one maps the same file instead of receiving a pickled copy.
+    """
+    stored, _ = price_store.read_prices(ticker)
+    if stored.empty:
+        return stored
+    return _since(stored, start_date)
@@ -0,0 +1,127 @@
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pandas as pd
+
+from providers import SyntheticProvider, INTERVALS
+
+# Stand-in for the Yahoo chart endpoint, so the fetch layer can be exercised offline:
+#   python mock_market_server.py --port 8765 --failure-rate 0.2
+#   GOLD_APP_CHART_URL=http://127.0.0.1:8765 streamlit run app.py
+# Run with --bench to start the server and measure fetcher throughput against it.
+
+BENCH_TICKERS = ["GC=F", "SI=F", "PL=F", "PA=F", "USDINR=X"]
+
+# Bars come from the synthetic provider, so the mock server and GOLD_APP_PROVIDER=synthetic agree
+_generator = SyntheticProvider()
+
+class ChartHandler(BaseHTTPRequestHandler):
+    failure_rate = 0.0
+    latency = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        if random.random() < self.failure_rate:
+            self.send_response(503)
+            self.end_headers()
+            return
+
+        url = urlparse(self.path)
+        ticker = url.path.rstrip('/').rsplit('/', 1)[-1]
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        interval = query.get('interval', '1d')
+        if interval not in INTERVALS:
+            self._send_json(400, {'chart': {'result': None, 'error': {
+                'code': 'Bad Request', 'description': f"Invalid interval {interval}"}}})
+            return
+        # Daily bars run up to today; intraday bars up to the current bar
+        end = pd.Timestamp.now().normalize() if interval == '1d' else pd.Timestamp.now()
+        if 'range' in query:
+            start = end - pd.Timedelta(days=7)
+        else:
+            start = pd.Timestamp(int(query.get('period1', 0)), unit='s')
+            end = min(end, pd.Timestamp(int(query.get('period2', end.timestamp())), unit='s'))
+
+        bars = _generator.history(ticker, start=start, end=end, interval=interval)
+        if 'range' in query:
+            bars = bars.iloc[-1:]
+        dates = bars['Date']
+        self._send_json(200, {'chart': {'error': None, 'result': [{
+            'meta': {'symbol': ticker, 'exchangeTimezoneName': 'UTC', 'dataGranularity': interval},
+            'timestamp': [int(d.timestamp()) for d in dates],
+            'indicators': {'quote': [{
+                'open': bars['Open'].tolist(), 'high': bars['High'].tolist(), 'low': bars['Low'].tolist(),
+                'close': bars['Close'].tolist(), 'volume': bars['Volume'].tolist(),
+            }]},
+        }]}})
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+def start_server(port=0, failure_rate=0.0, latency=0.0):
+    """
+    Starts the stand-in server on a background thread.
+    Returns:
+        ThreadingHTTPServer: Running server (base URL: f"http://127.0.0.1:{server.server_port}").
+    """
+    handler = type("Handler", (ChartHandler,), {'failure_rate': failure_rate, 'latency': latency})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def bench(tickers, rounds, failure_rate, latency):
+    from fetcher import MarketDataFetcher
+
+    server = start_server(failure_rate=failure_rate, latency=latency)
+    fetcher = MarketDataFetcher(base_url=f"http://127.0.0.1:{server.server_port}", transport='http',
+                                rate_per_second=1000, backoff_base=0.01)
+    requests_by_ticker = {f"{t}.{i}" if i else t: {'start': '2020-01-01'} for i in range(rounds) for t in tickers}
+
+    start = time.perf_counter()
+    # Identical concurrent requests should collapse into one download
+    duplicates = [fetcher.submit(tickers[0], start='2020-01-01') for _ in range(5)]
+    results = fetcher.fetch_many(requests_by_ticker)
+    for future in duplicates:
+        future.exception()
+    elapsed = time.perf_counter() - start
+
+    failed = [t for t, r in results.items() if isinstance(r, Exception)]
+    rows = sum(len(r) for r in results.values() if not isinstance(r, Exception))
+    print(f"{len(results)} downloads in {elapsed:.2f}s ({len(results) / elapsed:.1f}/s), {rows} rows")
+    print(f"stats: {fetcher.stats}, failed: {len(failed)}")
+    server.shutdown()
+    return 1 if failed and failure_rate == 0 else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline stand-in for the Yahoo chart API.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of requests answered with HTTP 503")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--bench", action="store_true", help="Measure fetcher throughput against the server and exit")
+    parser.add_argument("--rounds", type=int, default=20, help="Downloads per ticker in --bench mode")
+    args = parser.parse_args()
+
+    if args.bench:
+        sys.exit(bench(BENCH_TICKERS, args.rounds, args.failure_rate, args.latency))
+
+    server = start_server(args.port, args.failure_rate, args.latency)
+    print(f"Serving chart data on http://127.0.0.1:{server.server_port}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -1,43 +1,557 @@
-from prophet import Prophet
+import os
+import json
+import logging
+import time
+import copy
+from statistics import NormalDist
 import pandas as pd
 import numpy as np
 
-def train_model(df):
+import model_cache
+from instrumentation import span, instrumented
+
+logger = logging.getLogger(__name__)
+
+PROPHET_PARAMS = {'daily_seasonality': True, 'yearly_seasonality': True}
+
+# Years ahead covered by the precomputed forecast grid
+GRID_YEARS = 5
+
+# How prediction intervals are computed:
+#   'analytical' - closed-form approximation from the fitted trend/noise parameters (no sampling)
+#   'reduced'    - Prophet's Monte Carlo simulation with REDUCED_SAMPLES draws
+#   'full'       - Prophet's Monte Carlo simulation with the model's own uncertainty_samples (1000)
+UNCERTAINTY_MODES = ('analytical', 'reduced', 'full')
+DEFAULT_UNCERTAINTY_MODE = os.environ.get("GOLD_APP_UNCERTAINTY", "analytical")
+REDUCED_SAMPLES = 100
+
+# Incremental refresh: when new data only extends the previous fit's training set, the previous fit is
+# updated (warm start / normal-equation update) instead of refitted from scratch, unless
+#   - the history grew by more than REFRESH_MAX_APPEND since the last full fit (changepoints go stale),
+#   - the new rows' mean price is more than REFRESH_MAX_SCALE_CHANGE above or below the rows just before them,
+#   - a new price moves its residual off the previous fit by more than REFRESH_DRIFT_Z standard deviations
+#     of the day-to-day residual changes over the last REFRESH_DRIFT_WINDOW rows (4, not 3: daily
+#     moves are fat-tailed, and a 3 sd day is routine a few times a year).
+REFRESH_MAX_APPEND = 0.05
+REFRESH_MAX_SCALE_CHANGE = 0.10
+REFRESH_DRIFT_Z = 4.0
+REFRESH_DRIFT_WINDOW = 60
+
+# --- Forecasting engines ---
+# Each engine provides fit / serialization hooks; everything else in this module works on the
+# fitted model's predict(df) -> ds/yhat/yhat_lower/yhat_upper frame and its `history`.
+# Heavy backends are imported inside the hooks, so unused engines cost nothing at import time.
+
+def _prophet_fit(df_train, params):
+    from prophet import Prophet
+    model = Prophet(**params)
+    model.fit(df_train)
+    return model
+
+def _prophet_warm_start(model):
+    # Stan optimizer initial values from a previous MAP fit (same parameter shapes)
+    return {
+        'k': float(model.params['k'][0][0]),
+        'm': float(model.params['m'][0][0]),
+        'sigma_obs': float(model.params['sigma_obs'][0][0]),
+        'delta': np.asarray(model.params['delta'][0]),
+        'beta': np.asarray(model.params['beta'][0]),
+    }
+
+def _prophet_refresh(previous, df_train, params):
+    from prophet import Prophet
+    model = Prophet(**params)
+    model.fit(df_train, init=_prophet_warm_start(previous))
+    return model
+
+def _prophet_to_json(model):
+    from prophet.serialize import model_to_json
+    return model_to_json(model)
+
+def _prophet_from_json(payload):
+    from prophet.serialize import model_from_json
+    return model_from_json(payload)
+
+def _prophet_version():
+    import prophet
+    return prophet.__version__
+
+def _numpy_fit(df_train, params):
+    from numpy_engine import LinearSeasonalModel
+    return LinearSeasonalModel(**params).fit(df_train)
+
+def _numpy_refresh(previous, df_train, params):
+    return previous.update(df_train)
+
+def _numpy_to_json(model):
+    from numpy_engine import model_to_json
+    return model_to_json(model)
+
+def _numpy_from_json(payload):
+    from numpy_engine import model_from_json
+    return model_from_json(payload)
+
+def _numpy_version():
+    from numpy_engine import ENGINE_VERSION
+    return f"{ENGINE_VERSION}-numpy{np.__version__}"
+
+ENGINES = {}
+
+def register_engine(name, fit, to_json, from_json, version, params=None, refresh=None):
+    """
+    Registers a forecasting engine.
+    Args:
+        name (str): Engine name used by train_model(engine=...).
+        fit (callable): (df_train with ds/y, params dict) -> fitted model with predict() and history.
+        to_json (callable): model -> JSON string.
+        from_json (callable): JSON string -> model.
+        version (callable): () -> backend version string (part of the artifact cache key).
+        params (dict): Default constructor parameters.
+        refresh (callable): (previous model, df_train extending its history, params) -> updated model
+                            (optional; engines without it always refit).
     """
-    Trains a Prophet model on the historical data.
+    ENGINES[name] = {'fit': fit, 'to_json': to_json, 'from_json': from_json,
+                     'version': version, 'params': params or {}, 'refresh': refresh}
+
+register_engine('prophet', _prophet_fit, _prophet_to_json, _prophet_from_json, _prophet_version, PROPHET_PARAMS,
+                refresh=_prophet_refresh)
+register_engine('numpy', _numpy_fit, _numpy_to_json, _numpy_from_json, _numpy_version, refresh=_numpy_refresh)
+
+DEFAULT_ENGINE = os.environ.get("GOLD_APP_ENGINE", "prophet")
+
+def model_engine(model):
     """
-    # Prepare data for Prophet
+    Returns the name of the engine a fitted model belongs to.
+    """
+    return getattr(model, 'engine', 'prophet')
+
+@instrumented("model.train_model")
+def train_model(df, ticker=None, engine=None, refresh=True, grid=True, params=None, cache_dir=None):
+    """
+    Trains a forecasting model on the historical data (Prophet unless another engine is chosen).
+    A model fitted earlier on identical data (same ticker, dates and closes) is loaded
+    from the artifact cache instead of being refitted; when the data only extends the
+    ticker's previous fit, that fit is refreshed incrementally (see REFRESH_MAX_APPEND).
+    Engine parameters are the ticker's tuned configuration when one has been persisted
+    (see tuning.py), else the engine defaults.
+    The returned model carries a precomputed forecast grid (see build_forecast_grid)
+    and 'refresh_info' ({'mode': 'cached' | 'incremental' | 'full', 'reason'}).
+    Args:
+        df (pd.DataFrame): Historical data with 'Date' and 'Close'.
+        ticker (str): Ticker symbol, used as part of the cache key (optional).
+        engine (str): Registered engine name (default DEFAULT_ENGINE).
+        refresh (bool): Refresh the ticker's previous fit when possible, and record this fit as its latest.
+                        Off for one-off fits (e.g. backtest folds) that must not move the lineage.
+        grid (bool): Build the forecast grid (off when only predict_* on explicit dates is needed).
+        params (dict): Engine parameters to fit with, overriding the tuned / default configuration.
+        cache_dir (str): Artifact folder (default the shared model cache); backtest and tuning folds
+                         use config.FOLD_MODEL_DIR so they never evict the production models.
+    Returns:
+        Fitted model (Prophet or the engine's own model class).
+    """
+    model = _fit_or_load(df, ticker, engine or DEFAULT_ENGINE, refresh, params, cache_dir)
+    model.forecast_grid = build_forecast_grid(model) if grid else None
+    return model
+
+def engine_params(ticker, engine=None):
+    """
+    Parameters train_model fits `ticker` with: its persisted tuning winner, else the engine defaults.
+    """
+    from tuning import tuned_params
+    engine = engine or DEFAULT_ENGINE
+    tuned = tuned_params(ticker, engine) if ticker is not None else None
+    return dict(tuned if tuned is not None else ENGINES[engine]['params'])
+
+def _fit_or_load(df, ticker, engine, refresh=True, fit_params=None, cache_dir=None):
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown forecasting engine '{engine}', expected one of {list(ENGINES)}")
+    spec = ENGINES[engine]
+    if fit_params is None:
+        fit_params = engine_params(ticker, engine)
+    
+    # Prepare data for the engine
     df_train = df[['Date', 'Close']].rename(columns={'Date': 'ds', 'Close': 'y'})
     
-    # Initialize and train model
-    model = Prophet(daily_seasonality=True, yearly_seasonality=True)
-    model.fit(df_train)
+    params = {'engine': engine, **fit_params}
+    version = spec['version']()
+    key = model_cache.fingerprint(df_train, ticker, params, backend_version=version)
+    cached = model_cache.load(key, cache_dir)
+    if cached is not None:
+        try:
+            with span("model.load_artifact", engine=engine):
+                model = deserialize_model(cached)
+            model.refresh_info = {'mode': 'cached', 'reason': None}
+            return model
+        except Exception as e:
+            # Unreadable artifact: fall through and refit, which overwrites it
+            logger.warning("Ignoring unreadable model artifact %s: %s", key, e)
+    
+    lineage = model_cache.lineage(ticker, params, version) if ticker is not None and refresh else None
+    model, reason = None, "no ticker lineage"
+    if lineage is not None and spec['refresh'] is not None:
+        model, reason = _refresh(spec, engine, lineage, df_train, fit_params)
+    
+    if model is None:
+        # Initialize and train model
+        with span("model.fit", engine=engine):
+            model = spec['fit'](df_train, fit_params)
+        model.full_fit_rows = len(df_train)
+        model.refresh_info = {'mode': 'full', 'reason': reason}
+    else:
+        model.refresh_info = {'mode': 'incremental', 'reason': None}
+    model.engine = engine
+    
+    with span("model.save_artifact", engine=engine):
+        model_cache.save(key, serialize_model(model), cache_dir)
+    if lineage is not None:
+        model_cache.set_latest(lineage, key)
     return model
 
-def predict_future(model, periods):
+def _refresh(spec, engine, lineage, df_train, fit_params):
+    """
+    Updates the lineage's latest fit with the rows df_train appends to its history.
+    Returns:
+        Model or None: The refreshed model, or None when a full refit is needed.
+        str: Why a full refit is needed (None when refreshed).
+    """
+    previous_key = model_cache.latest(lineage)
+    payload = model_cache.load(previous_key) if previous_key else None
+    if payload is None:
+        return None, "no previous fit"
+    try:
+        previous = deserialize_model(payload)
+    except Exception as e:
+        return None, f"previous fit unreadable ({e})"
+    
+    reason = refresh_blocker(previous, df_train)
+    if reason is not None:
+        return None, reason
+    with span("model.refresh", engine=engine):
+        model = spec['refresh'](previous, df_train, fit_params)
+    model.full_fit_rows = previous.full_fit_rows
+    return model, None
+
+def refresh_blocker(previous, df_train):
+    """
+    Checks whether df_train can be handled as an incremental refresh of a previous fit.
+    Returns:
+        str: Reason a full refit is needed, or None if an incremental refresh is fine.
+    """
+    old = previous.history
+    n = len(old)
+    ds = pd.to_datetime(df_train['ds']).values.astype('datetime64[ns]')
+    y = df_train['y'].to_numpy(dtype=np.float64)
+    old_ds = old['ds'].values.astype('datetime64[ns]')
+    
+    # Every old row must be unchanged, except the last bar, which may have been partial
+    # (closes are compared to 1e-9 relative: serialized histories keep about 10 significant digits)
+    if (len(ds) < n or not np.array_equal(ds[:n], old_ds)
+            or not np.allclose(y[:n - 1], old['y'].to_numpy()[:n - 1], rtol=1e-9, atol=0)):
+        return "training data does not extend the previous fit"
+    
+    full_rows = previous.full_fit_rows
+    if len(ds) - full_rows > REFRESH_MAX_APPEND * full_rows:
+        return f"{len(ds) - full_rows} rows added since the last full fit"
+    
+    # Mean level of the new rows vs. as many old rows just before them, so a price fall or a unit
+    # change (per oz -> per gram) is caught as well as a jump
+    new_y = y[n - 1:]
+    old_y = old['y'].to_numpy(dtype=np.float64)
+    recent = old_y[max(0, n - 1 - len(new_y)):n - 1] if n > 1 else old_y
+    if abs(np.abs(new_y).mean() / np.abs(recent).mean() - 1) > REFRESH_MAX_SCALE_CHANGE:
+        return "price scale changed"
+    
+    # The yardstick is the fit's own recent residuals, not its interval width: daily closes wander off a
+    # smooth trend for weeks at a time, so an ordinary append often sits 3-4 interval sd away. Each new
+    # row is scored by its day-to-day residual change against those of the window; the largest counts,
+    # so one jump is not averaged away by quiet rows.
+    start = max(0, n - 1 - REFRESH_DRIFT_WINDOW)
+    forecast = predict_with_uncertainty(previous, pd.DataFrame({'ds': ds[start:]}), 'analytical')
+    steps = np.diff(y[start:] - forecast['yhat'].to_numpy())
+    split = n - 2 - start  # steps[split:] lead into the new rows
+    if split < 2:
+        return None
+    recent_steps, new_steps = steps[:split], steps[split:]
+    drift = np.max(np.abs(new_steps)) / max(np.std(recent_steps), 1e-12)
+    if drift > REFRESH_DRIFT_Z:
+        return f"new prices move {drift:.1f} sd off the previous fit's recent residuals"
+    return None
+
+@instrumented("model.forecast_grid")
+def build_forecast_grid(model, years=GRID_YEARS, uncertainty=None):
+    """
+    Predicts every day from the start of the current year to the end of the year `years` ahead
+    in one batched call, so single-date predictions become array lookups.
+    Args:
+        model (Prophet): Fitted model.
+        years (int): Years ahead the grid covers (matches the year input bounds of the UI).
+        uncertainty (str): Interval mode (see UNCERTAINTY_MODES, default DEFAULT_UNCERTAINTY_MODE).
+    Returns:
+        dict: 'start' (np.datetime64 day of row 0), 'values' (n x 3 array of yhat, yhat_lower, yhat_upper)
+              and 'mode' (interval mode the grid was built with).
+    """
+    uncertainty = uncertainty or DEFAULT_UNCERTAINTY_MODE
+    today = pd.Timestamp.now().normalize()
+    dates = pd.date_range(start=pd.Timestamp(year=today.year, month=1, day=1),
+                          end=pd.Timestamp(year=today.year + years, month=12, day=31), freq='D')
+    
+    forecast = predict_with_uncertainty(model, pd.DataFrame({'ds': dates}), uncertainty)
+    values = forecast[['yhat', 'yhat_lower', 'yhat_upper']].to_numpy(dtype=np.float64)
+    return {'start': np.datetime64(dates[0].date(), 'D'), 'values': values, 'mode': uncertainty}
+
+def _grid_lookup(grid, target_date):
+    """
+    Returns the (yhat, yhat_lower, yhat_upper) grid row for a date, or None if outside the grid.
+    """
+    offset = int((np.datetime64(target_date.date(), 'D') - grid['start']).astype(np.int64))
+    if 0 <= offset < len(grid['values']):
+        return grid['values'][offset]
+    return None
+
+def predict_with_uncertainty(model, df, uncertainty=None):
+    """
+    Runs model.predict with the requested interval mode.
+    Args:
+        model (Prophet): Fitted model.
+        df (pd.DataFrame): Frame with a 'ds' column.
+        uncertainty (str): One of UNCERTAINTY_MODES (default DEFAULT_UNCERTAINTY_MODE).
+    Returns:
+        pd.DataFrame: Forecast with at least 'ds', 'yhat', 'yhat_lower', 'yhat_upper'.
+    """
+    uncertainty = uncertainty or DEFAULT_UNCERTAINTY_MODE
+    if uncertainty not in UNCERTAINTY_MODES:
+        raise ValueError(f"Unknown uncertainty mode '{uncertainty}', expected one of {UNCERTAINTY_MODES}")
+    with span("model.predict", engine=model_engine(model), mode=uncertainty):
+        return _predict(model, df, uncertainty)
+
+def _predict(model, df, uncertainty):
+    if model_engine(model) != 'prophet':
+        # Other engines compute their own closed-form intervals
+        return model.predict(df)
+    if uncertainty == 'full':
+        return model.predict(df)
+    if uncertainty == 'reduced':
+        # predict() reads the sample count from the model; the fitted model is shared across threads,
+        # so the reduced count goes on a shallow per-call copy instead of the model itself
+        reduced = copy.copy(model)
+        reduced.uncertainty_samples = min(REDUCED_SAMPLES, model.uncertainty_samples or REDUCED_SAMPLES)
+        return reduced.predict(df)
+    return _predict_analytical(model, df)
+
+def _predict_analytical(model, df):
+    """
+    Point forecast plus closed-form intervals, without Monte Carlo sampling.
+    Prophet's simulation draws future slope changes at the historical changepoint rate S with
+    Laplace(0, b) sizes (b = mean |delta|), and adds Gaussian noise sigma_obs. For a horizon h
+    (in the model's scaled time) that gives a trend variance of 2 * b^2 * S * h^3 / 3, so
+        yhat +/- z * y_scale * sqrt(sigma_obs^2 + 2 * b^2 * S * h^3 / 3).
+    """
+    df = model.setup_dataframe(df[['ds']].copy())
+    df['trend'] = model.predict_trend(df)
+    seasonal = model.predict_seasonal_components(df)
+    
+    forecast = pd.concat((df[['ds', 'trend']], seasonal), axis=1)
+    forecast['yhat'] = forecast['trend'] * (1 + forecast['multiplicative_terms']) + forecast['additive_terms']
+    
+    deltas = np.asarray(model.params['delta'])[0]
+    sigma_obs = float(np.asarray(model.params['sigma_obs']).ravel()[0])
+    b = np.mean(np.abs(deltas)) + 1e-8
+    rate = len(model.changepoints_t) if model.changepoints_t is not None else 0
+    
+    # Trend uncertainty only grows past the end of the history (t = 1)
+    horizon = np.clip(df['t'].to_numpy() - 1.0, 0.0, None)
+    sd = model.y_scale * np.sqrt(sigma_obs ** 2 + 2.0 * b ** 2 * rate * horizon ** 3 / 3.0)
+    
+    z = NormalDist().inv_cdf(0.5 + model.interval_width / 2)
+    forecast['yhat_lower'] = forecast['yhat'] - z * sd
+    forecast['yhat_upper'] = forecast['yhat'] + z * sd
+    return forecast
+
+def compare_uncertainty_modes(model, periods=365):
+    """
+    Times every interval mode on the same forecast window and compares interval widths
+    against the full-sampling baseline.
+    Args:
+        model (Prophet): Fitted model.
+        periods (int): Number of future days to forecast.
+    Returns:
+        pd.DataFrame: One row per mode with 'seconds', 'mean_width' and
+                      'width_vs_full_pct' (mean absolute width difference relative to 'full', in %).
+    """
+    last_date = pd.to_datetime(model.history['ds'].max())
+    future = pd.DataFrame({'ds': pd.date_range(start=last_date + pd.Timedelta(days=1), periods=periods, freq='D')})
+    
+    widths = {}
+    rows = []
+    for mode in ('full',) + tuple(m for m in UNCERTAINTY_MODES if m != 'full'):
+        start = time.perf_counter()
+        forecast = predict_with_uncertainty(model, future, mode)
+        seconds = time.perf_counter() - start
+        widths[mode] = (forecast['yhat_upper'] - forecast['yhat_lower']).to_numpy()
+        diff = np.mean(np.abs(widths[mode] - widths['full']) / widths['full']) * 100
+        rows.append({'mode': mode, 'seconds': seconds, 'mean_width': widths[mode].mean(), 'width_vs_full_pct': diff})
+    
+    return pd.DataFrame(rows)
+
+def serialize_model(model):
+    """
+    Serializes a fitted model to a JSON string (tagged with its engine).
+    """
+    engine = model_engine(model)
+    return json.dumps({'engine': engine, 'model': ENGINES[engine]['to_json'](model),
+                       'full_fit_rows': getattr(model, 'full_fit_rows', len(model.history))})
+
+def deserialize_model(payload):
+    """
+    Rebuilds a fitted model from serialize_model output.
+    """
+    data = json.loads(payload)
+    model = ENGINES[data['engine']]['from_json'](data['model'])
+    model.engine = data['engine']
+    # Rows of the last full (non-incremental) fit behind this model
+    model.full_fit_rows = data.get('full_fit_rows', len(model.history))
+    return model
+
+def in_sample_forecast(model, uncertainty=None):
+    """
+    Returns the model's prediction over its own training dates.
+    It only depends on the fitted model, so it is computed once per interval mode and kept on the model.
+    """
+    uncertainty = uncertainty or DEFAULT_UNCERTAINTY_MODE
+    if getattr(model, 'in_sample_fit', None) is None:
+        model.in_sample_fit = {}
+    cached = model.in_sample_fit.get(uncertainty)
+    if cached is None:
+        cached = predict_with_uncertainty(model, model.history[['ds']], uncertainty)
+        model.in_sample_fit[uncertainty] = cached
+    return cached
+
+@instrumented("model.predict_future")
+def predict_future(model, periods, history_days=None, uncertainty=None):
+    """
+    Forecasts `periods` days after the end of the training data.
+    Args:
+        model (Prophet): Fitted model.
+        periods (int): Number of future days.
+        history_days (int): Days of in-sample fit to prepend (None = all of it, 0 = forecast only).
+        uncertainty (str): Interval mode (see UNCERTAINTY_MODES).
+    Returns:
+        pd.DataFrame: Forecast with 'ds', 'yhat', 'yhat_lower', 'yhat_upper', in-sample rows first.
+    """
     # Ensure last_date is a Timestamp for arithmetic
     last_date = pd.to_datetime(model.history['ds'].max())
     
     # Calculate future dates
     future_dates = pd.date_range(start=last_date + pd.Timedelta(days=1), periods=periods, freq='D')
     
-    future = pd.DataFrame({'ds': future_dates})
-    future = pd.concat([model.history[['ds']], future], ignore_index=True)
-    forecast = model.predict(future)
-    return forecast
+    # Only the requested window is predicted; in-sample rows come from the cached fit
+    forecast = predict_with_uncertainty(model, pd.DataFrame({'ds': future_dates}), uncertainty)
+    if history_days == 0:
+        return forecast
+    
+    history = in_sample_forecast(model, uncertainty)
+    if history_days is not None:
+        history = history[history['ds'] > last_date - pd.Timedelta(days=history_days)]
+    return pd.concat([history, forecast], ignore_index=True)
 
-def predict_specific_date(model, date_str):
+@instrumented("model.predict_specific_date")
+def predict_specific_date(model, date_str, uncertainty=None):
     """
     Predicts price for a specific date (YYYY-MM-DD).
-    Returns the predicted price (yhat).
+    Returns the predicted price (yhat) with its lower/upper bounds for the given interval mode.
     """
     future_date = pd.to_datetime(date_str)
+    uncertainty = uncertainty or DEFAULT_UNCERTAINTY_MODE
+    
+    # Dates inside the precomputed grid are a plain array lookup
+    grid = getattr(model, 'forecast_grid', None)
+    if grid is not None and grid['mode'] == uncertainty:
+        row = _grid_lookup(grid, future_date)
+        if row is not None:
+            return row[0], row[1], row[2]
     
     # created a dataframe with just this date
     future_df = pd.DataFrame({'ds': [future_date]})
     
-    forecast = model.predict(future_df)
+    forecast = predict_with_uncertainty(model, future_df, uncertainty)
     
     if not forecast.empty:
         return forecast['yhat'].iloc[0], forecast['yhat_lower'].iloc[0], forecast['yhat_upper'].iloc[0]
     return None, None, None
+
+def _expand_dates(dates):
+    """
+    Flattens a mix of single dates and (start, end) ranges into a sorted, de-duplicated DatetimeIndex of days.
+    """
+    parts = []
+    singles = []
+    for item in dates:
+        if isinstance(item, (tuple, list)) and len(item) == 2:
+            parts.append(pd.date_range(start=item[0], end=item[1], freq='D'))
+        else:
+            singles.append(item)
+    if singles:
+        parts.append(pd.DatetimeIndex(pd.to_datetime(singles)).normalize())
+    if not parts:
+        return pd.DatetimeIndex([])
+    return parts[0].append(parts[1:]).unique().sort_values()
+
+@instrumented("model.predict_batch")
+def predict_batch(models, dates, fx_rate=None, unit_factor=1.0, uncertainty=None, fx_frame=None):
+    """
+    Predicts many dates for several assets at once.
+    Dates covered by a model's forecast grid are looked up in one vectorized step;
+    the rest go through a single predict call per model.
+    Args:
+        models (dict): Ticker -> fitted model.
+        dates (list): Dates (str/Timestamp) and/or (start, end) tuples for inclusive daily ranges.
+        fx_rate (float): USD -> INR rate; when given, '*_inr' columns are added.
+        unit_factor (float): Multiplier for unit conversion (e.g., oz -> 1g), applied with the FX rate.
+        fx_frame (pd.DataFrame): USDINR history ('Date', 'Close'); instead of fx_rate, each date is
+                                 converted with the latest quote on or before it.
+        uncertainty (str): Interval mode (see UNCERTAINTY_MODES).
+    Returns:
+        pd.DataFrame: One row per (ticker, ds) with yhat, yhat_lower, yhat_upper (+ INR columns).
+    """
+    ds = _expand_dates(dates)
+    uncertainty = uncertainty or DEFAULT_UNCERTAINTY_MODE
+    frames = []
+    
+    for ticker, model in models.items():
+        values = np.full((len(ds), 3), np.nan)
+        missing = np.ones(len(ds), dtype=bool)
+        
+        grid = getattr(model, 'forecast_grid', None)
+        if grid is not None and grid['mode'] == uncertainty and len(ds):
+            offsets = (ds.values.astype('datetime64[D]') - grid['start']).astype(np.int64)
+            in_grid = (offsets >= 0) & (offsets < len(grid['values']))
+            values[in_grid] = grid['values'][offsets[in_grid]]
+            missing = ~in_grid
+        
+        if missing.any():
+            forecast = predict_with_uncertainty(model, pd.DataFrame({'ds': ds[missing]}), uncertainty)
+            values[missing] = forecast[['yhat', 'yhat_lower', 'yhat_upper']].to_numpy(dtype=np.float64)
+        
+        frames.append(pd.DataFrame({
+            'ticker': ticker,
+            'ds': ds,
+            'yhat': values[:, 0],
+            'yhat_lower': values[:, 1],
+            'yhat_upper': values[:, 2],
+        }))
+    
+    if not frames:
+        return pd.DataFrame(columns=['ticker', 'ds', 'yhat', 'yhat_lower', 'yhat_upper'])
+    result = pd.concat(frames, ignore_index=True)
+    
+    if fx_frame is not None:
+        from conversion import add_fx_columns
+        add_fx_columns(result, fx_frame, unit_factor)
+    elif fx_rate is not None:
+        factor = fx_rate * unit_factor
+        inr = result[['yhat', 'yhat_lower', 'yhat_upper']].to_numpy() * factor
+        result['yhat_inr'] = inr[:, 0]
+        result['yhat_lower_inr'] = inr[:, 1]
+        result['yhat_upper_inr'] = inr[:, 2]
+    
+    return result
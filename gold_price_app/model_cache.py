@@ -0,0 +1,142 @@
+import os
+import json
+import hashlib
+import tempfile
+import pandas as pd
+
+from config import MODEL_DIR
+
+# Bump when the stored artifact format or the training setup changes, to orphan old artifacts
+CACHE_VERSION = 2
+
+# Total size the artifact folder may grow to before least recently used artifacts are evicted
+MAX_CACHE_BYTES = int(os.environ.get("GOLD_APP_MODEL_CACHE_MB", "256")) * 1024 * 1024
+
+def fingerprint(df_train, ticker=None, params=None, backend_version=""):
+    """
+    Builds the cache key for a training run.
+    Args:
+        df_train (pd.DataFrame): Training frame with 'ds' and 'y' columns.
+        ticker (str): Ticker symbol the data belongs to (optional).
+        params (dict): Model constructor arguments (optional).
+        backend_version (str): Version of the forecasting library, so an upgrade invalidates old fits.
+    Returns:
+        str: Hex digest identifying the data + configuration.
+    """
+    h = hashlib.sha256()
+    header = {
+        'cache_version': CACHE_VERSION,
+        'backend_version': backend_version,
+        'ticker': ticker,
+        'params': params or {},
+        'rows': len(df_train),
+        'start': str(df_train['ds'].min()) if len(df_train) else None,
+        'end': str(df_train['ds'].max()) if len(df_train) else None,
+    }
+    h.update(json.dumps(header, sort_keys=True, default=str).encode())
+    h.update(pd.util.hash_pandas_object(df_train[['ds', 'y']], index=False).values.tobytes())
+    return h.hexdigest()
+
+def _path(key, directory=None):
+    return os.path.join(directory or MODEL_DIR, f"{key}.json")
+
+def lineage(ticker, params=None, backend_version=""):
+    """
+    Identifies a series of fits of the same asset and configuration (across data updates).
+    """
+    header = {'cache_version': CACHE_VERSION, 'backend_version': backend_version,
+              'ticker': ticker, 'params': params or {}}
+    return hashlib.sha256(json.dumps(header, sort_keys=True, default=str).encode()).hexdigest()
+
+def latest(lineage_key):
+    """
+    Returns the artifact key most recently saved for a lineage, or None.
+    """
+    try:
+        with open(os.path.join(MODEL_DIR, f"{lineage_key}.latest"), "r") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def set_latest(lineage_key, key):
+    """
+    Records key as the newest artifact of a lineage.
+    """
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=MODEL_DIR, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        f.write(key)
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, os.path.join(MODEL_DIR, f"{lineage_key}.latest"))
+
+def load(key, directory=None):
+    """
+    Returns the serialized model stored under key, or None on a cache miss.
+    directory selects another artifact folder than MODEL_DIR (e.g. FOLD_MODEL_DIR).
+    """
+    path = _path(key, directory)
+    try:
+        with open(path, "r") as f:
+            payload = f.read()
+    except FileNotFoundError:
+        return None
+    
+    # Touch the file so eviction treats it as recently used
+    os.utime(path)
+    return payload
+
+def save(key, payload, directory=None):
+    """
+    Stores a serialized model under key and evicts old artifacts if the cache is over budget.
+    directory selects another artifact folder than MODEL_DIR; each folder is evicted on its own.
+    """
+    directory = directory or MODEL_DIR
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(payload)
+        # mkstemp creates the file 0600; artifacts are shared with workers and other deploy users
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, _path(key, directory))
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    
+    evict(keep=key, directory=directory)
+
+def evict(keep=None, max_bytes=None, directory=None):
+    """
+    Deletes least recently used artifacts until the cache fits in max_bytes.
+    Args:
+        keep (str): Key that must never be evicted (the artifact just written).
+        max_bytes (int): Size budget (defaults to MAX_CACHE_BYTES).
+        directory (str): Artifact folder (defaults to MODEL_DIR).
+    """
+    max_bytes = MAX_CACHE_BYTES if max_bytes is None else max_bytes
+    directory = directory or MODEL_DIR
+    if not os.path.isdir(directory):
+        return
+    
+    entries = []
+    for name in os.listdir(directory):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, name[:-len(".json")], path))
+    
+    total = sum(size for _, size, _, _ in entries)
+    for _, size, key, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if key == keep:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
@@ -0,0 +1,203 @@
+import json
+from statistics import NormalDist
+import numpy as np
+import pandas as pd
+
+ENGINE_VERSION = "1"
+
+# Fourier periods in days and default orders (daily bars carry no intraday seasonality)
+YEARLY_PERIOD = 365.25
+WEEKLY_PERIOD = 7.0
+
+class LinearSeasonalModel:
+    """
+    Lightweight forecaster: piecewise-linear trend plus Fourier seasonality, fitted by
+    regularized least squares in pure NumPy.
+    Mirrors the parts of the Prophet interface the app uses (fit, predict, history),
+    and returns the same ds/yhat/yhat_lower/yhat_upper frame.
+    """
+    engine = 'numpy'
+    
+    def __init__(self, n_changepoints=25, changepoint_range=0.8, yearly_order=10, weekly_order=3,
+                 changepoint_penalty=1e-5, seasonality_penalty=1e-4, interval_width=0.8):
+        self.n_changepoints = n_changepoints
+        self.changepoint_range = changepoint_range
+        self.yearly_order = yearly_order
+        self.weekly_order = weekly_order
+        self.changepoint_penalty = changepoint_penalty
+        self.seasonality_penalty = seasonality_penalty
+        self.interval_width = interval_width
+        self.history = None
+    
+    def _t(self, ds):
+        return (pd.to_datetime(ds).values.astype('datetime64[ns]').astype(np.int64) - self.start) / self.t_scale
+    
+    def _design(self, ds):
+        """
+        Builds the regression matrix: [1, t, (t - c_j)+ ..., yearly sin/cos ..., weekly sin/cos ...].
+        """
+        t = self._t(ds)
+        days = pd.to_datetime(ds).values.astype('datetime64[ns]').astype(np.int64) / 86400e9
+        cols = [np.ones_like(t), t]
+        cols.extend(np.maximum(t[:, None] - self.changepoints_t[None, :], 0.0).T)
+        for period, order in ((YEARLY_PERIOD, self.yearly_order), (WEEKLY_PERIOD, self.weekly_order)):
+            for k in range(1, order + 1):
+                angle = 2.0 * np.pi * k * days / period
+                cols.append(np.sin(angle))
+                cols.append(np.cos(angle))
+        return np.column_stack(cols)
+    
+    def _penalty(self):
+        n_cp = len(self.changepoints_t)
+        n_season = 2 * (self.yearly_order + self.weekly_order)
+        return np.diag(np.r_[0.0, 0.0, np.full(n_cp, self.changepoint_penalty), np.full(n_season, self.seasonality_penalty)])
+    
+    def fit(self, df):
+        """
+        Fits the model on a frame with 'ds' and 'y' columns.
+        """
+        history = df[['ds', 'y']].dropna().sort_values('ds').reset_index(drop=True)
+        history['ds'] = pd.to_datetime(history['ds'])
+        ds_ns = history['ds'].values.astype('datetime64[ns]').astype(np.int64)
+        
+        self.start = int(ds_ns[0])
+        self.t_scale = float(max(ds_ns[-1] - ds_ns[0], 1))
+        self.y_scale = float(np.abs(history['y']).max()) or 1.0
+        
+        # Candidate changepoints evenly spread over the first changepoint_range of the history
+        t = (ds_ns - self.start) / self.t_scale
+        n_cp = min(self.n_changepoints, max(len(t) - 2, 0))
+        cp_idx = np.linspace(0, int(np.floor(len(t) * self.changepoint_range)) - 1, n_cp + 1).round().astype(int)[1:]
+        self.changepoints_t = t[cp_idx] if n_cp else np.array([])
+        
+        X = self._design(history['ds'])
+        y = history['y'].to_numpy(dtype=np.float64) / self.y_scale
+        
+        # Normal equations are kept so appended rows can update the fit without rebuilding X
+        self.xtx = X.T @ X
+        self.xty = X.T @ y
+        self.yty = float(y @ y)
+        self.n_obs = len(y)
+        self._solve()
+        
+        history['t'] = t
+        self.history = history
+        return self
+    
+    def update(self, df):
+        """
+        Refreshes the fit with rows from the last history date onwards (that last bar may have been
+        partial, so it is replaced). Only the new rows are added to the stored normal equations;
+        the time origin, scaling and changepoints stay those of the original fit.
+        """
+        new = df[['ds', 'y']].dropna().sort_values('ds').reset_index(drop=True)
+        new['ds'] = pd.to_datetime(new['ds'])
+        last = self.history.iloc[-1]
+        new = new[new['ds'] >= last['ds']].reset_index(drop=True)
+        
+        # Take the old last row out of the normal equations, then add the new rows
+        x_old = self._design(pd.Series([last['ds']]))[0]
+        y_old = last['y'] / self.y_scale
+        self.xtx -= np.outer(x_old, x_old)
+        self.xty -= x_old * y_old
+        self.yty -= y_old * y_old
+        
+        X = self._design(new['ds'])
+        y = new['y'].to_numpy(dtype=np.float64) / self.y_scale
+        self.xtx += X.T @ X
+        self.xty += X.T @ y
+        self.yty += float(y @ y)
+        self.n_obs += len(y) - 1
+        self._solve()
+        
+        new['t'] = self._t(new['ds'])
+        self.history = pd.concat([self.history.iloc[:-1], new], ignore_index=True)
+        return self
+    
+    def _solve(self):
+        self.beta = np.linalg.solve(self.xtx + self._penalty() * self.n_obs, self.xty)
+        # Residual variance from the normal equations: (y - Xb)'(y - Xb) = y'y - 2b'X'y + b'X'Xb
+        sse = self.yty - 2.0 * self.beta @ self.xty + self.beta @ self.xtx @ self.beta
+        self.sigma = float(np.sqrt(max(sse, 0.0) / max(self.n_obs - len(self.beta), 1)))
+    
+    def predict(self, df):
+        """
+        Predicts the dates in df['ds'].
+        Returns:
+            pd.DataFrame: 'ds', 'trend', 'yhat', 'yhat_lower', 'yhat_upper'.
+        """
+        if self.history is None:
+            raise Exception('Model has not been fit.')
+        
+        ds = pd.to_datetime(df['ds']).reset_index(drop=True)
+        X = self._design(ds)
+        n_trend = 2 + len(self.changepoints_t)
+        trend = X[:, :n_trend] @ self.beta[:n_trend] * self.y_scale
+        yhat = X @ self.beta * self.y_scale
+        
+        # Residual noise plus trend uncertainty that grows past the end of the history,
+        # the same changepoint-rate model Prophet simulates
+        deltas = self.beta[2:n_trend]
+        b = np.mean(np.abs(deltas)) + 1e-8 if len(deltas) else 0.0
+        horizon = np.clip(self._t(ds) - 1.0, 0.0, None)
+        sd = self.y_scale * np.sqrt(self.sigma ** 2 + 2.0 * b ** 2 * len(deltas) * horizon ** 3 / 3.0)
+        z = NormalDist().inv_cdf(0.5 + self.interval_width / 2)
+        
+        return pd.DataFrame({
+            'ds': ds,
+            'trend': trend,
+            'yhat': yhat,
+            'yhat_lower': yhat - z * sd,
+            'yhat_upper': yhat + z * sd,
+        })
+    
+    def get_params(self):
+        return {
+            'n_changepoints': self.n_changepoints,
+            'changepoint_range': self.changepoint_range,
+            'yearly_order': self.yearly_order,
+            'weekly_order': self.weekly_order,
+            'changepoint_penalty': self.changepoint_penalty,
+            'seasonality_penalty': self.seasonality_penalty,
+            'interval_width': self.interval_width,
+        }
+
+def model_to_json(model):
+    """
+    Serializes a fitted LinearSeasonalModel to a JSON string.
+    """
+    return json.dumps({
+        'params': model.get_params(),
+        'start': model.start,
+        't_scale': model.t_scale,
+        'y_scale': model.y_scale,
+        'changepoints_t': model.changepoints_t.tolist(),
+        'xtx': model.xtx.tolist(),
+        'xty': model.xty.tolist(),
+        'yty': model.yty,
+        'n_obs': model.n_obs,
+        'history_ds': model.history['ds'].values.astype('datetime64[ns]').astype(np.int64).tolist(),
+        'history_y': model.history['y'].tolist(),
+    })
+
+def model_from_json(payload):
+    """
+    Rebuilds a LinearSeasonalModel from model_to_json output.
+    """
+    data = json.loads(payload)
+    model = LinearSeasonalModel(**data['params'])
+    model.start = data['start']
+    model.t_scale = data['t_scale']
+    model.y_scale = data['y_scale']
+    model.changepoints_t = np.array(data['changepoints_t'], dtype=np.float64)
+    model.xtx = np.array(data['xtx'], dtype=np.float64)
+    model.xty = np.array(data['xty'], dtype=np.float64)
+    model.yty = data['yty']
+    model.n_obs = data['n_obs']
+    
+    history = pd.DataFrame({'ds': pd.to_datetime(np.array(data['history_ds'], dtype='datetime64[ns]')),
+                            'y': data['history_y']})
+    history['t'] = model._t(history['ds'])
+    model.history = history
+    model._solve()
+    return model
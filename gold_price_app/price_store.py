@@ -0,0 +1,133 @@
+import os
+import time
+import tempfile
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from config import PRICE_DIR
+
+# Schema metadata key holding the earliest start date the file was downloaded from
+START_KEY = b"start_date"
+
+# Intraday bars are stored in their compact columnar form (see bars.Bars), one file per ticker and bar size
+BAR_SCHEMA = [("ts", pa.int64()), ("open", pa.float32()), ("high", pa.float32()),
+              ("low", pa.float32()), ("close", pa.float32())]
+
+def _path(ticker, interval=None):
+    """
+    Maps a ticker (and intraday bar size) to its Arrow IPC file.
+    """
+    safe_name = "".join(c if c.isalnum() else "_" for c in ticker)
+    suffix = f"_{interval}" if interval else ""
+    return os.path.join(PRICE_DIR, f"{safe_name}{suffix}.arrow")
+
+def _write_table(path, table):
+    os.makedirs(PRICE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=PRICE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as sink:
+            with ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        # mkstemp creates the file 0600; store files are shared with workers and other deploy users
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+def read_prices(ticker):
+    """
+    Reads the stored history for a ticker from a memory-mapped Arrow file.
+    Columns are zero-copy, read-only views of the mapping (split_blocks keeps pandas from
+    consolidating them into a new block), so every session and worker process on the host
+    shares the same page-cache pages instead of holding its own copy. Writing into them raises
+    ValueError (pandas does not copy them on write); callers that edit values must .copy() first.
+    Args:
+        ticker (str): Ticker symbol.
+    Returns:
+        pd.DataFrame: Stored OHLCV rows sorted by Date (empty if nothing stored); treat as immutable.
+        str: Start date the history was downloaded from (None if nothing stored).
+    """
+    path = _path(ticker)
+    if not os.path.exists(path):
+        return pd.DataFrame(), None
+
+    # The mapping stays open as long as any column still references it; a later write_prices
+    # swaps in a new file and never touches the pages mapped here
+    table = ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+    metadata = table.schema.metadata or {}
+    start_date = metadata.get(START_KEY, b"").decode() or None
+    return table.to_pandas(split_blocks=True), start_date
+
+def write_prices(ticker, df, start_date):
+    """
+    Replaces the stored history for a ticker.
+    The file is written to a temp file first and swapped in, so readers never see a partial file.
+    Args:
+        ticker (str): Ticker symbol.
+        df (pd.DataFrame): OHLCV data with a 'Date' column.
+        start_date (str): Start date the history covers.
+    """
+    table = pa.Table.from_pandas(df.reset_index(drop=True), preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), START_KEY: str(start_date).encode()})
+    _write_table(_path(ticker), table)
+
+def append_prices(ticker, df_new, start_date):
+    """
+    Appends newly fetched rows to the stored history.
+    Rows for dates already stored are replaced (the last bar of a trading day keeps changing until close).
+    Returns:
+        pd.DataFrame: The full updated history, read back from the store (zero-copy, like read_prices).
+    """
+    df_old, _ = read_prices(ticker)
+    if df_old.empty:
+        df_all = df_new
+    elif df_new.empty:
+        df_all = df_old
+    else:
+        df_all = pd.concat([df_old, df_new], ignore_index=True)
+        df_all = df_all.drop_duplicates(subset='Date', keep='last')
+
+    df_all = df_all.sort_values('Date').reset_index(drop=True)
+    write_prices(ticker, df_all, start_date)
+    return read_prices(ticker)[0]
+
+def read_bars(ticker, interval):
+    """
+    Reads stored intraday bars. The arrays are zero-copy views of the memory-mapped file,
+    so only the pages actually touched are loaded.
+    Returns:
+        Bars: Stored bars (None if nothing stored).
+        str: Start date the bars were downloaded from (None if nothing stored).
+    """
+    from bars import Bars
+    path = _path(ticker, interval)
+    if not os.path.exists(path):
+        return None, None
+
+    table = ipc.open_file(pa.memory_map(path, "r")).read_all().combine_chunks()
+    metadata = table.schema.metadata or {}
+    start_date = metadata.get(START_KEY, b"").decode() or None
+    columns = [table.column(i).chunk(0).to_numpy(zero_copy_only=True) if table.num_rows else
+               table.column(i).to_numpy() for i in range(table.num_columns)]
+    return Bars(*columns, interval), start_date
+
+def write_bars(ticker, bars, start_date):
+    """
+    Replaces the stored intraday bars for a ticker (at bars.interval), atomically like write_prices.
+    """
+    schema = pa.schema(BAR_SCHEMA + [("volume", pa.from_numpy_dtype(bars.volume.dtype))],
+                       metadata={START_KEY: str(start_date).encode()})
+    arrays = [pa.array(c) for c in (bars.ts, bars.open, bars.high, bars.low, bars.close, bars.volume)]
+    _write_table(_path(ticker, bars.interval), pa.Table.from_arrays(arrays, schema=schema))
+
+def store_age(ticker, interval=None):
+    """
+    Returns the age in seconds of the stored history for a ticker (None if nothing stored).
+    """
+    path = _path(ticker, interval)
+    if not os.path.exists(path):
+        return None
+    return time.time() - os.path.getmtime(path)
@@ -0,0 +1,282 @@
+import os
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+
+from config import DATA_PROVIDER, REPLAY_DIR, SYNTHETIC_SEED
+
+# Bar sizes the offline providers understand (pandas offsets)
+INTERVALS = {'1m': '1min', '2m': '2min', '5m': '5min', '15m': '15min', '30m': '30min',
+             '60m': '60min', '1h': '60min', '1d': 'B'}
+
+def _period_start(period, end):
+    """
+    Translates a yfinance-style period ('1d', '5d', '1mo', '1y', ...) into a start timestamp.
+    """
+    units = {'d': 'days', 'wk': 'weeks', 'mo': 'months', 'y': 'years'}
+    for suffix, unit in units.items():
+        if period.endswith(suffix) and period[:-len(suffix)].isdigit():
+            n = int(period[:-len(suffix)])
+            if unit == 'days':
+                # '1d' means the latest session, which may be several calendar days back over a weekend
+                return end - pd.Timedelta(days=n + 4)
+            return end - pd.DateOffset(**{unit: n})
+    if period == 'max':
+        return pd.Timestamp('1970-01-01')
+    raise ValueError(f"Unsupported period '{period}'")
+
+class DataProvider:
+    """
+    Source of OHLCV bars. Subclasses implement history(); the rest has sensible defaults.
+    All frames have the columns Date, Open, High, Low, Close, Volume, sorted by Date.
+    """
+    name = None
+
+    def history(self, ticker, start=None, end=None, period=None, interval='1d'):
+        raise NotImplementedError
+
+    def history_many(self, requests_by_ticker):
+        """
+        Args:
+            requests_by_ticker (dict): Ticker -> history() keyword arguments.
+        Returns:
+            dict: Ticker -> DataFrame, or the Exception raised for that ticker.
+        """
+        results = {}
+        for ticker, kwargs in requests_by_ticker.items():
+            try:
+                results[ticker] = self.history(ticker, **kwargs)
+            except Exception as e:
+                results[ticker] = e
+        return results
+
+    def latest(self, ticker):
+        """
+        Returns the latest close for a ticker (None if unavailable).
+        """
+        data = self.history(ticker, period='1d')
+        return None if data.empty else data['Close'].iloc[-1]
+
+    def _window(self, start, end, period):
+        end = pd.Timestamp(end) if end is not None else pd.Timestamp.now()
+        if period:
+            start = _period_start(period, end)
+        start = pd.Timestamp(start) if start is not None else pd.Timestamp('1970-01-01')
+        return start, end
+
+class LiveProvider(DataProvider):
+    """
+    Yahoo Finance via yfinance, through the shared fetcher (rate limiting, retries, request sharing).
+    """
+    name = 'live'
+
+    def history(self, ticker, start=None, end=None, period=None, interval='1d'):
+        from fetcher import get_fetcher
+        return get_fetcher().fetch(ticker, start=start, end=end, period=period, interval=interval)
+
+    def history_many(self, requests_by_ticker):
+        from fetcher import get_fetcher
+        return get_fetcher().fetch_many(requests_by_ticker)
+
+def _snapshot_path(directory, ticker, interval='1d'):
+    safe_name = "".join(c if c.isalnum() else "_" for c in ticker)
+    suffix = "" if interval == '1d' else f"_{interval}"
+    return os.path.join(directory, f"{safe_name}{suffix}.parquet")
+
+class ReplayProvider(DataProvider):
+    """
+    Serves recorded Parquet snapshots (see record_snapshots), filtered to the requested window.
+    """
+    name = 'replay'
+
+    def __init__(self, directory=REPLAY_DIR):
+        self.directory = directory
+        self._frames = {}
+        self._lock = threading.Lock()
+
+    def _load(self, ticker, interval):
+        key = (ticker, interval)
+        with self._lock:
+            if key not in self._frames:
+                path = _snapshot_path(self.directory, ticker, interval)
+                if not os.path.exists(path):
+                    raise FileNotFoundError(f"No recorded snapshot for {ticker} ({interval}) in {self.directory}")
+                self._frames[key] = pd.read_parquet(path)
+            return self._frames[key]
+
+    def history(self, ticker, start=None, end=None, period=None, interval='1d'):
+        data = self._load(ticker, interval)
+        start, end = self._window(start, end, period)
+        dates = data['Date']
+        lo, hi = dates.searchsorted(start), dates.searchsorted(end, side='right')
+        result = data.iloc[lo:hi].reset_index(drop=True)
+        if period == '1d':
+            result = result.iloc[-1:].reset_index(drop=True)
+        return result
+
+class SyntheticProvider(DataProvider):
+    """
+    Generates realistic OHLCV series of any length and bar size: geometric Brownian motion
+    with yearly and weekly seasonality in the drift. Bars are a pure function of
+    (seed, ticker, bar time), so overlapping requests always agree.
+    """
+    name = 'synthetic'
+
+    # Starting level and annualized drift / volatility per ticker (unknown tickers use DEFAULT_PARAMS)
+    PARAMS = {
+        "GC=F": (1200.0, 0.08, 0.15),
+        "SI=F": (16.0, 0.06, 0.28),
+        "PL=F": (1200.0, -0.02, 0.25),
+        "PA=F": (800.0, 0.03, 0.35),
+        "USDINR=X": (63.0, 0.025, 0.05),
+        "EUR=X": (0.83, 0.0, 0.07),
+        "AED=X": (3.6725, 0.0, 0.002),
+    }
+    DEFAULT_PARAMS = (100.0, 0.05, 0.20)
+    ORIGIN = pd.Timestamp('2015-01-02')
+
+    # Bars per generated block; blocks are seeded independently and chained by their log-price sums
+    BLOCK = 4096
+
+    def __init__(self, seed=SYNTHETIC_SEED, seasonal_amplitude=0.05):
+        self.seed = seed
+        self.seasonal_amplitude = seasonal_amplitude
+        self._block_sums = {}
+        self._lock = threading.Lock()
+
+    def _rng(self, ticker, interval, block):
+        digest = hashlib.sha256(f"{self.seed}:{ticker}:{interval}:{block}".encode()).digest()
+        return np.random.default_rng(int.from_bytes(digest[:8], 'little'))
+
+    def _bar_times(self, start, end, interval):
+        freq = INTERVALS[interval]
+        if interval == '1d':
+            return pd.bdate_range(start.normalize(), end.normalize())
+        # Intraday bars run round the clock on weekdays, like metal futures on Globex
+        times = pd.date_range(start.floor(freq), end, freq=freq)
+        return times[times.dayofweek < 5]
+
+    def _bar_index(self, times, interval):
+        """
+        Index of each bar counted from ORIGIN (business days, or fixed steps for intraday bars).
+        """
+        if interval == '1d':
+            return np.busday_count(self.ORIGIN.date(), times.values.astype('datetime64[D]'))
+        step = pd.Timedelta(INTERVALS[interval]).value
+        return (times.values.astype('datetime64[ns]').astype(np.int64) - self.ORIGIN.value) // step
+
+    def _normals(self, stream, ticker, interval, first, last):
+        """
+        Standard normal draws for bars first..last (inclusive) of one random stream, plus the sum
+        of all draws before `first` (needed to chain the random walk).
+        """
+        def block(b):
+            return self._rng(f"{ticker}:{stream}", interval, b).standard_normal(self.BLOCK)
+
+        first_block, last_block = first // self.BLOCK, last // self.BLOCK
+        with self._lock:
+            sums = self._block_sums.setdefault((ticker, stream, interval), [])
+            while len(sums) < first_block:
+                sums.append(block(len(sums)).sum())
+            before = float(np.sum(sums[:first_block]))
+
+        z = np.concatenate([block(b) for b in range(first_block, last_block + 1)])
+        start = first - first_block * self.BLOCK
+        before += z[:start].sum()
+        return z[start:start + (last - first + 1)], before
+
+    def history(self, ticker, start=None, end=None, period=None, interval='1d'):
+        start, end = self._window(start, end, period)
+        start = max(start, self.ORIGIN)
+        times = self._bar_times(start, end, interval)
+        if len(times) == 0:
+            return pd.DataFrame(columns=['Date', 'Open', 'High', 'Low', 'Close', 'Volume'])
+        if period == '1d':
+            times = times[-1:]
+
+        base, mu, sigma = self.PARAMS.get(ticker, self.DEFAULT_PARAMS)
+        bar_minutes = None if interval == '1d' else pd.Timedelta(INTERVALS[interval]).value / 60e9
+        dt = 1.0 / (252 if interval == '1d' else 252 * 24 * 60 / bar_minutes)
+        drift = (mu - 0.5 * sigma ** 2) * dt
+        vol = sigma * np.sqrt(dt)
+
+        # Log price = drift * n + vol * (sum of shocks so far) + seasonality. The walk runs over every
+        # bar slot from ORIGIN (weekend slots included for intraday bars), so any window agrees with any other
+        idx = self._bar_index(times, interval)
+        first, last = int(idx[0]), int(idx[-1])
+        z_all, z_before = self._normals('close', ticker, interval, first, last)
+        z = z_all[idx - first]
+        walk = drift * (idx + 1) + vol * (z_before + np.cumsum(z_all)[idx - first])
+
+        years = (times.values.astype('datetime64[ns]').astype(np.int64) - self.ORIGIN.value) / (365.25 * 86400e9)
+        seasonal = self.seasonal_amplitude * (np.sin(2 * np.pi * years) + 0.2 * np.sin(2 * np.pi * years * 52.18))
+        close = base * np.exp(walk + seasonal)
+
+        # Open before the bar's shock; high/low spread and volume from a per-bar stream
+        open_ = close * np.exp(-vol * z)
+        u, _ = self._normals('range', ticker, interval, first, last)
+        wiggle = np.abs(u[idx - first]) * vol * 0.5
+        high = np.maximum(open_, close) * (1 + wiggle)
+        low = np.minimum(open_, close) * (1 - wiggle)
+        volume = np.round(50_000 * np.exp(0.5 * u[idx - first]))
+
+        return pd.DataFrame({'Date': times, 'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume})
+
+PROVIDERS = {
+    'live': LiveProvider,
+    'replay': ReplayProvider,
+    'synthetic': SyntheticProvider,
+}
+
+_provider = None
+_provider_lock = threading.Lock()
+
+def get_provider():
+    """
+    Returns the process-wide provider selected by GOLD_APP_PROVIDER.
+    """
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            if DATA_PROVIDER not in PROVIDERS:
+                raise ValueError(f"Unknown data provider '{DATA_PROVIDER}', expected one of {list(PROVIDERS)}")
+            _provider = PROVIDERS[DATA_PROVIDER]()
+        return _provider
+
+def set_provider(provider):
+    """
+    Replaces the process-wide provider (e.g. a ReplayProvider over a specific directory in a benchmark).
+    """
+    global _provider
+    with _provider_lock:
+        _provider = provider
+
+def record_snapshots(tickers, directory=REPLAY_DIR, provider=None, start="2020-01-01", interval='1d'):
+    """
+    Records history for tickers as Parquet snapshots that ReplayProvider can serve later.
+    Returns:
+        dict: Ticker -> number of rows recorded.
+    """
+    provider = provider or get_provider()
+    os.makedirs(directory, exist_ok=True)
+    counts = {}
+    for ticker in tickers:
+        data = provider.history(ticker, start=start, interval=interval)
+        data.to_parquet(_snapshot_path(directory, ticker, interval), index=False)
+        counts[ticker] = len(data)
+    return counts
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Record market-data snapshots for the replay provider.")
+    parser.add_argument("tickers", nargs="*", default=["GC=F", "SI=F", "USDINR=X"])
+    parser.add_argument("--dir", default=REPLAY_DIR)
+    parser.add_argument("--start", default="2020-01-01")
+    parser.add_argument("--interval", default="1d")
+    parser.add_argument("--provider", default=None, choices=list(PROVIDERS), help="Source to record (default: GOLD_APP_PROVIDER)")
+    args = parser.parse_args()
+
+    source = PROVIDERS[args.provider]() if args.provider else get_provider()
+    for ticker, rows in record_snapshots(args.tickers, args.dir, source, args.start, args.interval).items():
+        print(f"{ticker}: {rows} rows -> {_snapshot_path(args.dir, ticker, args.interval)}")
@@ -0,0 +1,121 @@
+import time
+import asyncio
+import logging
+import threading
+
+from providers import get_provider
+from config import QUOTE_POLL_SECONDS, QUOTE_TTL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+class QuoteCache:
+    """
+    Process-wide latest-price cache. Writers publish whole quotes, readers get them in O(1)
+    without ever touching the network.
+    """
+
+    def __init__(self, ttl=QUOTE_TTL_SECONDS):
+        self.ttl = ttl
+        self._quotes = {}
+        self._lock = threading.Lock()
+
+    def publish(self, ticker, price, fetched_at=None):
+        with self._lock:
+            self._quotes[ticker] = (float(price), fetched_at if fetched_at is not None else time.time())
+
+    def get(self, ticker):
+        """
+        Returns:
+            dict: 'price', 'fetched_at' (epoch seconds), 'age' (seconds) and 'stale' (older than the TTL),
+                  or None if the ticker was never fetched.
+        """
+        entry = self._quotes.get(ticker)
+        if entry is None:
+            return None
+        price, fetched_at = entry
+        age = time.time() - fetched_at
+        return {'price': price, 'fetched_at': fetched_at, 'age': age, 'stale': age > self.ttl}
+
+class QuotePoller:
+    """
+    Refreshes the latest quote of every tracked ticker on an asyncio loop running in a daemon thread.
+    A failed refresh keeps the previous quote, which then ages into 'stale'.
+    """
+
+    def __init__(self, cache, tickers, interval=QUOTE_POLL_SECONDS, timeout=30.0, provider=None):
+        self.cache = cache
+        self.tickers = set(tickers)
+        self.interval = interval
+        self.timeout = timeout
+        self.provider = provider
+        self.stats = {'polls': 0, 'updates': 0, 'errors': 0, 'last_poll': None}
+        self._loop = None
+        self._stop = None
+        self._thread = None
+
+    def track(self, tickers):
+        self.tickers.update(tickers)
+
+    async def _refresh(self, provider, ticker):
+        try:
+            price = await asyncio.wait_for(asyncio.to_thread(provider.latest, ticker), self.timeout)
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.warning("Quote refresh failed for %s: %s", ticker, e)
+            return
+        if price is not None:
+            self.cache.publish(ticker, price)
+            self.stats['updates'] += 1
+
+    async def poll_once(self):
+        provider = self.provider or get_provider()
+        await asyncio.gather(*(self._refresh(provider, t) for t in sorted(self.tickers)))
+        self.stats['polls'] += 1
+        self.stats['last_poll'] = time.time()
+
+    async def _run(self):
+        self._stop = asyncio.Event()
+        while not self._stop.is_set():
+            await self.poll_once()
+            try:
+                await asyncio.wait_for(self._stop.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_until_complete, args=(self._run(),),
+                                        name="quote-poller", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+quote_cache = QuoteCache()
+
+_poller = None
+_poller_lock = threading.Lock()
+
+def start_poller(tickers, interval=QUOTE_POLL_SECONDS):
+    """
+    Starts the process-wide poller (or adds tickers to the running one) and returns it.
+    """
+    global _poller
+    with _poller_lock:
+        if _poller is None:
+            _poller = QuotePoller(quote_cache, tickers, interval)
+        else:
+            _poller.track(tickers)
+        return _poller.start()
+
+def get_quote(ticker):
+    """
+    Latest cached quote for a ticker (see QuoteCache.get); never blocks on the network.
+    """
+    return quote_cache.get(ticker)
@@ -0,0 +1,351 @@
+import sys
+import json
+import logging
+import math
+import time
+import argparse
+import calendar
+import threading
+from datetime import date
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import numpy as np
+import pandas as pd
+
+from config import METALS, UNITS
+from market_data import fetch_histories
+from training import train_assets, format_report
+from model import predict_specific_date, predict_future, predict_batch, UNCERTAINTY_MODES, DEFAULT_UNCERTAINTY_MODE
+from cube import get_cube, data_version, cube_monthly_stats, cube_yearly_analysis
+from conversion import ConversionEngine, add_fx_columns
+import instrumentation
+
+logger = logging.getLogger(__name__)
+
+# Headless JSON API over the same data/model/analytics modules as the Streamlit app:
+#   python service.py --port 8080
+#   curl "http://127.0.0.1:8080/predict?asset=Gold&date=2027-01-15&currency=INR&unit=g"
+# Endpoints (GET unless noted):
+#   /health                                        pool status and data version
+#   /predict?asset&date[&currency&unit&uncertainty]          one date
+#   /predict/batch (POST) {"assets", "dates", "currency", "unit", "uncertainty"}
+#                                                  dates may mix "YYYY-MM-DD" and ["start", "end"] ranges
+#   /forecast?asset&periods[&history_days&currency&unit&uncertainty]
+#   /monthly?asset&month&year[&currency&unit]      month name or number
+#   /yearly?asset&year[&currency&unit]
+#   /metrics                                       stage timings, Prometheus text (GOLD_APP_INSTRUMENT=1)
+
+FX_TICKER = "USDINR=X"
+
+class ServiceError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class ModelPool:
+    """
+    Market data, fitted models and the aggregate cube, loaded once and shared by every request thread.
+    reload() builds a complete new generation first and swaps it in atomically, so requests
+    never see a half-loaded pool.
+    """
+
+    def __init__(self, tickers=("GC=F", "SI=F"), start_date="2020-01-01", engine=None):
+        self.tickers = list(tickers)
+        self.start_date = start_date
+        self.engine = engine
+        self.state = None
+        self._reload_lock = threading.Lock()
+
+    def reload(self):
+        with self._reload_lock:
+            started = time.perf_counter()
+            all_tickers = self.tickers + [FX_TICKER]
+            # One concurrent fetch refreshes the store; the training workers then only read it
+            loaded = fetch_histories(all_tickers, start_date=self.start_date)
+            for ticker, res in loaded.items():
+                if isinstance(res, Exception):
+                    raise RuntimeError(f"Failed to load {ticker}: {res}")
+            results = train_assets(all_tickers, start_date=self.start_date, model_tickers=self.tickers,
+                                   engine=self.engine, fetch=False)
+            logger.info("Reloaded models:\n%s", format_report(results))
+            for ticker, res in results.items():
+                if res['error'] is not None:
+                    raise RuntimeError(f"Failed to load {ticker}: {res['error']}")
+
+            frames = {t: results[t]['data'] for t in self.tickers}
+            df_fx = results[FX_TICKER]['data']
+            conversion = ConversionEngine({"INR": df_fx})
+            self.state = {
+                'frames': frames,
+                'fx': df_fx,
+                'models': {t: results[t]['model'] for t in self.tickers},
+                'cube': get_cube(frames, {"INR": df_fx}, engine=conversion),
+                'version': data_version({**frames, FX_TICKER: df_fx}),
+                'loaded_at': time.time(),
+                'load_seconds': time.perf_counter() - started,
+            }
+            return self.state
+
+    def get(self):
+        state = self.state
+        if state is None:
+            state = self.reload()
+        return state
+
+def _asset(value):
+    if not value:
+        raise ServiceError(400, "Missing 'asset'")
+    if not isinstance(value, str):
+        raise ServiceError(400, f"Asset must be a string, got {value!r}")
+    return METALS.get(value.capitalize(), value)
+
+def _unit_factor(currency, unit, state):
+    """
+    Multiplier from USD/oz to the requested currency and unit; INR uses the latest USDINR close.
+    """
+    if unit not in UNITS:
+        raise ServiceError(400, f"Unknown unit '{unit}', expected one of {list(UNITS)}")
+    if currency == 'USD':
+        return UNITS[unit]
+    if currency == 'INR':
+        return float(state['fx']['Close'].iloc[-1]) * UNITS[unit]
+    raise ServiceError(400, f"Unknown currency '{currency}', expected USD or INR")
+
+def _uncertainty(value):
+    value = value or DEFAULT_UNCERTAINTY_MODE
+    if value not in UNCERTAINTY_MODES:
+        raise ServiceError(400, f"Unknown uncertainty mode '{value}', expected one of {list(UNCERTAINTY_MODES)}")
+    return value
+
+def _number(value):
+    value = float(value)
+    return None if math.isnan(value) else value
+
+def _records(df, columns):
+    out = []
+    values = {c: df[c].to_numpy() for c in columns}
+    for i in range(len(df)):
+        row = {}
+        for c in columns:
+            v = values[c][i]
+            if isinstance(v, np.datetime64):
+                row[c] = str(v.astype('datetime64[D]'))
+            elif isinstance(v, (float, np.floating)):
+                row[c] = _number(v)
+            else:
+                row[c] = v.item() if hasattr(v, 'item') else v
+        out.append(row)
+    return out
+
+def handle_predict(pool, query):
+    state = pool.get()
+    ticker = _asset(query.get('asset'))
+    model = state['models'].get(ticker)
+    if model is None:
+        raise ServiceError(404, f"No model for asset '{ticker}'")
+    if not query.get('date'):
+        raise ServiceError(400, "Missing 'date'")
+    currency, unit = query.get('currency', 'USD').upper(), query.get('unit', 'oz')
+    factor = _unit_factor(currency, unit, state)
+
+    yhat, lower, upper = predict_specific_date(model, query['date'], uncertainty=_uncertainty(query.get('uncertainty')))
+    if yhat is None:
+        raise ServiceError(404, f"No prediction for {query['date']}")
+    return {'asset': ticker, 'date': str(pd.Timestamp(query['date']).date()), 'currency': currency, 'unit': unit,
+            'yhat': _number(yhat * factor), 'yhat_lower': _number(lower * factor), 'yhat_upper': _number(upper * factor)}
+
+def _list_field(body, key):
+    """
+    A JSON list field of the batch body; a bare string is taken as a one-element list.
+    """
+    value = body.get(key)
+    if isinstance(value, str):
+        return [value]
+    if value is not None and not isinstance(value, list):
+        raise ServiceError(400, f"'{key}' must be a list, got {type(value).__name__}")
+    return value
+
+def handle_batch(pool, body):
+    state = pool.get()
+    if not isinstance(body, dict):
+        raise ServiceError(400, "Request body must be a JSON object")
+    tickers = [_asset(a) for a in _list_field(body, 'assets') or state['models']]
+    unknown = [t for t in tickers if t not in state['models']]
+    if unknown:
+        raise ServiceError(404, f"No model for assets {unknown}")
+    dates = _list_field(body, 'dates')
+    if not dates:
+        raise ServiceError(400, "Missing 'dates'")
+    currency, unit = str(body.get('currency', 'USD')).upper(), body.get('unit', 'oz')
+    factor = _unit_factor(currency, unit, state)
+
+    result = predict_batch({t: state['models'][t] for t in tickers}, dates,
+                           uncertainty=_uncertainty(body.get('uncertainty')))
+    for col in ('yhat', 'yhat_lower', 'yhat_upper'):
+        result[col] = result[col].to_numpy() * factor
+    return {'currency': currency, 'unit': unit,
+            'predictions': _records(result, ['ticker', 'ds', 'yhat', 'yhat_lower', 'yhat_upper'])}
+
+def handle_forecast(pool, query):
+    state = pool.get()
+    ticker = _asset(query.get('asset'))
+    model = state['models'].get(ticker)
+    if model is None:
+        raise ServiceError(404, f"No model for asset '{ticker}'")
+    periods = int(query.get('periods', 30))
+    if not 1 <= periods <= 3650:
+        raise ServiceError(400, "'periods' must be between 1 and 3650")
+    history_days = int(query.get('history_days', 0))
+    currency, unit = query.get('currency', 'USD').upper(), query.get('unit', 'oz')
+    factor = _unit_factor(currency, unit, state)
+
+    forecast = predict_future(model, periods, history_days=history_days, uncertainty=_uncertainty(query.get('uncertainty')))
+    if currency == 'INR':
+        # History at the rate of the day, future at the latest rate (same as the app's forecast page)
+        add_fx_columns(forecast, state['fx'], UNITS[unit])
+        for col in ('yhat', 'yhat_lower', 'yhat_upper'):
+            forecast[col] = forecast[col + '_inr']
+    else:
+        for col in ('yhat', 'yhat_lower', 'yhat_upper'):
+            forecast[col] = forecast[col].to_numpy() * factor
+    return {'asset': ticker, 'currency': currency, 'unit': unit, 'periods': periods,
+            'forecast': _records(forecast, ['ds', 'yhat', 'yhat_lower', 'yhat_upper'])}
+
+def _cube_args(query, state):
+    ticker = _asset(query.get('asset'))
+    if ticker not in state['cube']['assets']:
+        raise ServiceError(404, f"No data for asset '{ticker}'")
+    currency, unit = query.get('currency', 'USD').upper(), query.get('unit', 'oz')
+    if currency not in state['cube']['currencies']:
+        raise ServiceError(400, f"Unknown currency '{currency}', expected one of {state['cube']['currencies']}")
+    if unit not in state['cube']['units']:
+        raise ServiceError(400, f"Unknown unit '{unit}', expected one of {state['cube']['units']}")
+    try:
+        year = int(query.get('year', date.today().year))
+    except ValueError:
+        raise ServiceError(400, "'year' must be an integer")
+    return ticker, currency, unit, year
+
+def handle_monthly(pool, query):
+    state = pool.get()
+    ticker, currency, unit, year = _cube_args(query, state)
+    month = query.get('month', calendar.month_name[date.today().month])
+    if month.isdigit() and 1 <= int(month) <= 12:
+        month = calendar.month_name[int(month)]
+    month = month.capitalize()
+    if month not in calendar.month_name[1:]:
+        raise ServiceError(400, f"Unknown month '{month}'")
+
+    stats = cube_monthly_stats(state['cube'], ticker, currency, unit, month, year)
+    if stats is None:
+        raise ServiceError(404, f"No data for {ticker} in {month} {year}")
+    return {'asset': ticker, 'month': month, 'year': year, 'currency': currency, 'unit': unit,
+            'stats': {k: v if isinstance(v, str) else _number(v) for k, v in stats.items()}}
+
+def handle_yearly(pool, query):
+    state = pool.get()
+    ticker, currency, unit, year = _cube_args(query, state)
+    months, summary = cube_yearly_analysis(state['cube'], ticker, currency, unit, year)
+    if months.empty:
+        raise ServiceError(404, f"No data for {ticker} in {year}")
+    return {'asset': ticker, 'year': year, 'currency': currency, 'unit': unit,
+            'months': _records(months, ['Month', 'Change', 'Highest', 'Lowest']),
+            'summary': {k: v if isinstance(v, str) else _number(v) for k, v in summary.items()}}
+
+def handle_health(pool, query):
+    state = pool.state
+    if state is None:
+        return {'status': 'loading'}
+    return {'status': 'ok', 'assets': list(state['models']), 'version': state['version'],
+            'loaded_at': state['loaded_at'], 'load_seconds': state['load_seconds']}
+
+def handle_metrics(pool, query):
+    return instrumentation.to_prometheus()
+
+ROUTES = {
+    ('GET', '/health'): handle_health,
+    ('GET', '/predict'): handle_predict,
+    ('POST', '/predict/batch'): handle_batch,
+    ('GET', '/forecast'): handle_forecast,
+    ('GET', '/monthly'): handle_monthly,
+    ('GET', '/yearly'): handle_yearly,
+    ('GET', '/metrics'): handle_metrics,
+}
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    pool = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _respond(self, status, payload):
+        if isinstance(payload, str):
+            body, content_type = payload.encode(), "text/plain; version=0.0.4"
+        else:
+            body, content_type = json.dumps(payload).encode(), "application/json"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _dispatch(self, method):
+        url = urlparse(self.path)
+        route = ROUTES.get((method, url.path.rstrip('/') or '/'))
+        if route is None:
+            self._respond(404, {'error': f"No route {method} {url.path}"})
+            return
+        try:
+            if method == 'POST':
+                length = int(self.headers.get('Content-Length') or 0)
+                arg = json.loads(self.rfile.read(length) or b"{}")
+            else:
+                arg = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            with instrumentation.span("service.request", route=url.path):
+                result = route(self.pool, arg)
+            self._respond(200, result)
+        except ServiceError as e:
+            self._respond(e.status, {'error': str(e)})
+        except (ValueError, TypeError, KeyError) as e:
+            self._respond(400, {'error': f"{type(e).__name__}: {e}"})
+        except Exception as e:
+            self._respond(500, {'error': f"{type(e).__name__}: {e}"})
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+def start_service(pool, host="127.0.0.1", port=8080):
+    """
+    Starts the service on a background thread; every request thread shares `pool`.
+    Returns:
+        ThreadingHTTPServer: Running server (base URL: f"http://{host}:{server.server_port}").
+    """
+    handler = type("Handler", (ServiceHandler,), {'pool': pool})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless JSON prediction service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--engine", default=None, help="Forecast engine (default: GOLD_APP_ENGINE)")
+    parser.add_argument("--start", default="2020-01-01", help="History start date")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+
+    pool = ModelPool(list(METALS.values())[:2], start_date=args.start, engine=args.engine)
+    pool.reload()
+    server = start_service(pool, args.host, args.port)
+    print(f"Serving predictions on http://{args.host}:{server.server_port}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        sys.exit(0)
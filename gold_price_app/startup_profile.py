@@ -0,0 +1,110 @@
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+# Cold-start report for the Streamlit app:
+#   python startup_profile.py                 import costs + time to first render of every section
+#   python startup_profile.py --imports-only
+# Every measurement runs in a fresh interpreter, so module caches never carry over.
+# Run it with a warm price store (or GOLD_APP_PROVIDER=synthetic/replay) so downloads do not dominate.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# What app.py imports at startup, and what it now defers until a section needs it
+STARTUP_MODULES = ["streamlit", "pandas", "data_loader", "analytics", "cube", "conversion", "quotes", "instrumentation"]
+DEFERRED_MODULES = ["plotly.graph_objs", "model", "training", "prophet", "yfinance"]
+
+SECTIONS = ["Date-wise Prediction", "Monthly Dashboard", "Yearly Analysis", "Forecast Trends"]
+
+_IMPORT_SNIPPET = """
+import sys, time, json
+sys.path.insert(0, {here!r})
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+print(json.dumps({{'seconds': time.perf_counter() - start, 'modules': len(sys.modules)}}))
+"""
+
+_RENDER_SNIPPET = """
+import sys, time, json
+sys.path.insert(0, {here!r})
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=600)
+at.session_state["section"] = {section!r}
+at.run()
+first = time.perf_counter() - start
+if {click!r} and not at.exception:
+    t = time.perf_counter()
+    at.button[0].click().run()
+    action = time.perf_counter() - t
+else:
+    action = None
+print(json.dumps({{'first_render': first, 'action': action, 'errors': [str(e.value) for e in at.exception]}}))
+"""
+
+def _run(code):
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=HERE)
+    lines = [l for l in out.stdout.splitlines() if l.startswith("{")]
+    if out.returncode or not lines:
+        raise RuntimeError(out.stderr[-2000:])
+    return json.loads(lines[-1])
+
+def import_seconds(modules):
+    """
+    Wall time to import `modules` in a fresh interpreter.
+    """
+    return _run(_IMPORT_SNIPPET.format(here=HERE, modules=list(modules)))
+
+def top_imports(modules, limit=15):
+    """
+    Slowest modules (cumulative microseconds) from `python -X importtime`.
+    """
+    code = "import sys; sys.path.insert(0, %r)\n" % HERE + "".join(f"import {m}\n" for m in modules)
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, cwd=HERE)
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        # Top-level entries (no nesting indent) carry the total cost of each import statement
+        if name.startswith("  "):
+            continue
+        rows.append((int(cumulative_us), name.strip()))
+    return sorted(rows, reverse=True)[:limit]
+
+def section_render(section, click):
+    """
+    Time to first render of one section in a fresh interpreter, plus the time of its main button when click is set.
+    """
+    return _run(_RENDER_SNIPPET.format(here=HERE, app=os.path.join(HERE, "app.py"), section=section, click=click))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Profile app cold start: import costs and time to first render.")
+    parser.add_argument("--imports-only", action="store_true")
+    parser.add_argument("--click", action="store_true", help="Also time each section's main button (trains models on forecast pages)")
+    args = parser.parse_args()
+
+    startup = import_seconds(STARTUP_MODULES)
+    deferred = import_seconds(STARTUP_MODULES + DEFERRED_MODULES)
+    print("Import cost (fresh interpreter)")
+    print(f"  startup modules             {startup['seconds']:6.2f}s  ({startup['modules']} modules loaded)")
+    print(f"  + deferred modules          {deferred['seconds']:6.2f}s  ({deferred['modules']} modules loaded)")
+    print(f"  saved at startup            {deferred['seconds'] - startup['seconds']:6.2f}s")
+    for name in DEFERRED_MODULES:
+        alone = import_seconds(STARTUP_MODULES + [name])
+        print(f"    {name:<26}{alone['seconds'] - startup['seconds']:6.2f}s")
+
+    print("\nSlowest imports at startup (cumulative)")
+    for cumulative_us, name in top_imports(STARTUP_MODULES):
+        print(f"  {cumulative_us / 1e6:6.3f}s  {name}")
+
+    if not args.imports_only:
+        print("\nTime to first render (fresh interpreter, includes Streamlit start-up)")
+        for section in SECTIONS:
+            res = section_render(section, args.click)
+            extra = f"   button {res['action']:6.2f}s" if res['action'] is not None else ""
+            status = f"   ERROR {res['errors']}" if res['errors'] else ""
+            print(f"  {section:<22}{res['first_render']:6.2f}s{extra}{status}")
@@ -0,0 +1,111 @@
+import os
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from config import TRAINING_WORKERS
+
+def _fetch_and_train(ticker, start_date, train, engine=None, return_data=True, fetch=True):
+    """
+    Worker: loads one asset and optionally fits its model.
+    With fetch off the asset is read from the price store only (the caller refreshed it already).
+    Runs in a separate process, so it returns the model as JSON (cheap to ship back)
+    and reports failures as a value instead of raising. With return_data off the price
+    frame is left out: the parent maps it from the price store the worker just refreshed
+    rather than unpickling a private copy.
+    """
+    from market_data import fetch_history, read_history
+    from model import train_model, serialize_model
+    
+    result = {'ticker': ticker, 'data': None, 'model_json': None, 'error': None,
+              'fetch_seconds': 0.0, 'train_seconds': 0.0}
+    start = time.perf_counter()
+    try:
+        df = fetch_history(ticker, start_date) if fetch else read_history(ticker, start_date)
+        result['data'] = df if return_data else None
+        result['fetch_seconds'] = time.perf_counter() - start
+        
+        if df.empty:
+            result['error'] = "No data returned"
+        elif train:
+            t_train = time.perf_counter()
+            model = train_model(df, ticker=ticker, engine=engine)
+            result['model_json'] = serialize_model(model)
+            result['forecast_grid'] = model.forecast_grid
+            result['fit'] = model.refresh_info['mode']
+            result['train_seconds'] = time.perf_counter() - t_train
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+def train_assets(tickers, start_date="2020-01-01", model_tickers=None, max_workers=None, engine=None, fetch=True):
+    """
+    Fetches several assets and fits their models concurrently, one process per asset.
+    A failure in one asset never affects the others; it is reported in that asset's 'error'.
+    Args:
+        tickers (list): Tickers to load.
+        start_date (str): Start date in 'YYYY-MM-DD' format.
+        model_tickers (list): Subset of tickers to train a model for (default: all of them).
+        max_workers (int): Process count (default: TRAINING_WORKERS, else one per asset capped at CPU count).
+        engine (str): Forecasting engine passed to train_model (default: model.DEFAULT_ENGINE).
+        fetch (bool): Refresh each asset from the network first; off when the caller has just refreshed
+                      the price store (e.g. with fetch_histories), so the workers only read it.
+    Returns:
+        dict: ticker -> {'data', 'model', 'error', 'seconds', 'fetch_seconds', 'train_seconds'}.
+              'seconds' is the wall-clock time spent on that asset.
+    """
+    from model import deserialize_model
+    from market_data import read_history
+    
+    tickers = list(dict.fromkeys(tickers))
+    model_tickers = set(tickers if model_tickers is None else model_tickers)
+    if max_workers is None:
+        max_workers = TRAINING_WORKERS or min(len(tickers), os.cpu_count() or 1)
+    
+    jobs = [(ticker, start_date, ticker in model_tickers, engine) for ticker in tickers]
+    raw = {}
+    
+    if max_workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            raw[job[0]] = _fetch_and_train(*job, fetch=fetch)
+    else:
+        # spawn, not fork: the Streamlit server process is multi-threaded
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=ctx) as pool:
+            futures = {pool.submit(_fetch_and_train, *job, return_data=False, fetch=fetch): job[0] for job in jobs}
+            for future in as_completed(futures):
+                ticker = futures[future]
+                try:
+                    raw[ticker] = future.result()
+                except Exception as e:
+                    # The worker process itself died (e.g. out of memory)
+                    raw[ticker] = {'ticker': ticker, 'data': None, 'model_json': None,
+                                   'error': f"{type(e).__name__}: {e}", 'seconds': 0.0,
+                                   'fetch_seconds': 0.0, 'train_seconds': 0.0}
+    
+    results = {}
+    for ticker in tickers:
+        res = raw[ticker]
+        if res['data'] is None and res['error'] is None:
+            res['data'] = read_history(ticker, start_date)
+        res['model'] = deserialize_model(res.pop('model_json')) if res.get('model_json') else None
+        if res['model'] is not None:
+            # The grid does not survive JSON serialization; reattach the one computed in the worker
+            res['model'].forecast_grid = res.pop('forecast_grid')
+        results[ticker] = res
+    return results
+
+def format_report(results):
+    """
+    Formats per-asset timings as a short text report.
+    """
+    lines = []
+    for ticker, res in results.items():
+        status = "ok" if res['error'] is None else f"FAILED ({res['error']})"
+        if res.get('fit'):
+            status += f", {res['fit']} fit"
+        lines.append(f"{ticker:<10} {res['seconds']:7.2f}s  (fetch {res['fetch_seconds']:.2f}s, "
+                     f"train {res['train_seconds']:.2f}s)  {status}")
+    return "\n".join(lines)
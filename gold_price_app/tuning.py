@@ -0,0 +1,274 @@
+import os
+import json
+import time
+import random
+import hashlib
+import tempfile
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+
+from config import TUNING_DIR, TRAINING_WORKERS
+from instrumentation import span
+
+# Per-asset hyperparameter search scored by walk-forward error:
+#   python tuning.py                         gold + silver with the default engine
+#   python tuning.py --engine numpy --max-candidates 24
+# Candidates are raced with successive halving: every candidate is scored on the newest fold, the best
+# 1/ETA go on to the next rung with more folds, and so on, so bad configurations are dropped after one
+# or two fits. Fold fits run in a process pool; scores are cached per (candidate, fold data), and the
+# winner is persisted for train_model to pick up.
+
+# Search spaces per engine: parameter -> candidate values (daily bars carry no intraday seasonality)
+SEARCH_SPACES = {
+    'prophet': {
+        'changepoint_prior_scale': [0.01, 0.05, 0.2, 0.5],
+        'seasonality_mode': ['additive', 'multiplicative'],
+        'yearly_seasonality': [5, 10, 20],
+        'weekly_seasonality': [False, 3],
+        'daily_seasonality': [False],
+    },
+    'numpy': {
+        'changepoint_penalty': [1e-6, 1e-5, 1e-4, 1e-3],
+        'yearly_order': [5, 10, 20],
+        'weekly_order': [0, 3],
+    },
+}
+
+# Walk-forward setup: folds of the newest history, scored on MAPE up to SCORE_HORIZON days ahead
+SCORE_HORIZON = 30
+DEFAULT_FOLDS = 4
+DEFAULT_STEP_DAYS = 60
+# Successive halving: each rung keeps the best 1/ETA candidates and doubles the folds they are scored on
+ETA = 3
+DEFAULT_MAX_CANDIDATES = 24
+
+def candidates(engine, max_candidates=DEFAULT_MAX_CANDIDATES, seed=0):
+    """
+    Parameter sets to try: the engine defaults first, then up to max_candidates - 1 grid points
+    (a seeded random subset when the grid is larger).
+    """
+    from model import ENGINES
+    space = SEARCH_SPACES[engine]
+    grid = [dict(zip(space, values)) for values in itertools.product(*space.values())]
+    default = dict(ENGINES[engine]['params'])
+    grid = [p for p in grid if p != default]
+    if len(grid) > max_candidates - 1:
+        grid = random.Random(seed).sample(grid, max_candidates - 1)
+    return [default] + grid
+
+def _params_id(params):
+    return json.dumps(params, sort_keys=True, default=str)
+
+def _safe(ticker):
+    return "".join(c if c.isalnum() else "_" for c in ticker)
+
+def _winner_path(ticker, engine):
+    return os.path.join(TUNING_DIR, f"{engine}_{_safe(ticker)}.json")
+
+def _scores_path(ticker, engine):
+    return os.path.join(TUNING_DIR, f"{engine}_{_safe(ticker)}.scores.json")
+
+def _write_json(path, data):
+    os.makedirs(TUNING_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=TUNING_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2, default=str)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+def _read_json(path):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def tuned_params(ticker, engine):
+    """
+    Returns the persisted winning parameters for a ticker and engine, or None.
+    """
+    winner = _read_json(_winner_path(ticker, engine))
+    return winner['params'] if winner else None
+
+def tuning_result(ticker, engine):
+    """
+    Returns the full persisted tuning record (params, scores, search stats), or None.
+    """
+    return _read_json(_winner_path(ticker, engine))
+
+def _fold_key(engine, params, train, test):
+    """
+    Score cache key: the candidate plus the exact data of the fold (training and scored closes).
+    """
+    h = hashlib.sha256(f"{engine}:{_params_id(params)}".encode())
+    for frame in (train, test):
+        h.update(pd.util.hash_pandas_object(frame[['Date', 'Close']], index=False).values.tobytes())
+    return h.hexdigest()
+
+def _fold_mape(result, test):
+    """
+    MAPE (%) of one fold's forecast over the test rows, or inf when the fit failed.
+    """
+    if result['error'] is not None:
+        return float('inf')
+    actual = test['Close'].to_numpy(dtype=np.float64)
+    yhat = result['values'][:, 0]
+    ok = ~np.isnan(actual) & ~np.isnan(yhat)
+    return float(np.mean(np.abs(actual[ok] - yhat[ok]) / np.abs(actual[ok])) * 100) if ok.any() else float('inf')
+
+def tune_asset(ticker, df, engine=None, max_candidates=DEFAULT_MAX_CANDIDATES, folds=DEFAULT_FOLDS,
+               step_days=DEFAULT_STEP_DAYS, horizon=SCORE_HORIZON, eta=ETA, max_workers=None, seed=0, log=print):
+    """
+    Searches engine parameters for one asset by successive halving over walk-forward folds.
+    Args:
+        ticker (str): Ticker symbol (the winner is persisted under it).
+        df (pd.DataFrame): History with 'Date' and 'Close'.
+        engine (str): Forecast engine (default model.DEFAULT_ENGINE).
+        max_candidates (int): Parameter sets raced, the engine defaults included.
+        folds (int): Folds the finalists are scored on (newest first).
+        horizon (int): Days after each cutoff that are scored.
+        eta (int): Each rung keeps 1/eta of the candidates.
+        max_workers (int): Process count (default TRAINING_WORKERS, else the CPU count); 1 runs inline.
+    Returns:
+        dict: The persisted record: 'params', 'score' (mean MAPE %), 'default_score' (same folds), 'folds',
+              'evaluated' fits, 'cached' scores, 'candidates', 'seconds'.
+    """
+    from model import DEFAULT_ENGINE
+    from backtest import make_folds, _fit_fold
+    engine = engine or DEFAULT_ENGINE
+    if max_workers is None:
+        max_workers = TRAINING_WORKERS or os.cpu_count() or 1
+
+    dates = df['Date']
+    cutoffs = make_folds(dates, horizon, folds, step_days)[::-1]
+    if not cutoffs:
+        raise ValueError(f"Not enough history to tune {ticker}")
+    fold_data = []
+    for cutoff in cutoffs:
+        train = df[dates <= cutoff].reset_index(drop=True)
+        test = df[(dates > cutoff) & (dates <= cutoff + pd.Timedelta(days=horizon))].reset_index(drop=True)
+        fold_data.append((train, test))
+
+    pool_params = candidates(engine, max_candidates, seed)
+    cache = _read_json(_scores_path(ticker, engine)) or {}
+    # Candidate -> {fold index: MAPE}
+    scores = {_params_id(p): {} for p in pool_params}
+    evaluated = cached = 0
+    started = time.perf_counter()
+
+    # Rungs score the survivors on the newest 1, 2, 4, ... folds, the last rung on all of them
+    rung_folds = []
+    n = 1
+    while n < len(fold_data):
+        rung_folds.append(n)
+        n *= 2
+    rung_folds.append(len(fold_data))
+
+    executor = None
+    if max_workers > 1:
+        # spawn, not fork: the Streamlit server process is multi-threaded
+        executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        survivors = list(pool_params)
+        for rung, n_folds in enumerate(rung_folds):
+            jobs = []
+            for params in survivors:
+                pid = _params_id(params)
+                for f in range(n_folds):
+                    if f in scores[pid]:
+                        continue
+                    train, test = fold_data[f]
+                    key = _fold_key(engine, params, train, test)
+                    if key in cache:
+                        scores[pid][f] = cache[key]
+                        cached += 1
+                    else:
+                        jobs.append((pid, f, key, params))
+
+            with span("tuning.rung", engine=engine, rung=rung):
+                if executor is None:
+                    done = [(job, _fit_fold(ticker, engine, fold_data[job[1]][0], fold_data[job[1]][1]['Date'].to_numpy(), job[3]))
+                            for job in jobs]
+                else:
+                    futures = {executor.submit(_fit_fold, ticker, engine, fold_data[job[1]][0],
+                                               fold_data[job[1]][1]['Date'].to_numpy(), job[3]): job for job in jobs}
+                    done = []
+                    for future in as_completed(futures):
+                        try:
+                            done.append((futures[future], future.result()))
+                        except Exception as e:
+                            done.append((futures[future], {'error': f"{type(e).__name__}: {e}"}))
+
+            for (pid, f, key, _), result in done:
+                scores[pid][f] = _fold_mape(result, fold_data[f][1])
+                if result['error'] is None:
+                    cache[key] = scores[pid][f]
+                evaluated += 1
+
+            ranked = sorted(survivors, key=lambda p: np.mean(list(scores[_params_id(p)].values())))
+            best = np.mean(list(scores[_params_id(ranked[0])].values()))
+            log(f"{ticker} rung {rung}: {len(survivors)} candidates on {n_folds} fold(s), best MAPE {best:.2f}%")
+            if rung < len(rung_folds) - 1:
+                # The defaults always run to the end, so the winner is compared on the same folds
+                survivors = ranked[:max(1, len(ranked) // eta)]
+                if pool_params[0] not in survivors:
+                    survivors.append(pool_params[0])
+            else:
+                survivors = ranked
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        _write_json(_scores_path(ticker, engine), cache)
+
+    winner = survivors[0]
+    default_id = _params_id(pool_params[0])
+    default_scores = scores[default_id]
+    record = {
+        'ticker': ticker,
+        'engine': engine,
+        'params': winner,
+        'score': float(np.mean(list(scores[_params_id(winner)].values()))),
+        'default_score': float(np.mean(list(default_scores.values()))),
+        'folds': len(fold_data),
+        'cutoffs': [f"{c:%Y-%m-%d}" for c in cutoffs],
+        'horizon': horizon,
+        'candidates': len(pool_params),
+        'evaluated': evaluated,
+        'cached': cached,
+        'seconds': time.perf_counter() - started,
+        'created': pd.Timestamp.now().isoformat(timespec='seconds'),
+    }
+    _write_json(_winner_path(ticker, engine), record)
+    return record
+
+if __name__ == "__main__":
+    import argparse
+    from market_data import fetch_histories
+
+    parser = argparse.ArgumentParser(description="Tune forecast engine parameters per asset.")
+    parser.add_argument("tickers", nargs="*", default=["GC=F", "SI=F"])
+    parser.add_argument("--engine", default=None, help="Forecast engine (default: GOLD_APP_ENGINE)")
+    parser.add_argument("--start", default="2020-01-01", help="History start date")
+    parser.add_argument("--max-candidates", type=int, default=DEFAULT_MAX_CANDIDATES)
+    parser.add_argument("--folds", type=int, default=DEFAULT_FOLDS)
+    parser.add_argument("--step", type=int, default=DEFAULT_STEP_DAYS, help="Days between fold cutoffs")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    histories = fetch_histories(args.tickers, start_date=args.start)
+    for ticker, df in histories.items():
+        if isinstance(df, Exception):
+            print(f"{ticker}: failed to load ({df})")
+            continue
+        rec = tune_asset(ticker, df, args.engine, args.max_candidates, args.folds, args.step,
+                         max_workers=args.workers, seed=args.seed)
+        print(f"{ticker}: MAPE {rec['score']:.2f}% (defaults {rec['default_score']:.2f}%) with {rec['params']}")
+        print(f"  {rec['evaluated']} fits, {rec['cached']} cached scores, {rec['seconds']:.1f}s -> {_winner_path(ticker, rec['engine'])}")
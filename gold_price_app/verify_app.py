@@ -2,11 +2,11 @@ import pandas as pd
 from data_loader import load_data
 from model import train_model, predict_specific_date
 from analytics import get_monthly_stats, get_yearly_analysis
-from datetime import date
+from datetime import date, timedelta
 
 def test_system():
     print("1. Testing Data Loading...")
-    df = load_data("GC=F", period="1y")
+    df = load_data("GC=F", start_date=str(date.today() - timedelta(days=365)))
     if df.empty:
         print("❌ Data loading failed.")
         return
@@ -6,12 +6,14 @@ import pandas as pd
 sys.path.append(os.getcwd())
 
 from data_loader import load_data, convert_to_inr
+from providers import get_provider
 
 def verify_conversion():
     print("Verifying INR Conversion...")
     
     # Load Data
-    print("Loading data...")
+    # load_data reads through the configured provider, so GOLD_APP_PROVIDER=replay/synthetic works offline
+    print(f"Loading data ({get_provider().name} provider)...")
     df_gold = load_data("GC=F", start_date="2023-01-01")
     df_usdinr = load_data("USDINR=X", start_date="2023-01-01")
     